@@ -0,0 +1,389 @@
+"""Benchmarks for the hot paths of tikzpy.
+
+Each benchmark builds a synthetic scene of a given number of objects and measures the
+throughput (objects per second) and peak memory of one operation on it. The scripts in
+examples/ are also run as realistic workloads. Nothing here needs network access, and
+the end-to-end compile benchmark is skipped when pdflatex is not installed.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 1000000 --output results.json
+    python benchmarks/run_benchmarks.py --only code_cold point_arithmetic
+
+The results are printed (or written to --output) as JSON with sorted keys, so that the
+results of two runs can be diffed.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import chdir
+from pathlib import Path
+from unittest import mock
+
+from tikzpy import Circle, Line, PlotCoordinates, Point, TikzPicture
+from tikzpy.drawing_objects.drawing_utils import calc_intersection
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+EXAMPLES = {
+    "example_lorenz": EXAMPLES_DIR / "lorenz" / "lorenz.py",
+    "example_transformer": EXAMPLES_DIR / "transformer" / "pre_layer_transformer.py",
+    "example_neural_network": EXAMPLES_DIR / "neural_network" / "neural_network.py",
+    "example_cantor": EXAMPLES_DIR / "cantor" / "cantor.py",
+}
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# Compiling is orders of magnitude slower than everything else, so we cap its scene size
+MAX_COMPILE_SIZE = 10_000
+SCHEMA_VERSION = 1
+
+# A benchmark takes a scene size and returns a function to be timed, which performs the
+# operation on the scene and returns the number of objects it processed.
+Benchmark = Callable[[int], Callable[[], int]]
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class Skip(Exception):
+    """Raised by a benchmark which cannot run in this environment."""
+
+
+def synthetic_scene(size: int) -> TikzPicture:
+    """A picture with size drawing objects of every kind, spread over a grid."""
+    tikz = TikzPicture()
+    width = max(1, int(math.sqrt(size)))
+    for idx in range(size):
+        x, y = idx % width, idx // width
+        kind = idx % 6
+        if kind == 0:
+            tikz.circle((x, y), 0.4, options="fill=ProcessBlue!50")
+        elif kind == 1:
+            tikz.line((x, y), (x + 0.5, y + 0.5), options="->")
+        elif kind == 2:
+            tikz.arc((x, y), 0, 270, radius=0.3, draw_from_start=False)
+        elif kind == 3:
+            tikz.rectangle((x, y), 0.5, 0.25, options="thick")
+        elif kind == 4:
+            tikz.plot_coordinates(
+                [(x + t / 10, y + (t % 3) / 10) for t in range(10)],
+                plot_options="smooth",
+            )
+        else:
+            tikz.node((x, y), text=f"${idx}$")
+    return tikz
+
+
+def invalidate_all(tikz: TikzPicture) -> None:
+    """Discards the cached code of every drawing object of tikz, so that the next call to
+    code() generates it from scratch, as on a new picture."""
+    for draw_obj in tikz.drawing_objects:
+        if hasattr(draw_obj, "invalidate"):
+            draw_obj.invalidate()
+
+
+@benchmark("code_cold")
+def bench_code_cold(size: int) -> Callable[[], int]:
+    """TikzPicture.code() on a picture whose code has never been generated."""
+    tikz = synthetic_scene(size)
+
+    def run() -> int:
+        # Otherwise every run but the first would reuse the code cached by the previous one
+        invalidate_all(tikz)
+        tikz.code()
+        return size
+
+    return run
+
+
+@benchmark("code_warm")
+def bench_code_warm(size: int) -> Callable[[], int]:
+    """TikzPicture.code() after one object changed since the last call."""
+    tikz = synthetic_scene(size)
+    tikz.code()
+    circle = tikz.drawing_objects[0]
+
+    def run() -> int:
+        circle.radius += 0.1
+        tikz.code()
+        return size
+
+    return run
+
+
+@benchmark("code_parallel")
+def bench_code_parallel(size: int) -> Callable[[], int]:
+    """TikzPicture.code(processes=...) on a picture whose code has never been generated,
+    with one process per CPU."""
+    processes = os.cpu_count() or 1
+    if processes == 1:
+        raise Skip("there is only one CPU")
+    tikz = synthetic_scene(size)
+
+    def run() -> int:
+        invalidate_all(tikz)
+        tikz.code(processes=processes)
+        return size
+
+    return run
+
+
+@benchmark("point_arithmetic")
+def bench_point_arithmetic(size: int) -> Callable[[], int]:
+    points = [Point(idx, -idx) for idx in range(size)]
+
+    def run() -> int:
+        origin = Point(1, 2)
+        for point in points:
+            origin = (origin + point) * 0.5 - (1, 1)
+        return size
+
+    return run
+
+
+@benchmark("plot_coordinates")
+def bench_plot_coordinates(size: int) -> Callable[[], int]:
+    """Constructing (and emitting) a PlotCoordinates with size points."""
+    points = [(idx / 100, math.sin(idx / 100)) for idx in range(size)]
+
+    def run() -> int:
+        PlotCoordinates(points, plot_options="smooth").code
+        return size
+
+    return run
+
+
+@benchmark("transforms_inplace")
+def bench_transforms_inplace(size: int) -> Callable[[], int]:
+    tikz = synthetic_scene(size)
+    shapes = [obj for obj in tikz.drawing_objects if hasattr(obj, "shift_")]
+
+    def run() -> int:
+        for shape in shapes:
+            shape.shift_(1, 1)
+            shape.scale_(1.01)
+            shape.rotate_(5, about_pt=(0, 0))
+        return len(shapes)
+
+    return run
+
+
+@benchmark("transforms_copy")
+def bench_transforms_copy(size: int) -> Callable[[], int]:
+    """The non-inplace transforms, which deepcopy the drawing object."""
+    tikz = synthetic_scene(size)
+    shapes = [obj for obj in tikz.drawing_objects if hasattr(obj, "shift_")]
+
+    def run() -> int:
+        for shape in shapes:
+            shape.shift(1, 1)
+        return len(shapes)
+
+    return run
+
+
+@benchmark("deepcopy")
+def bench_deepcopy(size: int) -> Callable[[], int]:
+    tikz = synthetic_scene(size)
+
+    def run() -> int:
+        for draw_obj in tikz.drawing_objects:
+            draw_obj.copy()
+        return size
+
+    return run
+
+
+@benchmark("calc_intersection")
+def bench_calc_intersection(size: int) -> Callable[[], int]:
+    pairs = []
+    for idx in range(size):
+        offset = (idx % 100) / 100
+        if idx % 2 == 0:
+            pairs.append((Circle((0, 0), 1), Circle((1 + offset, 0), 1)))
+        else:
+            pairs.append((Line((0, 0), (1, 1 + offset)), Line((0, 1), (1, 0))))
+
+    def run() -> int:
+        for item_a, item_b in pairs:
+            calc_intersection(item_a, item_b)
+        return size
+
+    return run
+
+
+@benchmark("compile")
+def bench_compile(size: int) -> Callable[[], int]:
+    """End-to-end TikzPicture.compile(), including the TeX engine."""
+    if shutil.which("pdflatex") is None:
+        raise Skip("pdflatex is not installed")
+    if size > MAX_COMPILE_SIZE:
+        raise Skip(f"scene size is above {MAX_COMPILE_SIZE}")
+    tikz = synthetic_scene(size)
+
+    def run() -> int:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tikz.compile(Path(tmp_dir) / "benchmark.pdf")
+        return size
+
+    return run
+
+
+def example_benchmark(script: Path) -> Callable[[], int]:
+    """Runs an example script, with TikzPicture.show() replaced by TikzPicture.code(),
+    and returns the number of drawing objects it produced."""
+
+    def run() -> int:
+        pictures = []
+
+        def show(self, *args, **kwargs):
+            pictures.append(self)
+            self.code()
+
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            chdir(tmp_dir),
+            mock.patch.object(TikzPicture, "show", show),
+        ):
+            try:
+                runpy.run_path(str(script), run_name="__main__")
+            except ImportError as e:
+                raise Skip(str(e)) from e
+        return sum(len(tikz.drawing_objects) for tikz in pictures)
+
+    return run
+
+
+def measure(run: Callable[[], int], repeat: int) -> dict:
+    """Times the best of repeat calls to run, then measures the peak memory of one more
+    call with tracemalloc. Timing is done separately as tracemalloc slows Python down."""
+    seconds = math.inf
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        num_objects = run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": "ok",
+        "objects": num_objects,
+        "seconds": round(seconds, 6),
+        "objects_per_second": (
+            round(num_objects / seconds, 1) if seconds > 0 else None
+        ),
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_benchmarks(
+    names: list[str], sizes: list[int], repeat: int, log=sys.stderr
+) -> dict:
+    results = []
+    jobs = []
+    for name in names:
+        if name in EXAMPLES:
+            script = EXAMPLES[name]
+            jobs.append((name, None, lambda s=script: example_benchmark(s)))
+        else:
+            for size in sizes:
+                setup = BENCHMARKS[name]
+                jobs.append((name, size, lambda f=setup, n=size: f(n)))
+
+    for name, size, setup in jobs:
+        result = {"name": name, "size": size}
+        try:
+            result.update(measure(setup(), repeat))
+        except Skip as e:
+            result.update(status="skipped", reason=str(e))
+        results.append(result)
+        if log is not None:
+            print(_summary(result), file=log)
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _summary(result: dict) -> str:
+    label = result["name"]
+    if result["size"] is not None:
+        label += f"[{result['size']}]"
+    if result["status"] != "ok":
+        return f"{label:32} skipped: {result['reason']}"
+    throughput = result["objects_per_second"] or 0
+    peak_mib = result["peak_bytes"] / 2**20
+    return (
+        f"{label:32} {result['seconds']:>10.4f}s {throughput:>14,.0f} obj/s"
+        f" {peak_mib:>10.1f} MiB peak"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    names = list(BENCHMARKS) + list(EXAMPLES)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Scene sizes (number of objects).",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=names,
+        default=names,
+        metavar="NAME",
+        help=f"Benchmarks to run, from: {', '.join(names)}.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Report the best time of this many runs.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Write the JSON results to this file instead of stdout.",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only, args.sizes, args.repeat)
+    output = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output is None:
+        sys.stdout.write(output)
+    else:
+        args.output.write_text(output)
+
+
+if __name__ == "__main__":
+    main()
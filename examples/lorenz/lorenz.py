@@ -11,7 +11,8 @@ from tikzpy import TikzPicture
     because TeX was invented in the late 70s, and not during a time period with quad core 16GB ram computers. 
     
     If one has trouble with this, one could increase their buffer size parameter (a good idea because your computer is in 2021+ 
-    and it can definitely handle it) or one could take less iterations in the code below.
+    and it can definitely handle it) or one could take less iterations in the code below. By default, compile() and show()
+    do this automatically: when TeX's capacity is exceeded, they compile again with lualatex, or with larger memory settings.
 """
 
 if __name__ == "__main__":
@@ -1,27 +1,67 @@
-from tikzpy.drawing_objects.arc import Arc
-from tikzpy.drawing_objects.circle import Circle
-from tikzpy.drawing_objects.ellipse import Ellipse
-from tikzpy.drawing_objects.line import Line
-from tikzpy.drawing_objects.node import Node
-from tikzpy.drawing_objects.plotcoordinates import PlotCoordinates
-from tikzpy.drawing_objects.point import Point
-from tikzpy.drawing_objects.rectangle import Rectangle
-from tikzpy.drawing_objects.xy_plane import R2_Space
-from tikzpy.tikz_environments.clip import Clip
-from tikzpy.tikz_environments.scope import Scope
-from tikzpy.tikz_environments.tikz_picture import TikzPicture
-
-__all__ = [
-    "Arc",
-    "Circle",
-    "Clip",
-    "Ellipse",
-    "Line",
-    "Node",
-    "PlotCoordinates",
-    "Point",
-    "R2_Space",
-    "Rectangle",
-    "Scope",
-    "TikzPicture",
-]
+from importlib import import_module
+
+# Equivalent to typing.TYPE_CHECKING, which type checkers recognize by name, without the
+# cost of importing typing.
+TYPE_CHECKING = False
+
+# The public names of tikzpy, mapped to the modules defining them. The modules are only
+# imported when a name is first accessed, which keeps `import tikzpy` fast.
+_LAZY_IMPORTS = {
+    "Arc": "tikzpy.drawing_objects.arc",
+    "Circle": "tikzpy.drawing_objects.circle",
+    "Clip": "tikzpy.tikz_environments.clip",
+    "Ellipse": "tikzpy.drawing_objects.ellipse",
+    "Line": "tikzpy.drawing_objects.line",
+    "Node": "tikzpy.drawing_objects.node",
+    "Pic": "tikzpy.drawing_objects.pic",
+    "PlotCoordinates": "tikzpy.drawing_objects.plotcoordinates",
+    "Point": "tikzpy.drawing_objects.point",
+    "R2_Space": "tikzpy.drawing_objects.xy_plane",
+    "Rectangle": "tikzpy.drawing_objects.rectangle",
+    "Scope": "tikzpy.tikz_environments.scope",
+    "TikzPicture": "tikzpy.tikz_environments.tikz_picture",
+}
+
+if TYPE_CHECKING:
+    from tikzpy.drawing_objects.arc import Arc
+    from tikzpy.drawing_objects.circle import Circle
+    from tikzpy.drawing_objects.ellipse import Ellipse
+    from tikzpy.drawing_objects.line import Line
+    from tikzpy.drawing_objects.node import Node
+    from tikzpy.drawing_objects.pic import Pic
+    from tikzpy.drawing_objects.plotcoordinates import PlotCoordinates
+    from tikzpy.drawing_objects.point import Point
+    from tikzpy.drawing_objects.rectangle import Rectangle
+    from tikzpy.drawing_objects.xy_plane import R2_Space
+    from tikzpy.tikz_environments.clip import Clip
+    from tikzpy.tikz_environments.scope import Scope
+    from tikzpy.tikz_environments.tikz_picture import TikzPicture
+
+__all__ = [
+    "Arc",
+    "Circle",
+    "Clip",
+    "Ellipse",
+    "Line",
+    "Node",
+    "Pic",
+    "PlotCoordinates",
+    "Point",
+    "R2_Space",
+    "Rectangle",
+    "Scope",
+    "TikzPicture",
+]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_IMPORTS[name]), name)
+    # Cache the value, so that __getattr__ is not called again for this name
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,123 @@
+"""The command line interface of tikzpy.
+
+```
+tikzpy serve [--port PORT] [--workers N] [--cache-dir DIR] [--workspace]
+tikzpy watch SCRIPT [--output PDF] [--port PORT] [--no-preview] [--engine ENGINE]
+             [--remote URL] [--interval SECONDS] [--debounce SECONDS]
+```
+"""
+
+import argparse
+import sys
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="tikzpy")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve",
+        help="run a local server which compiles pictures for other processes",
+        description="Compiles the pictures which processes on this machine submit with "
+        "TikzPicture.compile(remote=URL), where URL is printed on startup.",
+    )
+    serve.add_argument("--port", type=int, help="the port to listen on (default: 8765)")
+    serve.add_argument(
+        "--workers", type=int, help="the number of concurrent compilations"
+    )
+    serve.add_argument("--cache-dir", help="the directory of the compiled PDFs")
+    serve.add_argument(
+        "--workspace",
+        action="store_true",
+        help="compile in a persistent workspace instead of temporary directories",
+    )
+
+    watch = commands.add_parser(
+        "watch",
+        help="recompile the picture of a script whenever the script changes",
+        description="Runs SCRIPT whenever it, or a module which it imports, changes, "
+        "and compiles the TikzPicture which it shows when its TeX code changed. The PDF is "
+        "shown in a browser, which reloads it after every compilation.",
+    )
+    watch.add_argument("script", help="a Python script which creates a TikzPicture")
+    watch.add_argument(
+        "--output", help="the compiled PDF (default: the script with a .pdf suffix)"
+    )
+    watch.add_argument(
+        "--port", type=int, default=0, help="the port of the preview (default: any)"
+    )
+    watch.add_argument(
+        "--no-preview",
+        action="store_true",
+        help="do not serve the PDF, nor open it in a browser",
+    )
+    watch.add_argument("--engine", default="auto", help="the TeX engine")
+    watch.add_argument("--remote", help="the URL of a `tikzpy serve` server")
+    watch.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="how often to check the files, in seconds (default: 0.2)",
+    )
+    watch.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="how long the files must be unchanged before rerunning (default: 0.3)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        return serve_command(args)
+    if args.command == "watch":
+        return watch_command(args)
+    return 2
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    from tikzpy.utils.compile_server import DEFAULT_PORT, CompileServer
+    from tikzpy.utils.workspace import Workspace
+
+    server = CompileServer(
+        cache_dir=args.cache_dir,
+        workers=args.workers,
+        workspace=Workspace() if args.workspace else None,
+    )
+    server.start(DEFAULT_PORT if args.port is None else args.port)
+    print(f"Compiling pictures at {server.url} with {server.workers} workers")
+    print("Press Ctrl+C to stop")
+    try:
+        server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+
+def watch_command(args: argparse.Namespace) -> int:
+    from tikzpy.utils.watch import PreviewServer, Watch
+
+    preview = None
+    if not args.no_preview:
+        import webbrowser
+
+        preview = PreviewServer()
+        preview.start(args.port)
+        print(f"Previewing at {preview.url}")
+        webbrowser.open(preview.url)
+    options = {"remote": args.remote} if args.remote else {}
+    watch = Watch(args.script, args.output, preview, engine=args.engine, **options)
+    print(f"Watching {watch.script}, press Ctrl+C to stop")
+    try:
+        watch.run(args.interval, args.debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if preview is not None:
+            preview.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,28 @@ from __future__ import annotations
 from math import atan2, cos, pi, sin, sqrt, tan
 from math import degrees as rads_2_degs
 from math import radians as degs_2_rads
+from typing import NamedTuple
 
 from tikzpy.drawing_objects.drawing_object import DrawingObject
-from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.point import Point, bounding_box
+
+
+class ArcGeometry(NamedTuple):
+    """Geometry derived from the parameters of an Arc.
+
+    Attributes:
+        arc_type: Either "circle" or "ellipse".
+        start_pos: The point at which the arc begins, if the arc's position is its center.
+        start_angle: The start angle (in degrees) emitted in the arc statement.
+        end_angle: The end angle (in degrees) emitted in the arc statement.
+        radius_statement: The radius options of the arc statement.
+    """
+
+    arc_type: str
+    start_pos: tuple[float, float]
+    start_angle: float
+    end_angle: float
+    radius_statement: str
 
 
 class Arc(DrawingObject):
@@ -59,17 +78,28 @@ class Arc(DrawingObject):
     def _end_angle(self) -> Angle:
         return Angle(self.end_angle, self.radians)
 
-    def arc_type(self) -> str:
-        """Determine the arc type that the user is attempting to create based on their input."""
+    def invalidate(self) -> None:
+        super().invalidate()
+        self.__dict__.pop("_geometry_cache", None)
+
+    @property
+    def _geometry(self) -> ArcGeometry:
+        """The derived geometry of the arc, which is only recalculated after the arc changes."""
+        geometry = self.__dict__.get("_geometry_cache")
+        if geometry is None:
+            geometry = self._calculate_geometry()
+            self.__dict__["_geometry_cache"] = geometry
+        return geometry
+
+    def _calculate_geometry(self) -> ArcGeometry:
+        """Validate the user's input and calculate everything we need to draw the arc."""
         if self.radius is not None:
             if self.x_radius is not None or self.y_radius is not None:
                 raise ValueError(
                     "Cannot set radius AND x_radius, y_radius at the same time."
                 )
-            else:
-                self.radius_statement = f"radius = {self.radius}cm"
-                return "circle"
-
+            arc_type = "circle"
+            radius_statement = f"radius = {self.radius}cm"
         else:
             if self.x_radius is None or self.y_radius is None:
                 raise ValueError(
@@ -79,21 +109,45 @@ class Arc(DrawingObject):
                 raise ValueError(
                     f"x_radius is {self.x_radius}, y_radius is {self.y_radius}, but neither can be <= 0."
                 )
-            else:
-                self.radius_statement = (
-                    f"x radius = {self.x_radius}cm, y radius = {self.y_radius}cm"
-                )
-                return "ellipse"
+            arc_type = "ellipse"
+            radius_statement = (
+                f"x radius = {self.x_radius}cm, y radius = {self.y_radius}cm"
+            )
+
+        start_angle, end_angle = self._start_angle, self._end_angle
+        theta = start_angle.rads()
+        if arc_type == "circle":
+            t_start, t_end = start_angle.degs(), end_angle.degs()
+            r_at_theta = self.radius
+        else:  # This is for the case the ellipse.
+            # We need to calculate the parameter t at which (x_r*cos(self.start_angle), y_r*sin(self.start_angle)) hits
+            t_start = rads_2_degs(self.atan2_for_ellipse(start_angle))
+            t_end = rads_2_degs(self.atan2_for_ellipse(end_angle))
+            # We calculate r_at_theta, the distance between the origin and the point on the ellipse which occurs at angle self.start_angle.
+            r_at_theta = (self.x_radius * self.y_radius) / sqrt(
+                (self.y_radius * cos(theta)) ** 2 + (self.x_radius * sin(theta)) ** 2
+            )
+        # The point at which the arc begins, if self.position is its center
+        start_pos = (
+            self.position.x + r_at_theta * cos(theta),
+            self.position.y + r_at_theta * sin(theta),
+        )
+        return ArcGeometry(arc_type, start_pos, t_start, t_end, radius_statement)
+
+    def arc_type(self) -> str:
+        """Determine the arc type that the user is attempting to create based on their input."""
+        return self._geometry.arc_type
+
+    @property
+    def radius_statement(self) -> str:
+        """The radius options of the arc statement, e.g. "radius = 2cm"."""
+        return self._geometry.radius_statement
 
     def draw_start(self) -> tuple[float, float]:
         """Return the point at which we should begin drawing the arc."""
         if self.draw_from_start:
-            start_pos = self._position
-        elif self.arc_type() == "circle":
-            start_pos = self.start_pos_circle()
-        else:
-            start_pos = self.start_pos_ellipse()
-        return start_pos
+            return self._position
+        return self._geometry.start_pos
 
     @property
     def position(self):
@@ -105,15 +159,8 @@ class Arc(DrawingObject):
 
     @property
     def _command(self) -> str:
-        if self.arc_type() == "circle":
-            start_angle, end_angle = self._start_angle.degs(), self._end_angle.degs()
-        else:  # This is for the case the ellipse.
-            # We need to calculate the parameter t at which (x_r*cos(self.start_angle), y_r*sin(self.start_angle)) hits
-            t_start = self.atan2_for_ellipse(self._start_angle)
-            t_end = self.atan2_for_ellipse(self._end_angle)
-
-            start_angle, end_angle = rads_2_degs(t_start), rads_2_degs(t_end)
-        return f"{self.draw_start()} arc [start angle = {start_angle}, end angle = {end_angle}, {self.radius_statement}]"
+        geometry = self._geometry
+        return f"{self.draw_start()} arc [start angle = {geometry.start_angle}, end angle = {geometry.end_angle}, {geometry.radius_statement}]"
 
     def start_pos_circle(self) -> tuple[float, float]:
         """Calculates the point at which the circle should begin
@@ -121,13 +168,7 @@ class Arc(DrawingObject):
         start, and end angles of the desired circular arc.
         """
         assert self.arc_type() == "circle"
-        # Obtain the angles in radians
-        start_angle = self._start_angle.rads()
-        # Calculate the point at which the arc should begin drawing
-        start_pt_x = self.position.x + self.radius * cos(start_angle)
-        start_pt_y = self.position.y + self.radius * sin(start_angle)
-
-        return (start_pt_x, start_pt_y)
+        return self._geometry.start_pos
 
     def start_pos_ellipse(self) -> tuple[float, float]:
         """Calculates the point at which the ellipse arc should begin
@@ -135,33 +176,62 @@ class Arc(DrawingObject):
         start, and end angles of the desired elliptic arc.
         """
         assert self.arc_type() == "ellipse"
-        # Obtain the angles in radians
-        start_angle = self._start_angle.rads()
-        # We calculate r_at_theta, the distance between the origin and the point on the ellipse which occurs at angle self.start_angle.
-        r_at_theta = (self.x_radius * self.y_radius) / sqrt(
-            (self.y_radius * cos(start_angle)) ** 2
-            + (self.x_radius * sin(start_angle)) ** 2
-        )
-        # We then use r_at_theta to calculate the desired point on the ellipse
-        start_pt_x = self.position.x + r_at_theta * cos(start_angle)
-        start_pt_y = self.position.y + r_at_theta * sin(start_angle)
+        return self._geometry.start_pos
 
-        return start_pt_x, start_pt_y
+    def bounding_box(self) -> tuple[Point, Point] | None:
+        """Returns the south west and north east corners of an axis-aligned rectangle
+        containing the arc, namely that of its whole circle or ellipse, or None if it is
+        3D."""
+        if self._position.z is not None:
+            return None
+        x, y = self._position
+        if self.draw_from_start:
+            # The position is the start of the arc, so we find its center
+            start_x, start_y = self._geometry.start_pos
+            x, y = 2 * x - start_x, 2 * y - start_y
+        if self.radius is not None:
+            a = b = abs(self.radius)
+        else:
+            a, b = abs(self.x_radius), abs(self.y_radius)
+        return bounding_box([(x - a, y - b), (x + a, y + b)])
 
-    def shift(self, xshift: float, yshift: float) -> None:
-        self._position.shift(xshift, yshift)
+    def shift_(self, xshift: float, yshift: float) -> None:
+        self._position.shift_(xshift, yshift)
+        self.invalidate()
 
-    def scale(self, scale: float) -> None:
-        self._position.scale(scale)
-        self.x_radius *= scale
-        self.y_radius *= scale
+    def scale_(self, scale: float) -> None:
+        self._position.scale_(scale)
+        if self.radius is not None:
+            self.radius *= scale
+        else:
+            self.x_radius *= scale
+            self.y_radius *= scale
+        self.invalidate()
 
-    def rotate(
+    def rotate_(
         self, angle: float, about_pt: tuple | None = None, radians: bool = False
     ) -> None:
         if about_pt is None:
             about_pt = self.draw_start()
-        self._position.rotate(angle, about_pt, radians)
+        self._position.rotate_(angle, about_pt, radians)
+        self.invalidate()
+
+    def shift(self, xshift: float, yshift: float) -> Arc:
+        new_arc = self.copy()
+        new_arc.shift_(xshift, yshift)
+        return new_arc
+
+    def scale(self, scale: float) -> Arc:
+        new_arc = self.copy()
+        new_arc.scale_(scale)
+        return new_arc
+
+    def rotate(
+        self, angle: float, about_pt: tuple | None = None, radians: bool = False
+    ) -> Arc:
+        new_arc = self.copy()
+        new_arc.rotate_(angle, about_pt, radians)
+        return new_arc
 
     def atan2_for_ellipse(self, angle: Angle) -> float:
         """Perform a tangent inverse operation which returns values between 0 and 2pi."""
@@ -3,7 +3,7 @@ from __future__ import annotations
 import math
 
 from tikzpy.drawing_objects.drawing_object import DrawingObject
-from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.point import Point, bounding_box
 
 
 class Circle(DrawingObject):
@@ -147,12 +147,23 @@ class Circle(DrawingObject):
             theta
         ), self.center.y + self.radius * math.sin(theta)
 
+    def bounding_box(self) -> tuple[Point, Point] | None:
+        """Returns the south west and north east corners of the smallest axis-aligned
+        rectangle containing the circle, or None if it is 3D."""
+        x, y, z = self.center.x, self.center.y, self.center.z
+        if z is not None:
+            return None
+        r = abs(self.radius)
+        return bounding_box([(x - r, y - r), (x + r, y + r)])
+
     def shift_(self, xshift: float, yshift: float) -> None:
         self._center.shift_(xshift, yshift)
+        self.invalidate()
 
     def scale_(self, scale: float) -> None:
         self._center.scale_(scale)
         self.radius *= scale
+        self.invalidate()
 
     def rotate_(
         self,
@@ -161,6 +172,7 @@ class Circle(DrawingObject):
         radians: bool = False,
     ) -> None:
         self._center.rotate_(angle, about_pt, radians)
+        self.invalidate()
 
     def shift(self, xshift: float, yshift: float) -> Circle:
         new_circle = self.copy()
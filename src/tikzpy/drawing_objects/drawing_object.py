@@ -1,12 +1,101 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from copy import deepcopy
 
 from tikzpy.drawing_objects.node import Node
+from tikzpy.drawing_objects.point import Point
 from tikzpy.utils.helpers import brackets
 
 
+class OwnedList(list):
+    """A list owned by a drawing object, e.g. the control points of a Line, which discards
+    the cached Tikz code of its owner when it is modified and adopts the Points put into it.
+    It is copied and pickled as a plain list, which its new owner adopts again."""
+
+    def __init__(self, owner: DrawingObject, values=()) -> None:
+        super().__init__(values)
+        self._owner = owner
+        for value in self:
+            _adopt_point(owner, value)
+
+    def _changed(self, values=()) -> None:
+        for value in values:
+            _adopt_point(self._owner, value)
+        self._owner.invalidate()
+
+    def __setitem__(self, index, value) -> None:
+        values = list(value) if isinstance(index, slice) else [value]
+        super().__setitem__(index, values if isinstance(index, slice) else value)
+        self._changed(values)
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, values) -> OwnedList:
+        result = super().__iadd__(values)
+        self._changed(values)
+        return result
+
+    def __imul__(self, times: int) -> OwnedList:
+        result = super().__imul__(times)
+        self._changed()
+        return result
+
+    def append(self, value) -> None:
+        super().append(value)
+        self._changed((value,))
+
+    def extend(self, values) -> None:
+        values = list(values)
+        super().extend(values)
+        self._changed(values)
+
+    def insert(self, index: int, value) -> None:
+        super().insert(index, value)
+        self._changed((value,))
+
+    def pop(self, index: int = -1):
+        value = super().pop(index)
+        self._changed()
+        return value
+
+    def remove(self, value) -> None:
+        super().remove(value)
+        self._changed()
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._changed()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+def _adopt_point(owner: DrawingObject, value) -> None:
+    if isinstance(value, Point):
+        object.__setattr__(value, "_owner", owner)
+
+
+def _adopt(owner: DrawingObject, value):
+    """Makes owner the owner of a Point or of a list (and of the Points in it), so that
+    changes made through them discard the cached Tikz code of owner."""
+    if type(value) is list:
+        return OwnedList(owner, value)
+    _adopt_point(owner, value)
+    return value
+
+
 class DrawingObject(ABC):
     r"""A generic class for our drawing objects to inherit properties from.
 
@@ -58,14 +147,55 @@ class DrawingObject(ABC):
         point "about_pt".
         """
 
+    def __setattr__(self, name: str, value) -> None:
+        if name == "_command_cache":
+            super().__setattr__(name, value)
+            return
+        super().__setattr__(name, _adopt(self, value))
+        self.invalidate()
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        for name, value in state.items():
+            self.__dict__[name] = _adopt(self, value)
+
+    def invalidate(self) -> None:
+        """Discard the cached Tikz code of the drawing object.
+
+        The output of `_command` is cached the first time the code of the drawing object is
+        generated. The cache is discarded whenever an attribute is assigned, the object is
+        transformed in place, or a Point or list assigned to one of its attributes is
+        modified, e.g. `line.start.x = 3` or `plot.points.append(pt)`. Other objects which
+        the code depends on must call this after they are modified.
+        """
+        self.__dict__.pop("_command_cache", None)
+
+    @property
+    def _cached_command(self) -> str:
+        """The output of `_command`, which is only regenerated after the drawing object changes."""
+        command = self.__dict__.get("_command_cache")
+        if command is None:
+            command = self._command
+            self.__dict__["_command_cache"] = command
+        return command
+
     @property
     def code(self) -> str:
         """Full Tikz code for this drawing object."""
-        draw_cmd = f"\\{self.action}{brackets(self.options)} {self._command}"
+        draw_cmd = f"\\{self.action}{brackets(self.options)} {self._cached_command}"
+        return draw_cmd + self._statement_end()
+
+    def _statement_end(self) -> str:
+        """The end of the statement which follows `_command`: its node, if any, and the semicolon."""
         if self.node is None:
-            return f"{draw_cmd};"
-        else:
-            return f"{draw_cmd} node{brackets(self.node.options)} {self.node._command};"
+            return ";"
+        return f" node{brackets(self.node.options)} {self.node._command};"
+
+    def code_chunks(self) -> Iterator[str]:
+        """Yields the code of the drawing object in chunks which join to `code`. Drawing objects
+        whose code can be very long, like plots of coordinate files, generate it piece by piece.
+        """
+        yield self.code
 
     def add_node(
         self, position: tuple | None = None, options: str = "", text: str = ""
@@ -98,3 +228,10 @@ class DrawingObject(ABC):
 
     def __repr__(self) -> str:
         return self.code
+
+
+def code_chunks(draw_obj) -> Iterator[str] | list[str]:
+    """The code of anything drawn in an environment in chunks, also for the objects which
+    are not DrawingObjects (nodes, clips, commands, ...)."""
+    chunks = getattr(draw_obj, "code_chunks", None)
+    return [draw_obj.code] if chunks is None else chunks()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from tikzpy.drawing_objects.drawing_object import DrawingObject
-from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.point import Point, bounding_box
 
 
 class Ellipse(DrawingObject):
@@ -70,18 +70,30 @@ class Ellipse(DrawingObject):
     def _command(self) -> str:
         return f"{self.center} ellipse ({self.x_axis}cm and {self.y_axis}cm)"
 
+    def bounding_box(self) -> tuple[Point, Point] | None:
+        """Returns the south west and north east corners of the smallest axis-aligned
+        rectangle containing the ellipse, or None if it is 3D."""
+        x, y, z = self.center.x, self.center.y, self.center.z
+        if z is not None:
+            return None
+        a, b = abs(self.x_axis), abs(self.y_axis)
+        return bounding_box([(x - a, y - b), (x + a, y + b)])
+
     def shift_(self, xshift: float, yshift: float) -> None:
         self._center.shift_(xshift, yshift)
+        self.invalidate()
 
     def scale_(self, scale: float) -> None:
         self._center.scale_(scale)
         self.x_axis *= scale
         self.y_axis *= scale
+        self.invalidate()
 
     def rotate_(
         self, angle: float, about_pt: tuple[float, float], radians: bool = False
     ) -> None:
         self._center.rotate_(angle, about_pt, radians)
+        self.invalidate()
 
     def shift(self, xshift: float, yshift: float) -> Ellipse:
         new_ellipse = self.copy()
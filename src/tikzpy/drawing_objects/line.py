@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from tikzpy.drawing_objects.drawing_object import DrawingObject
-from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.point import Point, bounding_box
 from tikzpy.utils.helpers import brackets
 
 
@@ -162,12 +162,21 @@ class Line(DrawingObject):
             return None
         return self.start.y - slope * self.start.x
 
+    def bounding_box(self) -> tuple[Point, Point] | None:
+        """Returns the south west and north east corners of the smallest axis-aligned
+        rectangle containing the line and its control points, or None if the line is 3D or
+        its to_options (e.g. "bend left") let TikZ decide its shape."""
+        if self.to_options:
+            return None
+        return bounding_box([self.start, self.end, *self.control_pts])
+
     def shift_(self, xshift: float, yshift: float) -> None:
         """Shift start, end, and control_pts"""
         self._start.shift_(xshift, yshift)
         self._end.shift_(xshift, yshift)
         for point in self.control_pts:
             point.shift_(xshift, yshift)
+        self.invalidate()
 
     def scale_(self, scale: float) -> None:
         """Scale start, end, and control_pts."""
@@ -175,6 +184,7 @@ class Line(DrawingObject):
         self._end.scale_(scale)
         for point in self.control_pts:
             point.scale_(scale)
+        self.invalidate()
 
     def rotate_(
         self,
@@ -191,6 +201,7 @@ class Line(DrawingObject):
 
         for point in self.control_pts:
             point.rotate_(angle, about_pt, radians)
+        self.invalidate()
 
     def shift(self, xshift: float, yshift: float) -> Line:
         """Shift start, end, and control_pts"""
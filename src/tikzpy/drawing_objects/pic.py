@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from math import degrees
+
+from tikzpy.drawing_objects.point import Point
+from tikzpy.utils.helpers import brackets
+
+
+class Pic:
+    r"""
+    A class to place a symbol, defined once with `TikzPicture.define_symbol`, in a tikz
+    environment.
+
+    This class is equivalent to the tikz code
+    ```
+    \pic[rotate=<rotate>, scale=<scale>, <options>] at (<position>) {<name>};
+    ```
+
+    Parameters:
+        name (str) : The name of the symbol
+        position (tuple) : Pair of floats representing the location of the symbol's origin
+        rotate (float) : The angle (in degrees) by which the symbol is rotated counterclockwise
+        scale (float) : The factor by which the symbol is scaled
+        options (str) : String containing further options of the pic (e.g., "red")
+    """
+
+    def __init__(
+        self,
+        name: str,
+        position: tuple[float, float] | Point = (0, 0),
+        rotate: float = 0,
+        scale: float = 1,
+        options: str = "",
+    ) -> None:
+        self.name = name
+        self.position = Point(position)
+        self.rotate_angle = rotate
+        self.scale_factor = scale
+        self.options = options
+
+    @property
+    def pic_options(self) -> str:
+        r"""The options of the \pic statement."""
+        pic_options = []
+        if self.rotate_angle != 0:
+            pic_options.append(f"rotate={self.rotate_angle}")
+        if self.scale_factor != 1:
+            pic_options.append(f"scale={self.scale_factor}")
+        if self.options:
+            pic_options.append(self.options)
+        return ", ".join(pic_options)
+
+    @property
+    def code(self) -> str:
+        return rf"\pic{brackets(self.pic_options)} at {self.position} {{{self.name}}};"
+
+    def shift_(self, xshift: float, yshift: float) -> None:
+        self.position.shift_(xshift, yshift)
+
+    def scale_(self, scale: float) -> None:
+        self.position.scale_(scale)
+        self.scale_factor *= scale
+
+    def rotate_(
+        self, angle: float, about_pt: tuple[float, float], radians: bool = False
+    ) -> None:
+        self.position.rotate_(angle, about_pt, radians)
+        self.rotate_angle += degrees(angle) if radians else angle
+
+    def shift(self, xshift: float, yshift: float) -> Pic:
+        new_pic = self.copy()
+        new_pic.shift_(xshift, yshift)
+        return new_pic
+
+    def scale(self, scale: float) -> Pic:
+        new_pic = self.copy()
+        new_pic.scale_(scale)
+        return new_pic
+
+    def rotate(
+        self, angle: float, about_pt: tuple[float, float], radians: bool = False
+    ) -> Pic:
+        new_pic = self.copy()
+        new_pic.rotate_(angle, about_pt, radians)
+        return new_pic
+
+    def copy(self, **kwargs: dict) -> Pic:
+        """Allows one to simultaneously make a (deep) copy of the pic and modify its
+        attributes in one step.
+        """
+        new_copy = deepcopy(self)
+        for attr, val in kwargs.items():
+            setattr(new_copy, attr, val)
+        return new_copy
+
+    def __repr__(self) -> str:
+        return self.code
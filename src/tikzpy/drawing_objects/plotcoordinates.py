@@ -1,7 +1,25 @@
+import os
+import re
+from array import array
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
 from tikzpy.drawing_objects.drawing_object import DrawingObject
-from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.point import Point, bounding_box
 from tikzpy.utils.helpers import brackets
 
+# The number of coordinates formatted at once when the code of a plot is streamed
+WINDOW_SIZE = 1 << 14
+# The prefix of the names of the data files of external plots
+DATA_FILE_PREFIX = "tikzpy_data_"
+# Every RESYNC_INTERVAL points of a relative plot, a point is written in absolute form
+RESYNC_INTERVAL = 100
+# Options which only act on plots, e.g. "mark=*" or "smooth", so that relative plots with
+# them in their options are written as plot coordinates
+PLOT_ONLY_OPTIONS = re.compile(
+    r"\b(marks?|smooth|sharp|const plot|jump mark|[xy]?comb|[xy]bar|tension)\b"
+)
+
 
 class PlotCoordinates(DrawingObject):
     r"""
@@ -16,29 +34,265 @@ class PlotCoordinates(DrawingObject):
     Parameters:
         options (str) : String containing drawing options (e.g., "Blue")
         plot_options (str) : String containing the plot options (e.g., "smooth cycle")
-        points (list) : A list of points to be drawn
+        points (list) : A list of points to be drawn. It can also be a 2D array with 2 or 3
+            columns, like a numpy array or memmap, or the path of a file of coordinates (see
+            below), whose coordinates are used without creating Point objects.
+        dtype (str) : The type of the coordinates in a raw binary file, e.g. "float64" (the
+            default) or "float32". `.npy` files give their own dtype and shape.
+        shape (tuple) : The (rows, columns) of a raw binary file, by default (-1, 2), where -1
+            rows means the whole file.
+        external (bool) : True to write the coordinates to a data file next to the TeX file
+            rather than into the Tikz code (see below).
+        relative (bool) : True to write the plot as a path of relative steps (see below).
+        precision (int) : The number of decimal places of the coordinates of relative plots.
+
+    Arrays and files of coordinates are memory-mapped where possible, and the code of their
+    plots is formatted in windows of coordinates as it is written out (see `code_chunks`), so
+    plots of files of several GB never need to fit in memory.
 
+    The coordinates of an external plot are written to a data file, which the code reads
+    with `plot file {<data_filename>}`, so that TeX does not tokenize them as part of the
+    source. The data file is named after the hash of its content and is written by
+    `TikzPicture.write`, `write_tex_file` and `compile` into the directory of the TeX file,
+    unless it already exists there. 3D plots are always written inline, as `plot file` only
+    reads 2D coordinates.
+
+    A relative plot is written as a polyline whose first point is absolute and whose other
+    points are short steps from the previous point, `(x, y) --++(dx,dy) --++(dx,dy) ...`,
+    which shrinks the code of dense plots of slowly varying data. The points are rounded
+    to precision decimal places, the steps are taken between the rounded points, steps of
+    zero length are left out, and every RESYNC_INTERVAL points a point is written in
+    absolute form again, so that the rounding of TeX's arithmetic cannot accumulate. Plots
+    with plot options (e.g. "smooth"), or with options which only act on plots (e.g.
+    "mark=*"), are always written as plot coordinates.
     """
 
     def __init__(
         self,
-        points: list[tuple] | Point,
+        points: list[tuple] | Point | str | os.PathLike,
         options: str = "",
         plot_options: str = "",
         action: str = "draw",
+        dtype: str | None = None,
+        shape: tuple[int, int] | None = None,
+        external: bool = False,
+        relative: bool = False,
+        precision: int = 4,
     ):
-        self.points = [Point(point) for point in points]
+        columns = _coordinate_columns(points, dtype, shape)
+        if columns is None:
+            self.points = [Point(point) for point in points]
+        else:
+            self._columns = columns
+            self._points = None
         self.options = options
         self.plot_options = plot_options
+        self.external = external
+        self.relative = relative
+        self.precision = precision
         super().__init__(action, self.options)
 
+    @classmethod
+    def from_columns(
+        cls,
+        xs: Sequence[float],
+        ys: Sequence[float],
+        zs: Sequence[float] | None = None,
+        options: str = "",
+        plot_options: str = "",
+        action: str = "draw",
+    ) -> "PlotCoordinates":
+        """Creates a plot from columns of x, y (and optionally z) coordinates.
+
+        Buffers such as `memoryview`, `array.array` or numpy arrays are used without copying
+        them, and the Point objects of the plot are only created once `points` is accessed.
+        The code of the plot is generated directly from the columns, so large plots which are
+        never modified are cheap to emit. The columns must not be modified afterwards.
+        """
+        columns = tuple(
+            _read_only(column) for column in (xs, ys, zs) if column is not None
+        )
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("The coordinate columns must have the same length")
+        plot = cls([], options, plot_options, action)
+        plot._columns = columns
+        plot._points = None
+        return plot
+
+    @property
+    def points(self) -> list[Point]:
+        """The list of points of the plot."""
+        if self._points is None:
+            self._points = [Point(coords) for coords in zip(*self._columns)]
+            self._columns = None
+        return self._points
+
+    @points.setter
+    def points(self, points: list[tuple] | list[Point]) -> None:
+        self._points = [Point(point) for point in points]
+        self._columns = None
+
+    def invalidate(self) -> None:
+        super().invalidate()
+        self.__dict__.pop("_data_filename_cache", None)
+
+    def __getstate__(self) -> dict:
+        # Views of buffers and memory-mapped files cannot be pickled, e.g. to render the
+        # code in a process pool, so their coordinates are copied into arrays
+        state = self.__dict__.copy()
+        if self._columns is not None:
+            state["_columns"] = tuple(_picklable(column) for column in self._columns)
+        return state
+
+    @property
+    def _cached_command(self) -> str:
+        # The code of large plots of coordinate columns, e.g. of memory-mapped files, would
+        # hold a copy of all their coordinates in memory, so it is regenerated instead
+        if self._is_large():
+            return self._command
+        return super()._cached_command
+
+    def _is_large(self) -> bool:
+        """Whether the plot is an inline plot of columns of more than WINDOW_SIZE points,
+        whose code is neither cached nor formatted at once by `code_chunks`."""
+        return (
+            self._columns is not None
+            and not self.external
+            and len(self._columns[0]) > WINDOW_SIZE
+        )
+
     @property
     def _command(self) -> str:
-        cmd: str = rf"plot{brackets(self.plot_options)} coordinates {{"
-        for pt in self.points:
-            cmd += str(pt) + " "
-        cmd += "}"
-        return cmd
+        data_filename = self.data_filename
+        if data_filename is not None:
+            return rf"plot{brackets(self.plot_options)} file {{{data_filename}}}"
+        if self._points is not None and not self._is_relative():
+            cmd = [rf"plot{brackets(self.plot_options)} coordinates {{"]
+            for pt in self._points:
+                cmd.append(str(pt) + " ")
+            cmd.append("}")
+            return "".join(cmd)
+        return "".join(self._command_chunks())
+
+    def _command_chunks(self) -> Iterator[str]:
+        """Yields `_command` for a plot of coordinate columns or a relative plot, a window of
+        coordinates at a time."""
+        if self._is_relative():
+            yield from self._relative_chunks()
+            return
+        yield rf"plot{brackets(self.plot_options)} coordinates {{"
+        columns = self._columns
+        for start in range(0, len(columns[0]), WINDOW_SIZE):
+            window = [column[start : start + WINDOW_SIZE] for column in columns]
+            if len(window) == 2:
+                yield "".join([f"({x}, {y}) " for x, y in zip(*window)])
+            else:
+                yield "".join([f"({x}, {y}, {z}) " for x, y, z in zip(*window)])
+        yield "}"
+
+    def _is_relative(self) -> bool:
+        return (
+            self.relative
+            and not self.plot_options
+            and not PLOT_ONLY_OPTIONS.search(self.options)
+        )
+
+    def _relative_chunks(self) -> Iterator[str]:
+        """Yields the path of a relative plot, a window of points at a time."""
+        precision = self.precision
+        previous = None
+        count = 0
+        for window in self._coordinate_windows():
+            steps = []
+            for coords in window:
+                rounded = [round(coord, precision) for coord in coords]
+                if previous is None or count % RESYNC_INTERVAL == 0:
+                    absolute = ", ".join([_decimal(c, precision) for c in rounded])
+                    separator = "" if previous is None else " -- "
+                    steps.append(f"{separator}({absolute})")
+                else:
+                    deltas = [
+                        _decimal(c - p, precision) for c, p in zip(rounded, previous)
+                    ]
+                    if all(delta == "0" for delta in deltas):
+                        continue
+                    steps.append(f" --++({','.join(deltas)})")
+                previous = rounded
+                count += 1
+            yield "".join(steps)
+
+    def _coordinate_windows(self) -> Iterator[list[tuple]]:
+        """Yields the coordinates of the plot as tuples, a window of points at a time."""
+        if self._points is not None:
+            for start in range(0, len(self._points), WINDOW_SIZE):
+                yield [tuple(pt) for pt in self._points[start : start + WINDOW_SIZE]]
+            return
+        columns = self._columns
+        for start in range(0, len(columns[0]), WINDOW_SIZE):
+            window = [column[start : start + WINDOW_SIZE] for column in columns]
+            yield list(zip(*window))
+
+    @property
+    def data_filename(self) -> str | None:
+        """The name of the data file of an external plot, which is derived from the hash of
+        its content, or None if the plot is written inline."""
+        if not self.external or self._is_3d():
+            return None
+        data_filename = self.__dict__.get("_data_filename_cache")
+        if data_filename is None:
+            import hashlib
+
+            digest = hashlib.sha256()
+            for chunk in self._data_chunks():
+                digest.update(chunk.encode("utf-8"))
+            data_filename = f"{DATA_FILE_PREFIX}{digest.hexdigest()[:16]}.table"
+            self.__dict__["_data_filename_cache"] = data_filename
+        return data_filename
+
+    def write_data_file(self, directory: str | Path) -> bool:
+        """Writes the data file of an external plot into directory, unless a file of that
+        name, and therefore with the same content, already exists. Returns whether the file
+        was written."""
+        from tikzpy.utils.files import atomic_write
+
+        data_filename = self.data_filename
+        if data_filename is None:
+            raise ValueError("Only external 2D plots have a data file")
+        data_filepath = Path(directory) / data_filename
+        if data_filepath.exists():
+            return False
+        atomic_write(data_filepath, self._data_chunks())
+        return True
+
+    def _data_chunks(self) -> Iterator[str]:
+        """Yields the content of the data file, one "x y" line per point, a window of points
+        at a time."""
+        if self._points is not None:
+            for start in range(0, len(self._points), WINDOW_SIZE):
+                window = self._points[start : start + WINDOW_SIZE]
+                yield "".join([f"{pt.x} {pt.y}\n" for pt in window])
+            return
+        xs, ys = self._columns
+        for start in range(0, len(xs), WINDOW_SIZE):
+            stop = start + WINDOW_SIZE
+            window = zip(xs[start:stop], ys[start:stop])
+            yield "".join([f"{x} {y}\n" for x, y in window])
+
+    def _is_3d(self) -> bool:
+        if self._points is not None:
+            return any(point.z is not None for point in self._points)
+        return len(self._columns) == 3
+
+    def code_chunks(self) -> Iterator[str]:
+        """Yields the code of the plot in chunks. The code of large plots of coordinate
+        columns is formatted a window of coordinates at a time, so that it never has to be
+        held in memory as a whole."""
+        if not self._is_large():
+            yield self.code
+            return
+        yield f"\\{self.action}{brackets(self.options)} "
+        yield from self._command_chunks()
+        yield self._statement_end()
 
     @property
     def center(self) -> "Point":
@@ -60,13 +314,26 @@ class PlotCoordinates(DrawingObject):
         mean_y = mean_y / len(self.points)
         return Point(mean_x, mean_y)
 
+    def bounding_box(self) -> tuple[Point, Point] | None:
+        """Returns the south west and north east corners of the smallest axis-aligned
+        rectangle containing the points of the plot, or None if it has no points or is 3D.
+        Smooth plots may bulge slightly out of it."""
+        if self._points is not None:
+            return bounding_box(self._points)
+        if len(self._columns) != 2 or len(self._columns[0]) == 0:
+            return None
+        xs, ys = self._columns
+        return Point(min(xs), min(ys)), Point(max(xs), max(ys))
+
     def shift_(self, xshift: float, yshift: float) -> None:
         for point in self.points:
             point.shift_(xshift, yshift)
+        self.invalidate()
 
     def scale_(self, scale: float) -> None:
         for point in self.points:
             point.scale_(scale)
+        self.invalidate()
 
     def rotate_(
         self,
@@ -78,6 +345,7 @@ class PlotCoordinates(DrawingObject):
             about_pt = self.center
         for point in self.points:
             point.rotate_(angle, about_pt, radians)
+        self.invalidate()
 
     def shift(self, xshift: float, yshift: float) -> None:
         new_plot = self.copy()
@@ -113,3 +381,56 @@ class PlotCoordinates(DrawingObject):
             None
         """
         self.points.append(Point(x, y))
+        self.invalidate()
+
+    def __deepcopy__(self, memo: dict) -> "PlotCoordinates":
+        # The coordinate columns are read-only, so copies share them
+        if self._columns is not None:
+            for column in self._columns:
+                memo[id(column)] = column
+        return super().__deepcopy__(memo)
+
+
+def _decimal(value: float, precision: int) -> str:
+    """Formats value with at most precision decimal places and no trailing zeros."""
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _coordinate_columns(
+    points, dtype: str | None, shape: tuple[int, int] | None
+) -> tuple[Sequence[float], ...] | None:
+    """Returns the columns of points if it is a file or an array of coordinates, or else None."""
+    if isinstance(points, (str, os.PathLike)):
+        from tikzpy.utils.coordinate_files import map_columns
+
+        return map_columns(points, dtype, shape)
+    if dtype is not None or shape is not None:
+        raise ValueError("dtype and shape can only be given for files of coordinates")
+    if isinstance(points, (list, tuple)):
+        return None
+    from tikzpy.utils.coordinate_files import buffer_columns
+
+    return buffer_columns(points)
+
+
+def _picklable(column: Sequence[float]) -> Sequence[float]:
+    """Returns a copy of column which can be pickled, if it is a memoryview, or else column."""
+    if not isinstance(column, memoryview):
+        return column
+    try:
+        values = array(column.format)
+    except ValueError:
+        return tuple(column.tolist())
+    values.frombytes(column.tobytes())
+    return values
+
+
+def _read_only(column: Sequence[float]) -> Sequence[float]:
+    """Returns a read-only view of column, without copying it if it is a buffer."""
+    try:
+        return memoryview(column).toreadonly()
+    except TypeError:
+        return tuple(column)
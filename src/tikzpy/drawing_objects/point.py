@@ -17,8 +17,14 @@ class Point:
         first_arg: A number, a tuple, or Point object.
         second_arg: A number, in the case of a 2D point, or None.
         third_arg: A number, in the case of a 3D point, or None.
+
+    A point which belongs to a drawing object, like the start of a Line, tells the drawing
+    object when its coordinates change, so that its cached Tikz code is discarded.
     """
 
+    # The drawing object which owns the point, set by DrawingObject.__setattr__
+    _owner = None
+
     def __init__(
         self,
         first_arg: Union[float, Number, tuple, "Point"],
@@ -28,35 +34,37 @@ class Point:
         # Check if attempting to construct from one tuple of two numeric types
         if isinstance(first_arg, tuple) and second_arg is None:
             if len(first_arg) == 2:
-                self.x, self.y = (
-                    first_arg[0],
-                    first_arg[1],
-                )
-                self.z = None
+                x, y = first_arg
+                z = None
             elif len(first_arg) == 3:
-                self.x, self.y, self.z = (first_arg[0], first_arg[1], first_arg[2])
+                x, y, z = first_arg
             else:
                 raise ValueError(
                     f"Recieved invalid tuple={first_arg} to Point constructor"
                 )
 
         elif isinstance(first_arg, Point) and second_arg is None:
-            self.x = first_arg.x
-            self.y = first_arg.y
-            self.z = None
-            if first_arg.z is not None:
-                self.z = first_arg.z
+            x, y, z = first_arg.x, first_arg.y, first_arg.z
 
         elif second_arg is not None:
-            self.x = first_arg
-            self.y = second_arg
-            self.z = None
-            if third_arg is not None:
-                self.z = third_arg
+            x, y, z = first_arg, second_arg, third_arg
         else:
             raise TypeError(
                 f"Invalid non-numeric types {type(first_arg)}, {type(second_arg)} supplied to Point class "
             )
+        # A new point has no owner to notify, so its coordinates bypass __setattr__
+        self.__dict__.update(x=x, y=y, z=z)
+
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        if self._owner is not None:
+            self._owner.invalidate()
+
+    def __getstate__(self) -> dict:
+        # Copies and unpickled points belong to nobody until a drawing object adopts them
+        state = self.__dict__.copy()
+        state.pop("_owner", None)
+        return state
 
     def distance(self, other_point):
         """
@@ -256,3 +264,14 @@ class Point:
         if isinstance(other, Point):
             return self.x == other.x and self.y == other.y and self.z == other.z
         return False
+
+
+def bounding_box(points) -> tuple[Point, Point] | None:
+    """Returns the south west and north east corners of the smallest axis-aligned rectangle
+    containing the (2D) points, or None if there are no points or one of them is 3D."""
+    points = [Point(point) for point in points]
+    if not points or any(point.z is not None for point in points):
+        return None
+    xs = [point.x for point in points]
+    ys = [point.y for point in points]
+    return Point(min(xs), min(ys)), Point(max(xs), max(ys))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from tikzpy.drawing_objects.drawing_object import DrawingObject
-from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.point import Point, bounding_box
 
 
 class Rectangle(DrawingObject):
@@ -137,18 +137,26 @@ class Rectangle(DrawingObject):
         else:
             raise TypeError(f"Invalid type '{type(new_corner)}' for left corner")
 
+    def bounding_box(self) -> tuple[Point, Point] | None:
+        """Returns the south west and north east corners of the rectangle, or None if it is
+        3D."""
+        return bounding_box([self.left_corner, self.right_corner])
+
     def shift_(self, xshift: float, yshift: float) -> None:
         self._left_corner.shift_(xshift, yshift)
+        self.invalidate()
 
     def scale_(self, scale: float) -> None:
         self._left_corner.scale_(scale)
         self.width = scale * self.width
         self.height = scale * self.height
+        self.invalidate()
 
     def rotate_(
         self, angle: float, about_pt: tuple[float, float], radians: bool = False
     ) -> None:
         self._left_corner.rotate_(angle, about_pt, radians)
+        self.invalidate()
 
     def shift(self, xshift: float, yshift: float) -> Rectangle:
         new_rectangle = self.copy()
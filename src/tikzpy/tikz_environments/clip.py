@@ -36,17 +36,28 @@ class Clip:
     @property
     def code(self) -> str:
         if self.draw:
-            return rf"\clip[preaction = {{draw, {self.draw_obj.options}}}] {self.draw_obj._command};"
+            return rf"\clip[preaction = {{draw, {self.draw_obj.options}}}] {self.draw_obj._cached_command};"
         else:
-            return rf"\clip {self.draw_obj._command};"
+            return rf"\clip {self.draw_obj._cached_command};"
 
-    def shift(self, xshift: float, yshift: float) -> None:
-        self.draw_obj.shift(xshift, yshift)
+    def shift_(self, xshift: float, yshift: float) -> None:
+        self.draw_obj.shift_(xshift, yshift)
 
-    def scale(self, scale: float) -> None:
-        self.draw_obj.scale(scale)
+    def scale_(self, scale: float) -> None:
+        self.draw_obj.scale_(scale)
 
-    def rotate(
+    def rotate_(
         self, angle: float, about_pt: tuple[float, float], radians: bool = False
     ) -> None:
-        self.draw_obj.rotate(angle, about_pt, radians)
+        self.draw_obj.rotate_(angle, about_pt, radians)
+
+    def shift(self, xshift: float, yshift: float) -> Clip:
+        return Clip(self.draw_obj.shift(xshift, yshift), draw=self.draw)
+
+    def scale(self, scale: float) -> Clip:
+        return Clip(self.draw_obj.scale(scale), draw=self.draw)
+
+    def rotate(
+        self, angle: float, about_pt: tuple[float, float], radians: bool = False
+    ) -> Clip:
+        return Clip(self.draw_obj.rotate(angle, about_pt, radians), draw=self.draw)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable
+
+from tikzpy.tikz_environments.scope import Scope
+from tikzpy.tikz_environments.tikz_environment import TikzEnvironment
+
+
+class Fragments:
+    """Scopes which worker threads build in parallel, before they are drawn in an
+    environment.
+
+    Each worker creates its scopes with `scope(key)` and draws into them; a scope should
+    only be used by the thread which created it. `attach()` then draws all the scopes in
+    the environment at once, in the order of their keys, so the code of the environment
+    does not depend on the order in which the threads ran. Used as a context manager, the
+    scopes are attached when the with block exits without an exception.
+
+    See `TikzEnvironment.fragments`.
+    """
+
+    def __init__(self, env: TikzEnvironment) -> None:
+        self.env = env
+        self._scopes: dict[Hashable, Scope] = {}
+        self._lock = threading.Lock()
+
+    def scope(
+        self, key: Hashable, options: str = "", transform: str = "objects"
+    ) -> Scope:
+        """Returns a new scope for the fragment with the given key. The keys of the fragments
+        must be distinct and comparable, e.g. integers or tuples of integers."""
+        scope = Scope(options, transform=transform)
+        with self._lock:
+            if key in self._scopes:
+                raise ValueError(f"A fragment with key {key!r} already exists")
+            self._scopes[key] = scope
+        return scope
+
+    def attach(self) -> list[Scope]:
+        """Draws the scopes created so far in the environment, in the order of their keys,
+        and returns them."""
+        with self._lock:
+            scopes = [self._scopes[key] for key in sorted(self._scopes)]
+            self._scopes.clear()
+        self.env.draw(*scopes)
+        return scopes
+
+    def __enter__(self) -> Fragments:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.attach()
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from tikzpy.drawing_objects.drawing_object import DrawingObject
+from collections.abc import Iterator
+from math import degrees
+
+from tikzpy.drawing_objects.drawing_object import DrawingObject, code_chunks
+from tikzpy.drawing_objects.point import Point
 from tikzpy.tikz_environments.clip import Clip
 from tikzpy.tikz_environments.tikz_environment import TikzEnvironment
 from tikzpy.utils.helpers import brackets
 
+# How Scope.shift, Scope.scale and Scope.rotate transform a scope
+TRANSFORM_MODES = ("objects", "options")
+
 
 class Scope(TikzEnvironment):
     r"""A class to create a scope environment.
@@ -18,43 +25,170 @@ class Scope(TikzEnvironment):
         ...
     \end{scope}
     ```
+
+    By default, `shift`, `scale` and `rotate` transform the drawing objects of the scope in
+    place. With `transform="options"`, the transformations are instead kept by the scope
+    and emitted as its options, e.g. `[rotate=30, shift={(1, 2)}]`, so they take constant
+    time however many objects the scope holds. `flatten()` applies them to the drawing
+    objects afterwards.
+
+    Parameters:
+        options: The options of the scope.
+        thread_safe: See TikzEnvironment.
+        transform: "objects" to transform the drawing objects, or "options" to emit the
+            transformations as options of the scope.
     """
 
-    def __init__(self, options: str = "") -> None:
-        super().__init__(options)
+    def __init__(
+        self, options: str = "", thread_safe: bool = False, transform: str = "objects"
+    ) -> None:
+        if transform not in TRANSFORM_MODES:
+            raise ValueError(
+                f"transform must be one of {', '.join(TRANSFORM_MODES)}, not {transform!r}"
+            )
+        super().__init__(options, thread_safe)
+        self.transform = transform
+        # The transformations of the scope which are emitted as options, in the order in
+        # which they were applied: ("shift", x, y), ("scale", scale) or
+        # ("rotate", degrees, about_pt)
+        self.transforms: list[tuple] = []
 
     @property
     def code(self) -> str:
         """A string contaning the drawing_objects in the scope."""
-        code = f"\\begin{{scope}}{brackets(self.options)}\n"
-        for draw_obj in self.drawing_objects:
-            code += "\t" + draw_obj.code + "\n"
-        code += "\\end{scope}\n"
-        return code
+        with self._lock:
+            drawing_objects = list(self.drawing_objects)
+        lines = [f"\\begin{{scope}}{brackets(self.all_options)}\n"]
+        for draw_obj in drawing_objects:
+            lines.append("\t" + draw_obj.code + "\n")
+        lines.append("\\end{scope}\n")
+        return "".join(lines)
+
+    def code_chunks(self) -> Iterator[str]:
+        """Yields `code` in chunks, see `DrawingObject.code_chunks`."""
+        with self._lock:
+            drawing_objects = list(self.drawing_objects)
+        yield f"\\begin{{scope}}{brackets(self.all_options)}\n"
+        for draw_obj in drawing_objects:
+            yield "\t"
+            yield from code_chunks(draw_obj)
+            yield "\n"
+        yield "\\end{scope}\n"
 
     def __repr__(self) -> str:
         return self.code
 
     def append(self, *args: list[DrawingObject]) -> None:
         """Append a drawing object to the scope statement"""
-        for draw_obj in args:
-            self.drawing_objects.append(draw_obj)
+        self.draw(*args)
 
     def clip(self, draw_obj: DrawingObject, draw: bool = False) -> None:
         """Clip a drawing object in the scope environment"""
         clip = Clip(draw_obj, draw=draw)
         self.draw(clip)
 
+    @property
+    def all_options(self) -> str:
+        """The options of the scope, preceded by its transformations. TikZ applies the
+        transformations in an option list from last to first, so they are listed in the
+        reverse of the order in which they were applied."""
+        transform_options = [_transform_option(*t) for t in reversed(self.transforms)]
+        return ", ".join(transform_options + ([self.options] if self.options else []))
+
     def shift(self, xshift: float, yshift: float) -> None:
-        for draw_obj in self.drawing_objects:
-            draw_obj.shift(xshift, yshift)
+        """Shifts the scope by (xshift, yshift)."""
+        if self.transform == "objects":
+            self._transform_objects("shift", xshift, yshift)
+            return
+        with self._lock:
+            if self.transforms and self.transforms[-1][0] == "shift":
+                _, x, y = self.transforms.pop()
+                xshift, yshift = x + xshift, y + yshift
+            self.transforms.append(("shift", xshift, yshift))
 
     def scale(self, scale: float) -> None:
-        for draw_obj in self.drawing_objects:
-            draw_obj.scale(scale)
+        """Scales the scope by scale about the origin."""
+        if self.transform == "objects":
+            self._transform_objects("scale", scale)
+            return
+        with self._lock:
+            if self.transforms and self.transforms[-1][0] == "scale":
+                scale *= self.transforms.pop()[1]
+            self.transforms.append(("scale", scale))
 
     def rotate(
-        self, angle: float, about_pt: tuple[float, float], radians: bool = False
+        self,
+        angle: float,
+        about_pt: tuple[float, float] | None = None,
+        radians: bool = False,
     ) -> None:
-        for draw_obj in self.drawing_objects:
-            draw_obj.rotate(angle, about_pt, radians)
+        """Rotates the scope counterclockwise by angle about about_pt (by default the
+        origin). With `transform="options"`, this emits a `rotate` or `rotate around`
+        option."""
+        if radians:
+            angle = degrees(angle)
+        if about_pt is not None:
+            about_pt = Point(about_pt)
+        if self.transform == "objects":
+            self._transform_objects("rotate", angle, about_pt)
+            return
+        with self._lock:
+            if self.transforms and self.transforms[-1][::2] == ("rotate", about_pt):
+                angle += self.transforms.pop()[1]
+            self.transforms.append(("rotate", angle, about_pt))
+
+    def _transform_objects(self, name: str, *args) -> None:
+        """Applies a transformation to the drawing objects of the scope, in place. Nested
+        scopes are transformed by their own method, so that a transformation emitted as
+        options applies after theirs."""
+        with self._lock:
+            drawing_objects = list(self.drawing_objects)
+        for draw_obj in drawing_objects:
+            if isinstance(draw_obj, Scope):
+                getattr(draw_obj, name)(*args)
+            else:
+                _apply_transform(draw_obj, name, *args)
+
+    def flatten(self) -> None:
+        """Applies the transformations emitted as options of the scope, and of the scopes
+        nested in it, to their drawing objects, e.g. for code which needs their coordinates
+        in the picture. The transformations which follow still depend on `transform`.
+
+        Drawing objects are transformed as by their own `shift_`, `scale_` and `rotate_`
+        methods: rotations move the positions of rectangles, ellipses and arcs, but do not
+        turn their axes, unlike the `rotate` option of TikZ. Objects which cannot be
+        transformed, like TikzCommands, are left as they are.
+        """
+        with self._lock:
+            for draw_obj in self.drawing_objects:
+                if isinstance(draw_obj, Scope):
+                    draw_obj.flatten()
+            for transform in self.transforms:
+                for draw_obj in self.drawing_objects:
+                    _apply_transform(draw_obj, *transform)
+            self.transforms.clear()
+
+
+def _transform_option(name: str, *args) -> str:
+    if name == "shift":
+        return f"shift={{({args[0]}, {args[1]})}}"
+    if name == "scale":
+        return f"scale={args[0]}"
+    angle, about_pt = args
+    if about_pt is None:
+        return f"rotate={angle}"
+    return f"rotate around={{{angle}:{about_pt}}}"
+
+
+def _apply_transform(draw_obj, name: str, *args) -> None:
+    """Applies a transformation of a scope to one of its (flattened) objects, in place."""
+    if isinstance(draw_obj, Scope):
+        for child in draw_obj.drawing_objects:
+            _apply_transform(child, name, *args)
+        return
+    if name == "rotate":
+        angle, about_pt = args
+        args = (angle, (0, 0) if about_pt is None else about_pt)
+    transform = getattr(draw_obj, name + "_", None)
+    if transform is not None:
+        transform(*args)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, nullcontext
+from typing import TYPE_CHECKING
 
 from tikzpy.drawing_objects.arc import Arc
 from tikzpy.drawing_objects.circle import Circle
@@ -24,23 +27,90 @@ from tikzpy.drawing_objects.rectangle import (
 )
 from tikzpy.tikz_environments.tikz_command import TikzCommand
 
+if TYPE_CHECKING:
+    import os
+
+    from tikzpy.tikz_environments.fragments import Fragments
+
 
 class TikzEnvironment(ABC):
-    def __init__(self, options: str) -> None:
+    """The base class of environments, which hold drawing objects.
+
+    If thread_safe is True, the methods of the environment can be called from several
+    threads at once: they hold a lock while modifying the environment, so that e.g. the
+    objects of one `draw()` call stay together and styles are not lost. Objects drawn from
+    several threads are in the order in which the calls took the lock; use `fragments()` to
+    build parts of an environment in parallel in a deterministic order.
+    """
+
+    def __init__(self, options: str, thread_safe: bool = False) -> None:
         self.options = options
         self.drawing_objects = []
+        self._lock = _new_lock(thread_safe)
+
+    @property
+    def thread_safe(self) -> bool:
+        return not isinstance(self._lock, nullcontext)
+
+    def __getstate__(self) -> dict:
+        # Locks cannot be copied or pickled, so copies get a lock of their own
+        state = self.__dict__.copy()
+        state["_lock"] = self.thread_safe
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["_lock"] = _new_lock(state["_lock"])
+        self.__dict__.update(state)
 
     def draw(self, *args: list[DrawingObject]) -> None:
         """Add an arbitrary sequence of drawing objects."""
-        for draw_obj in args:
-            self.drawing_objects.append(draw_obj)
+        with self._lock:
+            self.drawing_objects.extend(args)
+
+    def walk(self) -> Iterator:
+        """Yield every object in the environment, descending into nested environments.
+
+        Nested environments (e.g. a `Scope`) are yielded before their contents.
+        """
+        with self._lock:
+            drawing_objects = list(self.drawing_objects)
+        for draw_obj in drawing_objects:
+            yield draw_obj
+            if isinstance(draw_obj, TikzEnvironment):
+                yield from draw_obj.walk()
+
+    def fragments(self) -> Fragments:
+        """Returns a `Fragments` object, with which worker threads can build scopes in
+        parallel before they are drawn in this environment in a deterministic order.
+
+        ```python
+        from concurrent.futures import ThreadPoolExecutor
+        from tikzpy import TikzPicture
+
+        tikz = TikzPicture()
+
+        def draw_row(fragments, row):
+            scope = fragments.scope(key=row)
+            for col in range(100):
+                scope.circle((col, row), 0.4)
+
+        with tikz.fragments() as fragments, ThreadPoolExecutor() as pool:
+            for row in range(100):
+                pool.submit(draw_row, fragments, row)
+        # The scopes are drawn in the order of their rows
+        ```
+        """
+        from tikzpy.tikz_environments.fragments import Fragments
+
+        return Fragments(self)
 
     def add_option(self, option: str) -> None:
         """Add an option to the set of options."""
-        if len(self.options) == 0:
-            self.options += option
-        else:
-            self.options += f", {option}"
+        with self._lock:
+            if len(self.options) == 0:
+                self.options += option
+            else:
+                self.options += f", {option}"
 
     def add_command(self, tikz_statement: str) -> TikzCommand:
         """Add a string of valid Tikz code into the Tikz environment."""
@@ -70,13 +140,31 @@ class TikzEnvironment(ABC):
 
     def plot_coordinates(
         self,
-        points: list[tuple] | list[Point],
+        points: list[tuple] | list[Point] | str | os.PathLike,
         options: str = "",
         plot_options: str = "",
         action: str = "draw",
+        dtype: str | None = None,
+        shape: tuple[int, int] | None = None,
+        external: bool = False,
+        relative: bool = False,
+        precision: int = 4,
     ) -> PlotCoordinates:
-        """Draws a plot coordinates statement by creating an instance of the PlotCoordinates class."""
-        plot = PlotCoordinates(points, options, plot_options, action)
+        """Draws a plot coordinates statement by creating an instance of the PlotCoordinates class.
+        points can also be an array or the path of a file of coordinates, external plots read
+        their coordinates from a data file, and relative plots are written as relative steps,
+        see PlotCoordinates."""
+        plot = PlotCoordinates(
+            points,
+            options,
+            plot_options,
+            action,
+            dtype,
+            shape,
+            external,
+            relative,
+            precision,
+        )
         self.draw(plot)
         return plot
 
@@ -356,3 +444,13 @@ class TikzEnvironment(ABC):
         )
         self.draw(arc)
         return arc
+
+
+def _new_lock(thread_safe: bool) -> AbstractContextManager:
+    """Returns a reentrant lock if thread_safe, and otherwise a context manager which does
+    nothing."""
+    if not thread_safe:
+        return nullcontext()
+    import threading
+
+    return threading.RLock()
@@ -1,22 +1,40 @@
-import re
-import shutil
-import subprocess
-import tempfile
+from __future__ import annotations
+
+import time
 import warnings
-import webbrowser
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import nullcontext
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from tikzpy.drawing_objects.drawing_object import DrawingObject, code_chunks
+from tikzpy.drawing_objects.node import Node
+from tikzpy.drawing_objects.pic import Pic
+from tikzpy.drawing_objects.plotcoordinates import DATA_FILE_PREFIX, PlotCoordinates
 from tikzpy.templates.tex_file import TEX_FILE
+from tikzpy.tikz_environments.clip import Clip
 from tikzpy.tikz_environments.scope import Scope
 from tikzpy.tikz_environments.tikz_environment import TikzEnvironment
 from tikzpy.tikz_environments.tikz_style import TikzStyle
-from tikzpy.utils.helpers import (
-    brackets,
-    extract_error_content,
-    in_notebook,
-    true_posix_path,
+from tikzpy.utils.files import (
+    atomic_copy,
+    atomic_move,
+    atomic_write_bytes,
+    file_digest,
+    file_lock,
+    write_file,
 )
-from tikzpy.utils.types import CompileError
+from tikzpy.utils.helpers import brackets, in_notebook, true_posix_path
+
+if TYPE_CHECKING:
+    import subprocess
+
+    from tikzpy.drawing_objects.point import Point
+    from tikzpy.utils.instrumentation import EventCallback
+    from tikzpy.utils.types import Diagnostic, ResourceUsage
+    from tikzpy.utils.workspace import Workspace
 
 
 class TikzPicture(TikzEnvironment):
@@ -30,14 +48,23 @@ class TikzPicture(TikzEnvironment):
     Parameters:
         center: True/False if one wants to center their Tikz code
         options: A list of options for the Tikz picture
+        thread_safe: True if the picture is modified from several threads at once (see
+            `TikzEnvironment`)
     """
 
     def __init__(
-        self, center: bool = False, options: str = "", tikz_code_dir=None
+        self,
+        center: bool = False,
+        options: str = "",
+        tikz_code_dir=None,
+        thread_safe: bool = False,
     ) -> None:
-        super().__init__(options)
+        super().__init__(options, thread_safe)
         self._preamble = {}
         self._postamble = {}
+        self._interned_styles: dict[str, TikzStyle] = {}
+        self.diagnostics: list[Diagnostic] = []
+        self.resource_usage: ResourceUsage | None = None
         self.BASE_DIR = None
 
         if tikz_code_dir is not None:
@@ -50,23 +77,61 @@ class TikzPicture(TikzEnvironment):
             self._preamble["center"] = ""
             self._postamble["center"] = ""
 
-    def code(self) -> str:
-        """Returns a string contaning the generated Tikz code."""
-        code = ""
+    def code(self, processes: int = 1, start_method: str | None = None) -> str:
+        """Returns a string contaning the generated Tikz code.
+
+        Parameters:
+            processes: The number of processes which render the code of the drawing objects.
+                If it is more than 1, the drawing objects are split into chunks which are
+                rendered in a process pool, which speeds up the first rendering of very large
+                pictures (at least a few hundred thousand objects). The code cached by the
+                drawing objects of this process is then left as it was.
+            start_method: How the processes are started: "fork", "spawn", "forkserver" or
+                None, for the default of multiprocessing. "fork" is the fastest, but unsafe
+                while other threads of this process are running.
+        """
+        with self._lock:
+            code = list(self._preamble.values())
+            drawing_objects = list(self.drawing_objects)
+            postamble = list(self._postamble.values())
+
         # Add the beginning statement
-        for stmt in self._preamble.values():
-            code += stmt
-        code += f"\\begin{{tikzpicture}}{brackets(self.options)}\n"
+        code.append(f"\\begin{{tikzpicture}}{brackets(self.options)}\n")
 
-        # Add the main tikz code
-        for draw_obj in self.drawing_objects:
-            code += "    " + draw_obj.code + "\n"
+        # Add the main tikz code. Drawing objects cache their code, so only
+        # the objects which changed since the last call are regenerated.
+        if processes > 1:
+            from tikzpy.utils.parallel import render_code
+
+            code.append(
+                render_code(drawing_objects, processes, start_method=start_method)
+            )
+        else:
+            for draw_obj in drawing_objects:
+                code.append("    " + draw_obj.code + "\n")
 
         # Add the ending statement
-        code += "\\end{tikzpicture}\n"
-        for stmt in list(reversed(list(self._postamble.values()))):
-            code += stmt
-        return code
+        code.append("\\end{tikzpicture}\n")
+        code.extend(reversed(postamble))
+        return "".join(code)
+
+    def code_chunks(self) -> Iterator[str]:
+        """Yields the Tikz code of `code()` in chunks. The code of large plots of coordinate
+        files is formatted as it is consumed, so writing it to a file never holds all of it in
+        memory (see `PlotCoordinates`)."""
+        with self._lock:
+            preamble = list(self._preamble.values())
+            drawing_objects = list(self.drawing_objects)
+            postamble = list(self._postamble.values())
+
+        yield from preamble
+        yield f"\\begin{{tikzpicture}}{brackets(self.options)}\n"
+        for draw_obj in drawing_objects:
+            yield "    "
+            yield from code_chunks(draw_obj)
+            yield "\n"
+        yield "\\end{tikzpicture}\n"
+        yield from reversed(postamble)
 
     def __repr__(self) -> str:
         readable_code = f"\\begin{{tikzpicture}}{brackets(self.options)}\n"
@@ -85,8 +150,233 @@ class TikzPicture(TikzEnvironment):
 
     def add_styles(self, *styles: list[TikzStyle]) -> None:
         """Add a TikzStyle object to the environment."""
-        for style in styles:
-            self._preamble[f"tikz_style:{style.style_name}"] = style.code
+        with self._lock:
+            for style in styles:
+                self._preamble[f"tikz_style:{style.style_name}"] = style.code
+
+    def define_symbol(self, name: str, scope: Scope) -> None:
+        r"""Defines the contents of scope as a symbol, which can then be placed any number of
+        times with `place`. The symbol is emitted once, as a TikZ pic in the preamble, and
+        each placement is a single \pic statement, so the memory used by Python and the size
+        of the TeX file grow with the number of symbols rather than with the number of
+        placements. TeX still runs the code of the symbol at every placement, so the time it
+        takes grows with the number of placements, as if the objects had been drawn one by
+        one.
+
+        The code of the symbol is taken when it is defined, so the scope can be discarded
+        afterwards. Defining a symbol again replaces it.
+
+        ```python
+        from tikzpy import Scope, TikzPicture
+
+        tikz = TikzPicture()
+        neuron = Scope()
+        neuron.circle((0, 0), 0.5, options="fill=blue!20")
+        neuron.line((-0.3, 0), (0.3, 0))
+        tikz.define_symbol("neuron", neuron)
+        for layer in range(3):
+            for idx in range(100):
+                tikz.place("neuron", at=(2 * layer, idx))
+        ```
+        """
+        lines = [f"\\tikzset{{{name}/.pic={{\n"]
+        with scope._lock:
+            drawing_objects = list(scope.drawing_objects)
+        indent = "    "
+        if scope.all_options:
+            lines.append(f"    \\begin{{scope}}[{scope.all_options}]\n")
+            indent = "        "
+        for draw_obj in drawing_objects:
+            lines.append(indent + draw_obj.code + "\n")
+        if scope.all_options:
+            lines.append("    \\end{scope}\n")
+        lines.append("}}\n")
+        with self._lock:
+            self._preamble[f"symbol:{name}"] = "".join(lines)
+
+    def place(
+        self,
+        name: str,
+        at: tuple[float, float] | Point = (0, 0),
+        rotate: float = 0,
+        scale: float = 1,
+        options: str = "",
+    ) -> Pic:
+        """Places the symbol called name (see `define_symbol`) with its origin at the point
+        at, rotated counterclockwise by rotate degrees and scaled by scale."""
+        if f"symbol:{name}" not in self._preamble:
+            raise ValueError(f"No symbol named {name!r} has been defined")
+        pic = Pic(name, at, rotate, scale, options)
+        self.draw(pic)
+        return pic
+
+    def intern_options(self, min_uses: int = 2) -> list[TikzStyle]:
+        r"""Lift option strings that repeat across the picture into named styles.
+
+        Every option string used by at least `min_uses` drawing objects or nodes is added
+        to the preamble as a `TikzStyle`, and those objects are rewritten to reference the
+        style by name. This shrinks the code of large pictures that reuse the same options
+        many times. Returns the newly created styles.
+
+        ```python
+        from tikzpy import TikzPicture
+
+        tikz = TikzPicture()
+        for x in range(5):
+            tikz.circle((x, 0), 0.3, options="fill=ProcessBlue!50")
+        tikz.intern_options()
+        print(tikz.code())  # Each circle is drawn with \draw[tikzpy_style_0]
+        ```
+        """
+        with self._lock:
+            holders = []
+            for obj in self.walk():
+                if isinstance(obj, Clip):
+                    if not obj.draw:
+                        continue
+                    obj = obj.draw_obj
+                if isinstance(obj, (DrawingObject, Node)):
+                    holders.append(obj)
+                if isinstance(obj, DrawingObject) and obj.node is not None:
+                    holders.append(obj.node)
+
+            # Skip options that already name an interned style, and parameterized
+            # options (#1), which cannot be used as the body of a plain style.
+            style_names = {
+                style.style_name for style in self._interned_styles.values()
+            }
+            uses = Counter(
+                obj.options
+                for obj in holders
+                if obj.options
+                and obj.options not in style_names
+                and "#" not in obj.options
+            )
+            new_styles = []
+            for options, count in uses.items():
+                if count < min_uses or options in self._interned_styles:
+                    continue
+                style_id = len(self._interned_styles)
+                while f"tikz_style:tikzpy_style_{style_id}" in self._preamble:
+                    style_id += 1
+                style = self.tikzset(f"tikzpy_style_{style_id}", options)
+                self._interned_styles[options] = style
+                new_styles.append(style)
+
+            for obj in holders:
+                style = self._interned_styles.get(obj.options)
+                if style is not None:
+                    obj.options = style.style_name
+            return new_styles
+
+    def cull(
+        self,
+        viewport: tuple[tuple[float, float], tuple[float, float]] | None = None,
+        margin: float = 0,
+    ) -> int:
+        """Removes the drawing objects which lie entirely outside the clip regions of the
+        picture (see `Scope.clip`) or outside viewport, so that TeX does not process them.
+        Plots are trimmed to the runs of points which can be seen. Returns the number of
+        removed drawing objects.
+
+        Parameters:
+            viewport: The south west and north east corners of the visible part of the
+                picture, in the coordinates of its drawing objects. Objects which are partly
+                visible are kept whole, so the viewport is usually also clipped.
+            margin: The distance by which the bounding boxes of drawing objects are grown,
+                e.g. to account for the widths of their lines.
+
+        Objects are culled by their bounding boxes (see e.g. `Circle.bounding_box`). Nodes,
+        commands, 3D objects and objects whose options transform them are always kept, as
+        their extent is only known to TeX. So are the contents of scopes which transform
+        them, unless they are clipped inside the scope. Transformations hidden in styles are
+        not detected.
+
+        ```python
+        tikz = TikzPicture()
+        scope = tikz.scope()
+        scope.clip(Rectangle((0, 0), 2, 2))
+        for x in range(100):
+            scope.circle((x, 0), 0.5)
+        tikz.cull()  # Removes the 97 circles to the right of the clip
+        ```
+        """
+        from tikzpy.utils.culling import cull
+
+        return cull(self, viewport, margin)
+
+    def to_dict(self) -> dict:
+        """Returns the picture as a dict of plain Python values, which can be saved as JSON and
+        loaded with `TikzPicture.from_dict`. The dict covers the drawing objects, scopes,
+        clips, styles and commands of the picture, but not its tikz_code_dir.
+
+        ```python
+        import json
+        from tikzpy import TikzPicture
+
+        tikz = TikzPicture()
+        tikz.circle((0, 0), 1)
+        data = json.dumps(tikz.to_dict())
+        assert TikzPicture.from_dict(json.loads(data)).code() == tikz.code()
+        ```
+        """
+        from tikzpy.utils.serialization import to_dict
+
+        return to_dict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict, tikz_code_dir=None) -> TikzPicture:
+        """Recreates a picture from the dict returned by `to_dict`."""
+        from tikzpy.utils.serialization import from_dict
+
+        return cls._loaded(from_dict(data), tikz_code_dir)
+
+    def to_bytes(self) -> bytes:
+        """Encodes the picture in a compact binary format, which can be loaded with
+        `TikzPicture.from_bytes`. Coordinates are stored as arrays, e.g. one per axis for the
+        points of a PlotCoordinates."""
+        from tikzpy.utils.serialization import to_bytes
+
+        return to_bytes(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, tikz_code_dir=None) -> TikzPicture:
+        """Recreates a picture from the bytes returned by `to_bytes`. The coordinates of
+        plots are read from data without being copied."""
+        from tikzpy.utils.serialization import from_bytes
+
+        return cls._loaded(from_bytes(data), tikz_code_dir)
+
+    @classmethod
+    def from_tex(cls, code: str, tikz_code_dir=None) -> TikzPicture:
+        r"""Parses the first tikzpicture environment in code, e.g. one written by hand or by
+        `code()`. Paths drawn with `\draw`, `\fill`, `\filldraw` and `\path`, nodes, clips
+        and scopes become drawing objects, and any other statement is kept as a TikzCommand.
+
+        ```python
+        tikz = TikzPicture.from_tex(r"\begin{tikzpicture} \draw (0, 0) -- (1, 1); \end{tikzpicture}")
+        tikz.drawing_objects[0].shift_(1, 0)
+        ```
+        """
+        from tikzpy.utils.tikz_parser import parse_tikz
+
+        return cls._loaded(parse_tikz(code), tikz_code_dir)
+
+    @classmethod
+    def from_tex_file(cls, filepath: str | Path, tikz_code_dir=None) -> TikzPicture:
+        """Parses the first tikzpicture environment in a .tex file, which is read line by
+        line. See `from_tex`."""
+        from tikzpy.utils.tikz_parser import load_tikz
+
+        return cls._loaded(load_tikz(filepath), tikz_code_dir)
+
+    @staticmethod
+    def _loaded(tikz, tikz_code_dir) -> TikzPicture:
+        if not isinstance(tikz, TikzPicture):
+            raise TypeError(f"Expected a TikzPicture, but found {type(tikz).__name__}")
+        if tikz_code_dir is not None:
+            tikz.BASE_DIR = Path(tikz_code_dir)
+        return tikz
 
     def set_tdplotsetmaincoords(self, theta: float, phi: float) -> None:
         """Specify the viewing angle for 3D.
@@ -94,22 +384,63 @@ class TikzPicture(TikzEnvironment):
         theta: The angle (in degrees) through which the coordinate frame is rotated about the x axis.
         phi: The angle (in degrees) through which the coordinate frame is rotated about the z axis.
         """
-        self.tdplotsetmaincoords = (theta, phi)
-        self._preamble["tdplotsetmaincoords"] = (
-            f"\\tdplotsetmaincoords{{{theta}}}{{{phi}}}\n"
-        )
+        with self._lock:
+            self.tdplotsetmaincoords = (theta, phi)
+            self._preamble["tdplotsetmaincoords"] = (
+                f"\\tdplotsetmaincoords{{{theta}}}{{{phi}}}\n"
+            )
+
+    def _tex_file_chunks(self) -> Iterator[str]:
+        """Yields the contents of a standalone TeX file containing the Tikz code, in chunks."""
+        head, _, tail = TEX_FILE.partition("fillme")
+        yield head
+        yield from self.code_chunks()
+        yield tail
+
+    def write_tex_file(
+        self, tex_filepath, only_if_changed: bool = False, lock: bool = False
+    ) -> bool:
+        """Writes a standalone TeX file containing the Tikz code.
+
+        The file is written to a temporary file first and then atomically moved into place,
+        so other processes never read a partially written file.
 
-    def write_tex_file(self, tex_filepath):
-        tex_code = TEX_FILE
-        tex_file_contents = re.sub("fillme", lambda x: self.code(), tex_code)
+        Parameters:
+            tex_filepath: The file path of the TeX file, relative to the tikz_code_dir if one was set.
+            only_if_changed: If True, the file is only replaced when its content differs from the
+                content already on disk, so that the modification time of an unchanged file is
+                preserved for build tools like make.
+            lock: If True, hold an exclusive lock on "<tex_filepath>.lock" while writing, so that
+                concurrent processes writing the same file are serialized.
+
+        Returns whether the file was written.
+        """
         # Update the TeX file
         if self.BASE_DIR is not None:
             tex_filepath = self.BASE_DIR / tex_filepath
 
-        with open(tex_filepath, "w") as f:
-            f.write(tex_file_contents)
+        self._write_data_files(Path(tex_filepath).parent)
+        return write_file(tex_filepath, self._tex_file_chunks(), only_if_changed, lock)
+
+    def write(
+        self, tikz_code_filepath=None, only_if_changed: bool = False, lock: bool = False
+    ) -> bool:
+        """Writes the Tikz code to a file, by default "tikz_code.tex".
 
-    def write(self, tikz_code_filepath=None):
+        The file is written to a temporary file first and then atomically moved into place,
+        so other processes never read a partially written file.
+
+        Parameters:
+            tikz_code_filepath: The file path of the Tikz code, relative to the tikz_code_dir if one
+                was set, or else the current working directory.
+            only_if_changed: If True, the file is only replaced when its content differs from the
+                content already on disk, so that the modification time of an unchanged file is
+                preserved for build tools like make.
+            lock: If True, hold an exclusive lock on "<tikz_code_filepath>.lock" while writing, so
+                that concurrent processes writing the same file are serialized.
+
+        Returns whether the file was written.
+        """
         if tikz_code_filepath is None:
             tikz_code_filepath = "tikz_code.tex"
 
@@ -118,63 +449,397 @@ class TikzPicture(TikzEnvironment):
             base_dir = self.BASE_DIR
 
         tikz_code_filepath = base_dir / tikz_code_filepath
-        with open(tikz_code_filepath, "w") as f:
-            f.write(self.code())
+        self._write_data_files(tikz_code_filepath.parent)
+        return write_file(
+            tikz_code_filepath, self.code_chunks(), only_if_changed, lock
+        )
 
-    def compile(self, pdf_destination: str | None = None, quiet: bool = True) -> Path:
+    def _write_data_files(self, directory: Path) -> int:
+        """Writes the data files of the external plots of the picture (see PlotCoordinates)
+        into directory, except those which already exist there. Returns the number of data
+        files written."""
+        written = 0
+        for draw_obj in self.walk():
+            if isinstance(draw_obj, Clip):
+                draw_obj = draw_obj.draw_obj
+            if isinstance(draw_obj, PlotCoordinates) and draw_obj.data_filename:
+                written += draw_obj.write_data_file(directory)
+        return written
+
+    def object_index_at_line(self, line: int, first_line: int = 1) -> int | None:
+        """Returns the index in drawing_objects of the drawing object whose code contains the
+        given line of code(), or None if the line belongs to no drawing object. first_line is
+        the line number at which code() begins, e.g. within a TeX file.
+        """
+        return self._object_index_map(first_line)(line)
+
+    def _object_index_map(self, first_line: int = 1):
+        """Returns a function which maps a line of code() to the index of a drawing object.
+        The line table is built once in a single pass, and each lookup is a binary search."""
+        # code() begins with the preamble, then \begin{tikzpicture} takes one line, so after
+        # counting the lines of the preamble this is the line of the first drawing object
+        line = first_line + 1
+        for stmt in self._preamble.values():
+            line += stmt.count("\n")
+        start_lines = []
+        for draw_obj in self.drawing_objects:
+            start_lines.append(line)
+            line += sum(chunk.count("\n") for chunk in code_chunks(draw_obj)) + 1
+        end_line = line
+
+        def object_index(tex_line: int) -> int | None:
+            if len(start_lines) == 0 or not start_lines[0] <= tex_line < end_line:
+                return None
+            return bisect_right(start_lines, tex_line) - 1
+
+        return object_index
+
+    def _read_diagnostics(self, logfile: Path) -> list[Diagnostic]:
+        """Parses the log file of a compiled TeX file (see _tex_file_chunks) into Diagnostics,
+        which are mapped back to the drawing objects that caused them."""
+        from tikzpy.utils.tex_log import parse_log_file
+
+        diagnostics = parse_log_file(logfile)
+        if any(diagnostic.line is not None for diagnostic in diagnostics):
+            first_line = TEX_FILE.partition("fillme")[0].count("\n") + 1
+            object_index = self._object_index_map(first_line)
+            for diagnostic in diagnostics:
+                if diagnostic.line is not None:
+                    diagnostic.object_index = object_index(diagnostic.line)
+        return diagnostics
+
+    def _error_message(self, error: Diagnostic) -> str:
+        """Formats an error from the log file, pointing out the drawing object which caused it."""
+        if error.object_index is None:
+            return error.message
+        # Only the beginning of the code is shown, so the code of huge objects is streamed
+        chunks = []
+        length = 0
+        for chunk in code_chunks(self.drawing_objects[error.object_index]):
+            chunks.append(chunk)
+            length += len(chunk)
+            if length > 200:
+                break
+        code = "".join(chunks)
+        if len(code) > 200:
+            code = code[:200] + "..."
+        return (
+            f"{error.message}\n"
+            f"The error occurred in drawing_objects[{error.object_index}]: {code}"
+        )
+
+    def _run_tex(
+        self,
+        tex_filepath: Path,
+        digest: str,
+        has_data_files: bool,
+        quiet: bool,
+        on_event: EventCallback | None,
+        engine: str,
+        latexmk: bool | None,
+        timeout: float | None,
+        cpu_limit: int | None,
+        memory_limit: int | None,
+    ) -> tuple[subprocess.CompletedProcess, list[str], str]:
+        """Runs TeX on tex_filepath for compile(), trying the engines of engine_attempts()
+        in turn, and returns the last completed process, its command and its engine."""
+        from tikzpy.utils.engines import (
+            add_usage,
+            capacity_exceeded,
+            engine_attempts,
+            engine_command,
+            latexmk_command,
+            needs_reruns,
+            remember_engine,
+            remove_outputs,
+            run_tex,
+            tex_environment,
+        )
+        from tikzpy.utils.instrumentation import count_tex_runs, stage
+        from tikzpy.utils.types import CompileError, CompileTimeout, ResourceUsage
+
+        logfile = tex_filepath.with_suffix(".log")
+        attempts = engine_attempts(engine, digest)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.resource_usage = None
+        use_latexmk = needs_reruns(tex_filepath) if latexmk is None else latexmk
+        for attempt, (engine_name, large_memory) in enumerate(attempts, 1):
+            env = tex_environment(tex_filepath.parent, has_data_files, large_memory)
+            if use_latexmk:
+                cmd = latexmk_command(
+                    engine_name,
+                    quiet,
+                    true_posix_path(tex_filepath),
+                    true_posix_path(tex_filepath.parent),
+                )
+            else:
+                cmd = engine_command(
+                    engine_name,
+                    true_posix_path(tex_filepath),
+                    true_posix_path(tex_filepath.parent),
+                )
+            with stage(on_event, "tex") as info:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    completed_process, usage = run_tex(
+                        cmd,
+                        env,
+                        tex_filepath.parent,
+                        remaining,
+                        cpu_limit,
+                        memory_limit,
+                    )
+                except FileNotFoundError:
+                    raise CompileError(
+                        f"Could not run {engine_name}. Is a TeX distribution installed?"
+                    ) from None
+                except CompileTimeout:
+                    self.resource_usage = add_usage(
+                        self.resource_usage, ResourceUsage(seconds=remaining, runs=1)
+                    )
+                    raise
+                self.resource_usage = add_usage(self.resource_usage, usage)
+                if info is not None:
+                    output = (completed_process.stdout or b"") + (
+                        completed_process.stderr or b""
+                    )
+                    info.details = {
+                        "command": " ".join(cmd),
+                        "engine": engine_name,
+                        "returncode": completed_process.returncode,
+                        # latexmk only announces its runs when it is not quiet
+                        "tex_runs": (
+                            count_tex_runs(output) if use_latexmk else usage.runs
+                        ),
+                        "resources": usage,
+                    }
+            if (
+                completed_process.returncode == 0
+                or attempt == len(attempts)
+                or not capacity_exceeded(logfile)
+            ):
+                break
+            remove_outputs(tex_filepath)
+        if completed_process.returncode == 0 and engine == "auto":
+            remember_engine(digest, engine_name, large_memory)
+        return completed_process, cmd, engine_name
+
+    def compile(
+        self,
+        pdf_destination: str | None = None,
+        quiet: bool = True,
+        lock: bool = False,
+        on_event: EventCallback | None = None,
+        engine: str = "auto",
+        latexmk: bool | None = None,
+        timeout: float | None = None,
+        cpu_limit: int | None = None,
+        memory_limit: int | None = None,
+        workspace: Workspace | None = None,
+        remote: str | None = None,
+        priority: int = 0,
+    ) -> Path:
         """Compiles the Tikz code and returns a Path to the final PDF.
-        If no file path is provided, a default value of "tex_file.pdf" will be used.
+
+        If no file path is provided, the PDF is named "tex_file_<hash>.pdf", where <hash> is derived
+        from the content of the TeX file. Different pictures therefore never clobber each other's
+        PDF, even when compiled by parallel processes. The PDF is atomically moved into place.
 
         Parameters:
             pdf_destination (str): The file path of the compiled pdf.
             quiet (bool): Parameter to silence latexmk.
+            lock (bool): If True, hold an exclusive lock on "<pdf_destination>.lock" while moving
+                the PDF into place.
+            on_event (callable): If provided, called with a CompileEvent, holding the time taken
+                and bytes produced, at the end of each stage of the compilation: "codegen",
+                "write", "tex", "parse_log" and "move_pdf". See CompileProfile.
+            engine (str): The TeX engine: "pdflatex", "xelatex", "lualatex" or "auto". In
+                "auto" mode, pdflatex is used, unless its memory runs out ("TeX capacity
+                exceeded"), in which case the code is compiled again with lualatex, whose
+                memory grows as needed, or with larger memory settings for pdflatex if
+                lualatex is not installed. The engine which worked is reused for the same
+                TeX file.
+            latexmk (bool): Whether to run latexmk, which reruns the TeX engine until
+                cross-references are resolved, or the TeX engine once. If None, latexmk is only
+                run if the TeX file needs it, e.g. for "remember picture" or \\ref.
+            timeout (float): The time, in seconds, after which the TeX processes are killed
+                and CompileTimeout is raised.
+            cpu_limit (int): The CPU time, in seconds, which each TeX process may use.
+            memory_limit (int): The memory, in bytes, which each TeX process may allocate.
+            workspace (Workspace): If provided, TeX runs in a build directory of the
+                workspace which is kept for the next compilation to the same destination,
+                instead of in a temporary directory. The TeX engine is then only run if the
+                TeX code changed, and the PDF is copied rather than moved into place.
+            remote (str): The URL of a CompileServer (see `tikzpy serve`) which compiles the
+                picture instead of this process. Identical pictures compiled at the same
+                time are then only compiled once, and compiled PDFs are cached by the
+                server. on_event is not called, and resource_usage is not recorded.
+            priority (int): The priority of the picture in the queue of the remote server.
+
+        The resources used by the TeX processes are recorded in `resource_usage`, which can
+        be used to spot pictures which are getting expensive to compile.
         """
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tex_filepath = Path(tmp_dir) / "tex_file.tex"
-            self.write_tex_file(tex_filepath)
-
-            tex_file_posix_path = true_posix_path(tex_filepath)
-            tex_file_parents = true_posix_path(tex_filepath.parent)
-            options = ""
-            if quiet:
-                options += " -quiet "
-            cmd = (
-                f"latexmk -pdf {options} -interaction=nonstopmode -output-directory={tex_file_parents} {tex_file_posix_path}",
-            )
-            completed_process = subprocess.run(
-                cmd, shell=True, capture_output=True, check=False
+        # Deferred, as they would take a noticeable part of the time taken by `import tikzpy`
+        import subprocess
+        import tempfile
+
+        from tikzpy.utils.instrumentation import stage
+        from tikzpy.utils.types import CompileError, ResourceUsage
+
+        if remote is not None:
+            options = {
+                "engine": engine,
+                "latexmk": latexmk,
+                "timeout": timeout,
+                "cpu_limit": cpu_limit,
+                "memory_limit": memory_limit,
+            }
+            return self._compile_remote(
+                remote, pdf_destination, lock, priority, options
             )
+
+        if workspace is None:
+            build_dir = tempfile.TemporaryDirectory()
+        else:
+            from tikzpy.utils.workspace import build_name
+
+            if pdf_destination is None:
+                # The PDF is named after its content, so the pictures compiled into the
+                # same directory share a build directory
+                destination = (self.BASE_DIR or Path.cwd()) / "tex_file.pdf"
+            else:
+                destination = Path(pdf_destination)
+            build_dir = workspace.build_dir(build_name(destination))
+
+        with build_dir as tmp_dir:
+            tex_filepath = Path(tmp_dir) / "tex_file.tex"
+            with stage(on_event, "codegen") as info:
+                chunks = self._tex_file_chunks()
+                if info is not None:
+                    # Otherwise the code is generated as it is written
+                    chunks = list(chunks)
+                    info.bytes = sum(len(chunk.encode("utf-8")) for chunk in chunks)
+            with stage(on_event, "write") as info:
+                self._write_data_files(Path(tmp_dir))
+                # Including those written by earlier compilations in a workspace
+                data_files = Path(tmp_dir).glob(f"{DATA_FILE_PREFIX}*")
+                has_data_files = any(data_files)
+                # Leaving an unchanged TeX file untouched lets latexmk skip it
+                changed = write_file(
+                    tex_filepath, chunks, only_if_changed=workspace is not None
+                )
+                if info is not None:
+                    info.bytes = tex_filepath.stat().st_size
+            digest = file_digest(tex_filepath)
+            logfile = Path(tmp_dir) / "tex_file.log"
+            # The settings with which the PDF in a workspace was compiled
+            stamp = Path(tmp_dir) / "tikzpy.stamp"
+            settings = f"engine={engine} latexmk={latexmk}"
+            if (
+                not changed
+                and tex_filepath.with_suffix(".pdf").exists()
+                and stamp.exists()
+                and stamp.read_text() == settings
+            ):
+                # The PDF of the last compilation in the workspace is still current
+                with stage(on_event, "tex") as info:
+                    if info is not None:
+                        info.details = {"up_to_date": True, "tex_runs": 0}
+                self.resource_usage = ResourceUsage()
+                completed_process = subprocess.CompletedProcess((), 0)
+            else:
+                stamp.unlink(missing_ok=True)
+                completed_process, cmd, engine_name = self._run_tex(
+                    tex_filepath,
+                    digest,
+                    has_data_files,
+                    quiet,
+                    on_event,
+                    engine,
+                    latexmk,
+                    timeout,
+                    cpu_limit,
+                    memory_limit,
+                )
+            if completed_process.returncode < 0:
+                # E.g. SIGXCPU or SIGKILL from cpu_limit
+                raise CompileError(
+                    f"{engine_name} was killed by signal {-completed_process.returncode} "
+                    f"when running {cmd=}. It may have exceeded cpu_limit or memory_limit."
+                )
             if completed_process.returncode != 0:
-                logfile = Path(tmp_dir) / "tex_file.log"
                 if not logfile.exists():
                     raise CompileError(
                         f"Unexpected compilation error when running {cmd=}. No log file found. Manually compile the tikz code to debug."
                         f"{completed_process.stderr=}"
                     )
-                # If there's a log file, try to extract the error from it
-                # and return it to the user.
-                error_content = extract_error_content(
-                    logfile.read_text().splitlines(keepends=True)
-                )
-                if error_content is None:
+                # If there's a log file, try to extract the errors from it
+                # and return them to the user.
+                with stage(on_event, "parse_log") as info:
+                    self.diagnostics = self._read_diagnostics(logfile)
+                    if info is not None:
+                        info.bytes = logfile.stat().st_size
+                errors = [d for d in self.diagnostics if d.severity == "error"]
+                if len(errors) == 0:
                     raise CompileError(
                         f"Unexpected compilation error when running {cmd=}. Failed to parse log file. Manually compile the tikz code and check the .log file."
-                        f"{completed_process.stderr=}"
+                        f"{completed_process.stderr=}",
+                        self.diagnostics,
                     )
-                raise CompileError(error_content)
+                raise CompileError(self._error_message(errors[0]), self.diagnostics)
+            with stage(on_event, "parse_log") as info:
+                self.diagnostics = (
+                    self._read_diagnostics(logfile) if logfile.exists() else []
+                )
+                if info is not None and logfile.exists():
+                    info.bytes = logfile.stat().st_size
 
             # We move the compiled PDF into the same folder containing the tikz code.
             pdf_file = tex_filepath.with_suffix(".pdf").resolve()
-            if pdf_destination is None:
-                if self.BASE_DIR is None:
-                    moved_pdf_file = Path.cwd() / pdf_file.name
-                else:
-                    moved_pdf_file = self.BASE_DIR / pdf_file.name
-            else:
-                moved_pdf_file = Path(pdf_destination)
-            shutil.move(pdf_file, moved_pdf_file)
+            moved_pdf_file = self._pdf_destination(pdf_destination, digest)
+            with stage(on_event, "move_pdf") as info:
+                if info is not None:
+                    info.bytes = pdf_file.stat().st_size
+                with file_lock(moved_pdf_file) if lock else nullcontext():
+                    if workspace is None:
+                        atomic_move(pdf_file, moved_pdf_file)
+                    else:
+                        atomic_copy(pdf_file, moved_pdf_file)
+                        stamp.write_text(settings)
             return moved_pdf_file.resolve()
 
+    def _pdf_destination(self, pdf_destination: str | None, digest: str) -> Path:
+        """Returns the path of the compiled PDF, given the digest of the TeX file."""
+        if pdf_destination is not None:
+            return Path(pdf_destination)
+        pdf_name = f"tex_file_{digest[:12]}.pdf"
+        if self.BASE_DIR is None:
+            return Path.cwd() / pdf_name
+        return self.BASE_DIR / pdf_name
+
+    def _compile_remote(
+        self,
+        remote: str,
+        pdf_destination: str | None,
+        lock: bool,
+        priority: int,
+        options: dict,
+    ) -> Path:
+        from tikzpy.utils.compile_server import compile_remote
+        from tikzpy.utils.types import CompileError
+
+        self.resource_usage = None
+        try:
+            digest, pdf = compile_remote(remote, self.to_bytes(), options, priority)
+        except CompileError as error:
+            self.diagnostics = error.diagnostics
+            raise
+        self.diagnostics = []
+        moved_pdf_file = self._pdf_destination(pdf_destination, digest)
+        with file_lock(moved_pdf_file) if lock else nullcontext():
+            atomic_write_bytes(moved_pdf_file, pdf)
+        return moved_pdf_file.resolve()
+
     def show(self, quiet: bool = False, inline: bool | None = None) -> None:
         """Compiles the Tikz code and displays the pdf to the user. Set quiet=True to shut up latexmk.
         This should either open the PDF viewer on the user's computer with the graphic,
@@ -190,6 +855,8 @@ class TikzPicture(TikzEnvironment):
         if inline and self.display_inline(pdf_file):
             return
 
+        import webbrowser
+
         webbrowser.open_new(str(pdf_file.as_uri()))
 
     def display_inline(self, pdf_file: Path | None = None) -> bool:
@@ -216,7 +883,7 @@ class TikzPicture(TikzEnvironment):
 
         return True
 
-    def scope(self, options: str = "") -> Scope:
-        scope = Scope(options=options)
+    def scope(self, options: str = "", transform: str = "objects") -> Scope:
+        scope = Scope(options=options, transform=transform)
         self.draw(scope)
         return scope
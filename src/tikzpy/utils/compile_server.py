@@ -0,0 +1,377 @@
+import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import CancelledError, Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from pathlib import Path
+from queue import PriorityQueue
+
+from tikzpy.tikz_environments.tikz_picture import TikzPicture
+from tikzpy.utils.types import CompileError, CompileTimeout, Diagnostic
+from tikzpy.utils.files import file_lock
+from tikzpy.utils.workspace import Workspace
+
+# The port on which `tikzpy serve` listens by default
+DEFAULT_PORT = 8765
+
+# The compile() arguments which clients may pass, mapped to their types
+OPTIONS = {
+    "engine": str,
+    "latexmk": lambda value: value.lower() in ("1", "true"),
+    "timeout": float,
+    "cpu_limit": int,
+    "memory_limit": int,
+}
+
+# The header of a response holding the SHA-256 digest of the TeX file of the picture
+DIGEST_HEADER = "X-Tikzpy-Digest"
+
+# The content type of the pictures which clients submit
+CONTENT_TYPE = "application/octet-stream"
+
+
+class CompileServer:
+    """Compiles pictures for the processes of this machine, which submit them with
+    `TikzPicture.compile(remote=url)`.
+
+    Compiled PDFs are kept in cache_dir, named after the TeX code and the compile() options,
+    and byte-identical pictures which are submitted while one of them is being compiled
+    share its compilation. At most `workers` pictures are compiled at once, the others wait
+    in a queue, highest priority first.
+
+    ```python
+    server = CompileServer(workers=2)
+    url = server.start()
+    tikz.compile("figure.pdf", remote=url)
+    server.shutdown()
+    ```
+
+    The server only listens on the loopback interface, so it is not reachable from other
+    machines. Run it with `tikzpy serve`. Its URL ends with a random token, and requests
+    whose path does not begin with it are refused, so that other users of the machine, or
+    web pages open in a browser, cannot have it run TeX. Keep the URL to yourself.
+
+    Each PDF of the cache is kept in a directory of its own, which is managed like the build
+    directories of a Workspace: the least recently used PDFs are removed once the cache
+    takes more than max_cache_size bytes.
+
+    Parameters:
+        cache_dir (str | Path): The directory of compiled PDFs. Defaults to
+            "$XDG_CACHE_HOME/tikzpy/pdf", or "~/.cache/tikzpy/pdf".
+        workers (int): The number of pictures compiled at once. Defaults to the number of
+            CPUs, up to 4.
+        workspace (Workspace): If provided, pictures are compiled in this workspace.
+        max_cache_size (int): The size, in bytes, which the cached PDFs may take in total,
+            or None for no limit.
+        max_request_size (int): The size, in bytes, of the largest encoded picture which
+            clients may submit.
+        token (str): The token of the URL. Defaults to a new random token.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        workers: int | None = None,
+        workspace: Workspace | None = None,
+        max_cache_size: int | None = 2**30,
+        max_request_size: int = 2**30,
+        token: str | None = None,
+    ) -> None:
+        import secrets
+
+        if cache_dir is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+            cache_dir = Path(cache_home) / "tikzpy" / "pdf"
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.workspace = workspace
+        self.max_request_size = max_request_size
+        self.token = token if token is not None else secrets.token_urlsafe(32)
+        self._cache = Workspace(self.cache_dir, max_age=None, max_size=max_cache_size)
+        # The numbers of pictures compiled, found in the cache, deduplicated and failed
+        self.stats: Counter[str] = Counter(
+            compiled=0, cache_hits=0, deduplicated=0, failed=0
+        )
+        self._queue: PriorityQueue = PriorityQueue()
+        self._order = count()
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._http_server: ThreadingHTTPServer | None = None
+        self._stopped = threading.Event()
+
+    def submit(
+        self, data: bytes, options: dict | None = None, priority: int = 0
+    ) -> Future:
+        """Submits the picture encoded by `TikzPicture.to_bytes` for compilation with the
+        given compile() options. Returns a Future of the digest of its TeX file and the path
+        of its PDF in the cache."""
+        import hashlib
+
+        options = options or {}
+        picture = TikzPicture.from_bytes(data)
+        tex_digest = hashlib.sha256()
+        for chunk in picture._tex_file_chunks():
+            tex_digest.update(chunk.encode("utf-8"))
+        tex_digest = tex_digest.hexdigest()
+        settings = json.dumps(options, sort_keys=True)
+        key = hashlib.sha256(f"{tex_digest}\n{settings}".encode()).hexdigest()
+        pdf_file = self.cache_dir / key[:32] / f"{key[:32]}.pdf"
+
+        with self._lock:
+            if key in self._in_flight:
+                self.stats["deduplicated"] += 1
+                return self._in_flight[key]
+            future = Future()
+            if pdf_file.exists():
+                # The PDF is now the most recently used one of the cache
+                os.utime(pdf_file.parent)
+                self.stats["cache_hits"] += 1
+                future.set_result((tex_digest, pdf_file))
+                return future
+            self._in_flight[key] = future
+        # Lower values come first in the queue, and equal priorities in submission order
+        job = (picture, options, pdf_file, tex_digest, key, future)
+        self._queue.put((-priority, next(self._order), job))
+        return future
+
+    def start(self, port: int = 0) -> str:
+        """Starts the workers and the HTTP server on the given port, or on a free port if
+        port is 0. Returns the URL of the server."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._http_server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._http_server.daemon_threads = True
+        self._http_server.compile_server = self
+        thread = threading.Thread(
+            target=self._http_server.serve_forever,
+            # How long shutdown() may wait for the server to notice
+            kwargs={"poll_interval": 0.1},
+            daemon=True,
+        )
+        thread.start()
+        self._threads.append(thread)
+        return self.url
+
+    @property
+    def url(self) -> str | None:
+        if self._http_server is None:
+            return None
+        host, port = self._http_server.server_address[:2]
+        return f"http://{host}:{port}/{self.token}"
+
+    def wait(self) -> None:
+        """Blocks until the server is shut down, e.g. by another thread."""
+        self._stopped.wait()
+
+    def shutdown(self) -> None:
+        """Stops the HTTP server and the workers once they finish their current pictures.
+        Pictures still waiting in the queue are cancelled."""
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+        for _ in range(self.workers):
+            # Ahead of every picture in the queue
+            self._queue.put((float("-inf"), next(self._order), None))
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+        while not self._queue.empty():
+            _, _, job = self._queue.get()
+            if job is not None:
+                self._finish(job[4])
+                job[5].cancel()
+        self._stopped.set()
+
+    def status(self) -> dict:
+        """Returns the number of workers, of queued and in flight pictures, and the stats."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queue.qsize(),
+                "in_flight": len(self._in_flight),
+                **self.stats,
+            }
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            picture, options, pdf_file, tex_digest, key, future = job
+            if not future.set_running_or_notify_cancel():
+                self._finish(key)
+                continue
+            try:
+                with self._cache.build_dir(pdf_file.parent.name):
+                    picture.compile(pdf_file, workspace=self.workspace, **options)
+            except BaseException as error:
+                self._finish(key, "failed")
+                future.set_exception(error)
+            else:
+                self._finish(key, "compiled")
+                future.set_result((tex_digest, pdf_file))
+
+    def _finish(self, key: str, outcome: str | None = None) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if outcome is not None:
+                self.stats[outcome] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves POST /<token>/compile, whose body is a picture encoded by
+    `TikzPicture.to_bytes` and whose query has the compile() options and the priority, and
+    GET /<token>/status."""
+
+    def do_GET(self) -> None:
+        path = self._route()
+        if path is None:
+            return
+        if path != "/status":
+            self._send_json(404, {"error": f"Unknown path {path}"})
+            return
+        self._send_json(200, self.server.compile_server.status())
+
+    def do_POST(self) -> None:
+        from urllib.parse import parse_qs, urlsplit
+
+        path = self._route()
+        if path is None:
+            return
+        if path != "/compile":
+            self._send_json(404, {"error": f"Unknown path {path}"})
+            return
+        data = self._read_body()
+        if data is None:
+            return
+        url = urlsplit(self.path)
+        try:
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            priority = int(query.pop("priority", 0))
+            unknown = set(query) - set(OPTIONS)
+            if unknown:
+                raise ValueError(f"Unknown options {', '.join(sorted(unknown))}")
+            options = {name: OPTIONS[name](value) for name, value in query.items()}
+            future = self.server.compile_server.submit(data, options, priority)
+        except Exception as error:
+            # The options or the encoded picture are invalid
+            self._send_json(400, {"error": str(error)})
+            return
+        try:
+            tex_digest, pdf_file = future.result()
+        except CompileTimeout as error:
+            self._send_error(504, error)
+        except CompileError as error:
+            self._send_error(422, error)
+        except ValueError as error:
+            # E.g. an unknown engine
+            self._send_json(400, {"error": str(error)})
+        except CancelledError:
+            self._send_json(503, {"error": "The compile server is shutting down"})
+        except Exception as error:
+            self._send_json(500, {"error": f"{type(error).__name__}: {error}"})
+        else:
+            try:
+                # The lock keeps the PDF from being removed from the cache meanwhile
+                with file_lock(pdf_file.parent):
+                    pdf = pdf_file.read_bytes()
+            except FileNotFoundError:
+                self._send_json(503, {"error": "The PDF was removed from the cache"})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(pdf)))
+            self.send_header(DIGEST_HEADER, tex_digest)
+            self.end_headers()
+            self.wfile.write(pdf)
+
+    def _route(self) -> str | None:
+        """Returns the path of the request after the token of the server, or None, after
+        refusing the request, if it does not begin with the token."""
+        import hmac
+        from urllib.parse import urlsplit
+
+        token, _, path = urlsplit(self.path).path.partition("/")[2].partition("/")
+        expected = self.server.compile_server.token
+        if not hmac.compare_digest(token.encode(), expected.encode()):
+            self._send_json(403, {"error": "Invalid token"})
+            return None
+        return "/" + path
+
+    def _read_body(self) -> bytes | None:
+        """Returns the encoded picture of a POST request, or None after refusing it."""
+        if self.headers.get_content_type() != CONTENT_TYPE:
+            self._send_json(415, {"error": f"The Content-Type must be {CONTENT_TYPE}"})
+            return None
+        try:
+            length = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            self._send_json(411, {"error": "A valid Content-Length is required"})
+            return None
+        max_size = self.server.compile_server.max_request_size
+        if not 0 <= length <= max_size:
+            self._send_json(
+                413, {"error": f"The picture is larger than {max_size} bytes"}
+            )
+            return None
+        return self.rfile.read(length)
+
+    def _send_error(self, status: int, error: CompileError) -> None:
+        from dataclasses import asdict
+
+        diagnostics = [asdict(diagnostic) for diagnostic in error.diagnostics]
+        self._send_json(status, {"error": error.message, "diagnostics": diagnostics})
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        # Requests are not logged, as a busy server would flood its terminal
+        pass
+
+
+def compile_remote(
+    url: str, data: bytes, options: dict, priority: int = 0
+) -> tuple[str, bytes]:
+    """Compiles the picture encoded by `TikzPicture.to_bytes` on the CompileServer at url,
+    with the given compile() options. Returns the digest of its TeX file and its PDF.
+    Raises CompileError, or CompileTimeout, if the compilation failed."""
+    from urllib.error import HTTPError
+    from urllib.parse import urlencode
+    from urllib.request import Request, urlopen
+
+    query = {name: value for name, value in options.items() if value is not None}
+    query["priority"] = priority
+    request = Request(
+        f"{url.rstrip('/')}/compile?{urlencode(query)}",
+        data=data,
+        headers={"Content-Type": CONTENT_TYPE},
+        method="POST",
+    )
+    try:
+        with urlopen(request) as response:
+            return response.headers[DIGEST_HEADER], response.read()
+    except HTTPError as error:
+        try:
+            body = json.loads(error.read())
+        except ValueError:
+            body = {}
+        message = body.get("error", f"The compile server at {url} failed: {error}")
+        if error.code in (400, 413):
+            raise ValueError(message) from None
+        if error.code == 403:
+            raise PermissionError(message) from None
+        diagnostics = [Diagnostic(**item) for item in body.get("diagnostics", [])]
+        error_type = CompileTimeout if error.code == 504 else CompileError
+        raise error_type(message, diagnostics) from None
@@ -0,0 +1,130 @@
+import ast
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+NPY_MAGIC = b"\x93NUMPY"
+
+# The dtypes which coordinates can have, mapped to the typecodes of memoryview.cast
+TYPECODES = {
+    "float64": "d",
+    "f8": "d",
+    "float32": "f",
+    "f4": "f",
+    "int64": "q",
+    "i8": "q",
+    "int32": "i",
+    "i4": "i",
+    "int16": "h",
+    "i2": "h",
+}
+TYPECODES.update({typecode: typecode for typecode in TYPECODES.values()})
+
+Columns = tuple[memoryview, ...]
+
+
+def map_columns(
+    filepath: str | os.PathLike,
+    dtype: str | None = None,
+    shape: tuple[int, int] | None = None,
+    offset: int = 0,
+) -> Columns:
+    """Memory-maps a file of coordinates and returns a read-only view of each of its columns.
+
+    The file is either a `.npy` file, whose header gives the dtype and shape of the array, or a
+    raw binary file of rows of 2 or 3 coordinates (x, y[, z]) of the given dtype (by default
+    "float64"), starting at byte offset. For raw files, shape is (rows, columns), where rows
+    can be -1 to use the whole file, and defaults to (-1, 2).
+
+    Nothing is read up front: the operating system pages the coordinates in when they are
+    accessed.
+    """
+    with open(filepath, "rb") as f:
+        if f.read(len(NPY_MAGIC)) == NPY_MAGIC:
+            dtype, shape, fortran_order, offset = _read_npy_header(f, filepath)
+        else:
+            fortran_order = False
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"The coordinate file {filepath} is empty")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    typecode = _typecode(dtype or "float64")
+    itemsize = struct.calcsize(typecode)
+    rows, num_columns = shape or (-1, 2)
+    if num_columns not in (2, 3):
+        raise ValueError(f"Coordinates have 2 or 3 columns, not {num_columns}")
+    available = (len(data) - offset) // (itemsize * num_columns)
+    if rows == -1:
+        rows = available
+    if not 0 <= rows <= available:
+        raise ValueError(
+            f"The coordinate file {filepath} has {available} rows of {num_columns} "
+            f"{dtype} values after byte {offset}, not {rows}"
+        )
+    size = rows * num_columns * itemsize
+    values = memoryview(data)[offset : offset + size].cast(typecode).toreadonly()
+    return _split_columns(values, rows, num_columns, fortran_order)
+
+
+def buffer_columns(points) -> Columns | None:
+    """Returns a read-only view of each column of points, if it is a 2D buffer with 2 or 3
+    columns such as a numpy array or memmap, or else None. C-contiguous buffers (the default
+    layout of numpy) are not copied."""
+    try:
+        view = memoryview(points)
+    except TypeError:
+        return None
+    if view.ndim != 2 or view.shape[1] not in (2, 3):
+        return None
+    rows, num_columns = view.shape
+    if view.c_contiguous and view.format in TYPECODES:
+        values = view.cast("B").cast(view.format).toreadonly()
+        return _split_columns(values, rows, num_columns, fortran_order=False)
+    return tuple(tuple(column) for column in zip(*view.tolist()))
+
+
+def _split_columns(
+    values: memoryview, rows: int, num_columns: int, fortran_order: bool
+) -> Columns:
+    if fortran_order:
+        return tuple(
+            values[idx * rows : (idx + 1) * rows] for idx in range(num_columns)
+        )
+    # Strided views of the interleaved rows
+    return tuple(values[idx::num_columns] for idx in range(num_columns))
+
+
+def _typecode(dtype) -> str:
+    # numpy dtypes are accepted through their names, e.g. "float64"
+    name = str(dtype)
+    if name[:1] in "<>=|" and len(name) > 1:
+        if name[0] == ">" or (name[0] == "<" and sys.byteorder != "little"):
+            raise ValueError(f"The byte order of dtype {name} is not the native one")
+        name = name[1:]
+    try:
+        return TYPECODES[name]
+    except KeyError:
+        supported = ", ".join(TYPECODES)
+        raise ValueError(
+            f"Unsupported coordinate dtype {dtype}, expected one of {supported}"
+        ) from None
+
+
+def _read_npy_header(f, filepath) -> tuple[str, tuple[int, int], bool, int]:
+    """Reads the header of a .npy file, positioned after its magic string. Returns the
+    dtype, shape and fortran_order of the array, and the offset of its data."""
+    major = f.read(2)[0]
+    header_length_format = "<H" if major == 1 else "<I"
+    (header_length,) = struct.unpack(
+        header_length_format, f.read(struct.calcsize(header_length_format))
+    )
+    header = ast.literal_eval(f.read(header_length).decode("latin1"))
+    shape = tuple(header["shape"])
+    if len(shape) != 2:
+        raise ValueError(
+            f"The array in {Path(filepath).name} has shape {shape}, but coordinates "
+            "need an array of shape (rows, 2) or (rows, 3)"
+        )
+    return header["descr"], shape, header["fortran_order"], f.tell()
@@ -0,0 +1,219 @@
+import re
+
+from tikzpy.drawing_objects.drawing_object import DrawingObject
+from tikzpy.drawing_objects.plotcoordinates import PlotCoordinates
+from tikzpy.tikz_environments.clip import Clip
+from tikzpy.tikz_environments.scope import Scope
+from tikzpy.tikz_environments.tikz_environment import TikzEnvironment
+
+# Options which move a path away from its coordinates, so that its bounding box cannot be
+# told from the drawing object: transformations, and the options of curved to paths.
+GEOMETRY_OPTIONS = re.compile(
+    r"(?:^|,)\s*(?:shift|[xy]shift|shift only|scale|[xy]scale|scale around|rotate"
+    r"|rotate around|[xy]slant|cm|reset cm|[xyz]|transform canvas|tdplot_\w+"
+    r"|bend(?: left| right)?|in|out|looseness|relative)\s*(?:=|,|$)"
+)
+
+# A region is (x_min, y_min, x_max, y_max), or None when the whole plane is visible
+Region = tuple[float, float, float, float]
+
+
+def cull(
+    env: TikzEnvironment,
+    viewport: tuple[tuple[float, float], tuple[float, float]] | None = None,
+    margin: float = 0,
+) -> int:
+    """Removes the drawing objects of env which lie entirely outside its clip regions, or
+    outside viewport, and trims the plots which run out of them. Returns the number of
+    removed drawing objects. See TikzPicture.cull."""
+    region = None
+    if viewport is not None:
+        (x_a, y_a), (x_b, y_b) = viewport
+        region = (min(x_a, x_b), min(y_a, y_b), max(x_a, x_b), max(y_a, y_b))
+    return _cull_environment(env, region, margin)
+
+
+def _cull_environment(
+    env: TikzEnvironment, region: Region | None, margin: float
+) -> int:
+    with env._lock:
+        return _cull_objects(env, region, margin)
+
+
+def _cull_objects(env: TikzEnvironment, region: Region | None, margin: float) -> int:
+    removed = 0
+    kept = []
+    for draw_obj in env.drawing_objects:
+        if isinstance(draw_obj, Clip):
+            # A clip applies to everything after it in the environment
+            region = _intersection(region, _box(draw_obj.draw_obj, 0))
+            kept.append(draw_obj)
+        elif isinstance(draw_obj, Scope):
+            # The region is in the wrong coordinates if the scope transforms its contents
+            moved = draw_obj.transforms or _moves_paths(draw_obj.options)
+            inner_region = None if moved else region
+            scope_removed = _cull_environment(draw_obj, inner_region, margin)
+            removed += scope_removed
+            # Scopes which were emptied by culling are dropped
+            if not scope_removed or not _draws_nothing(draw_obj):
+                kept.append(draw_obj)
+        elif region is None or not isinstance(draw_obj, DrawingObject):
+            kept.append(draw_obj)
+        else:
+            box = _box(draw_obj, margin)
+            if box is None or _contains(region, box):
+                kept.append(draw_obj)
+            elif not _intersects(region, box):
+                removed += 1
+            elif isinstance(draw_obj, PlotCoordinates):
+                runs = _visible_runs(draw_obj, region, margin)
+                removed += not runs
+                kept.extend(runs)
+            else:
+                kept.append(draw_obj)
+    env.drawing_objects[:] = kept
+    return removed
+
+
+def _draws_nothing(scope: Scope) -> bool:
+    return all(
+        isinstance(obj, Clip) and not obj.draw for obj in scope.drawing_objects
+    )
+
+
+def _moves_paths(options: str) -> bool:
+    return GEOMETRY_OPTIONS.search(options) is not None
+
+
+def _box(draw_obj, margin: float) -> Region | None:
+    """The bounding box of draw_obj grown by margin, or None if it is unknown."""
+    bounding_box = getattr(draw_obj, "bounding_box", None)
+    if bounding_box is None or getattr(draw_obj, "node", None) is not None:
+        # The extent of node text is only known to TeX
+        return None
+    if _moves_paths(draw_obj.options):
+        return None
+    corners = bounding_box()
+    if corners is None:
+        return None
+    south_west, north_east = corners
+    return (
+        south_west.x - margin,
+        south_west.y - margin,
+        north_east.x + margin,
+        north_east.y + margin,
+    )
+
+
+def _intersection(region: Region | None, box: Region | None) -> Region | None:
+    if region is None:
+        return box
+    if box is None:
+        return region
+    return (
+        max(region[0], box[0]),
+        max(region[1], box[1]),
+        min(region[2], box[2]),
+        min(region[3], box[3]),
+    )
+
+
+def _intersects(region: Region, box: Region) -> bool:
+    return (
+        box[0] <= region[2]
+        and region[0] <= box[2]
+        and box[1] <= region[3]
+        and region[1] <= box[3]
+    )
+
+
+def _contains(region: Region, box: Region) -> bool:
+    return (
+        region[0] <= box[0]
+        and region[1] <= box[1]
+        and box[2] <= region[2]
+        and box[3] <= region[3]
+    )
+
+
+def _visible_runs(
+    plot: PlotCoordinates, region: Region, margin: float
+) -> list[PlotCoordinates]:
+    """Splits plot into the runs of consecutive points which can be seen in region.
+
+    A point is kept if a segment from or to it crosses the region, so that each run enters
+    and leaves the region as the plot did. For smooth plots, whose curves depend on the
+    neighbouring points, segments are considered together with their neighbours. Plots
+    which are filled or closed are kept whole, as their shape depends on all of their
+    points.
+    """
+    if plot.action != "draw" or "fill" in plot.options or "cycle" in plot.plot_options:
+        return [plot]
+    if plot._points is not None:
+        xs = [point.x for point in plot._points]
+        ys = [point.y for point in plot._points]
+    else:
+        xs, ys = plot._columns
+
+    # The outcodes of Cohen-Sutherland: the bits say on which sides of the region the
+    # point lies. A group of points is outside the region iff they share a bit.
+    x_min, y_min, x_max, y_max = (
+        region[0] - margin,
+        region[1] - margin,
+        region[2] + margin,
+        region[3] + margin,
+    )
+    codes = [
+        (x < x_min) | (x > x_max) << 1 | (y < y_min) << 2 | (y > y_max) << 3
+        for x, y in zip(xs, ys)
+    ]
+    reach = 2 if "smooth" in plot.plot_options else 1
+    # shared[idx] has the bits shared by the points from idx - reach + 1 to idx + reach,
+    # which decide whether segment idx (from point idx to idx + 1) can be seen. Codes are
+    # padded with 15, which has all bits, at the ends.
+    shared = [15] * (reach - 1) + codes + [15] * (reach - 1)
+    for _ in range(2 * reach - 1):
+        shared = [a & b for a, b in zip(shared, shared[1:])]
+    num_points = len(codes)
+    keep = [False] * num_points
+    for idx, bits in enumerate(shared):
+        if bits == 0:
+            start = max(0, idx - reach + 1)
+            stop = min(num_points, idx + reach + 1)
+            keep[start:stop] = [True] * (stop - start)
+
+    runs = []
+    idx = 0
+    while idx < num_points:
+        if not keep[idx]:
+            idx += 1
+            continue
+        start = idx
+        while idx < num_points and keep[idx]:
+            idx += 1
+        runs.append((start, idx))
+    if runs == [(0, num_points)]:
+        return [plot]
+    return [_plot_slice(plot, start, stop) for start, stop in runs]
+
+
+def _plot_slice(plot: PlotCoordinates, start: int, stop: int) -> PlotCoordinates:
+    if plot._points is not None:
+        plot_slice = PlotCoordinates(
+            plot._points[start:stop], plot.options, plot.plot_options, plot.action
+        )
+    else:
+        # Slices of buffers are views, so the coordinates are not copied
+        xs, ys = plot._columns
+        plot_slice = PlotCoordinates.from_columns(
+            xs[start:stop],
+            ys[start:stop],
+            None,
+            plot.options,
+            plot.plot_options,
+            plot.action,
+        )
+    plot_slice.external = plot.external
+    plot_slice.relative = plot.relative
+    plot_slice.precision = plot.precision
+    return plot_slice
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from tikzpy.utils.types import CompileTimeout, ResourceUsage
+
+if TYPE_CHECKING:
+    import subprocess
+
+# The TeX engines which TikzPicture.compile() can run, mapped to their latexmk options
+ENGINES = {"pdflatex": "-pdf", "xelatex": "-xelatex", "lualatex": "-lualatex"}
+
+# Code which needs more than one TeX run, as it reads back what an earlier run wrote to
+# the .aux file
+RERUN_MARKERS = re.compile(
+    r"remember picture|\\(?:label|ref|pageref|cite|tableofcontents)\b"
+)
+
+# The start of the error which TeX reports when one of its fixed memory pools is full
+CAPACITY_EXCEEDED = "! TeX capacity exceeded"
+
+# Memory settings which pdflatex and xelatex read from texmf.cnf at startup. Unlike
+# main_memory, they take effect without rebuilding the format files.
+LARGE_MEMORY_TEXMF_CNF = """\
+% Generated by tikzpy, as the default memory of TeX was exceeded
+extra_mem_top = 50000000
+extra_mem_bot = 50000000
+save_size = 1000000
+stack_size = 100000
+buf_size = 10000000
+pool_size = 50000000
+max_strings = 5000000
+hash_extra = 1000000
+"""
+
+# Sets the resource limits given as its first argument, on systems without prlimit, and
+# then runs the command given by its other arguments in its place
+LIMITS_WRAPPER = """\
+import ast, os, resource, sys
+for limit, values in ast.literal_eval(sys.argv[1]):
+    resource.setrlimit(limit, values)
+os.execvp(sys.argv[2], sys.argv[2:])
+"""
+
+# The number of TeX files whose engine is remembered, so that long-running processes like
+# `tikzpy serve` and `tikzpy watch` do not accumulate an entry per picture forever
+ENGINE_CACHE_SIZE = 4096
+
+# The engine which compiled the TeX file with a given content hash in "auto" mode, and
+# whether it needed the large memory settings, least recently used first
+_engine_cache: OrderedDict[str, tuple[str, bool]] = OrderedDict()
+_engine_cache_lock = threading.Lock()
+
+
+def engine_attempts(engine: str, digest: str) -> list[tuple[str, bool]]:
+    """Returns the (engine, large_memory) pairs with which to compile the TeX file with the
+    given content hash, in order, each to be tried if the previous one ran out of memory.
+
+    In "auto" mode, pdflatex is tried first, and then lualatex, which allocates its memory
+    dynamically, or pdflatex with larger memory settings if lualatex is not installed. A
+    TeX file which was compiled before starts directly with the engine which worked.
+    """
+    if engine != "auto":
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown TeX engine {engine!r}, expected one of "
+                f"{', '.join(ENGINES)} or 'auto'"
+            )
+        return [(engine, False)]
+    with _engine_cache_lock:
+        if digest in _engine_cache:
+            _engine_cache.move_to_end(digest)
+            return [_engine_cache[digest]]
+    import shutil
+
+    if shutil.which("lualatex") is not None:
+        return [("pdflatex", False), ("lualatex", False)]
+    return [("pdflatex", False), ("pdflatex", True)]
+
+
+def remember_engine(digest: str, engine: str, large_memory: bool) -> None:
+    with _engine_cache_lock:
+        _engine_cache[digest] = (engine, large_memory)
+        _engine_cache.move_to_end(digest)
+        while len(_engine_cache) > ENGINE_CACHE_SIZE:
+            _engine_cache.popitem(last=False)
+
+
+def latexmk_command(
+    engine: str, quiet: bool, tex_filepath: str, output_dir: str
+) -> list[str]:
+    """Returns the arguments which run latexmk with engine on tex_filepath, which runs TeX
+    as often as it takes for the .aux file to be stable. They are not run by a shell, so
+    paths with spaces or shell metacharacters are passed on as they are."""
+    return [
+        "latexmk",
+        ENGINES[engine],
+        *(["-quiet"] if quiet else []),
+        "-interaction=nonstopmode",
+        f"-output-directory={output_dir}",
+        tex_filepath,
+    ]
+
+
+def engine_command(engine: str, tex_filepath: str, output_dir: str) -> list[str]:
+    """Returns the arguments which run engine once on tex_filepath, stopping at the first
+    error instead of trying to recover from it."""
+    return [
+        engine,
+        "-halt-on-error",
+        "-interaction=nonstopmode",
+        f"-output-directory={output_dir}",
+        tex_filepath,
+    ]
+
+
+def needs_reruns(tex_filepath: Path) -> bool:
+    r"""Whether the TeX file has code, such as "remember picture" or \ref, which needs
+    latexmk to run TeX until the .aux file is stable."""
+    with tex_filepath.open(encoding="utf-8") as f:
+        return any(RERUN_MARKERS.search(line) for line in f)
+
+
+def tex_environment(
+    directory: Path, data_files: bool, large_memory: bool
+) -> dict[str, str] | None:
+    """Returns the environment variables of a TeX run in directory, or None if it needs
+    none besides those of this process. Empty path components, such as the trailing
+    separators, stand for the default search paths of kpathsea."""
+    env = {}
+    if data_files:
+        # TeX looks up the data files of external plots in its working directory and in
+        # TEXINPUTS
+        env["TEXINPUTS"] = str(directory) + os.pathsep + os.environ.get("TEXINPUTS", "")
+    if large_memory:
+        (directory / "texmf.cnf").write_text(LARGE_MEMORY_TEXMF_CNF)
+        env["TEXMFCNF"] = str(directory) + os.pathsep + os.environ.get("TEXMFCNF", "")
+    return {**os.environ, **env} if env else None
+
+
+def capacity_exceeded(logfile: Path) -> bool:
+    """Whether the TeX run which wrote logfile ran out of memory."""
+    if not logfile.exists():
+        return False
+    with logfile.open(encoding="utf-8", errors="replace") as f:
+        return any(line.startswith(CAPACITY_EXCEEDED) for line in f)
+
+
+def remove_outputs(tex_filepath: Path) -> None:
+    """Removes the files of a failed TeX run, so that latexmk starts the next run afresh."""
+    for path in tex_filepath.parent.glob(f"{tex_filepath.stem}.*"):
+        if path != tex_filepath:
+            path.unlink()
+
+
+def run_tex(
+    cmd: list[str],
+    env: dict[str, str] | None,
+    directory: Path,
+    timeout: float | None = None,
+    cpu_limit: int | None = None,
+    memory_limit: int | None = None,
+) -> tuple[subprocess.CompletedProcess, ResourceUsage]:
+    """Runs a TeX command, given as a list of arguments rather than through a shell, in a
+    process group of its own, and returns its completed process and the resources which
+    it used. The output of the command is written to files in directory rather than to
+    pipes, so that it cannot block the command while it is waited for.
+
+    Parameters:
+        timeout: The wall clock time, in seconds, after which the command and all the
+            processes which it started are killed, and CompileTimeout is raised.
+        cpu_limit: The CPU time, in seconds, which each process may use (RLIMIT_CPU).
+        memory_limit: The address space, in bytes, which each process may use (RLIMIT_AS).
+    """
+    import subprocess
+
+    posix = os.name == "posix"
+    args = cmd
+    limits = []
+    prlimit = False
+    if cpu_limit is not None or memory_limit is not None:
+        if not posix:
+            raise ValueError("cpu_limit and memory_limit need a POSIX system")
+        import resource
+
+        limits = _limits(cpu_limit, memory_limit)
+        # prlimit is only available on Linux. Elsewhere, the limits are set by a wrapper
+        # which then execs the command.
+        prlimit = hasattr(resource, "prlimit")
+        if not prlimit:
+            import shutil
+
+            # Popen reports a missing command, but the wrapper could only exit with an error
+            if shutil.which(cmd[0]) is None:
+                raise FileNotFoundError(f"No such command: {cmd[0]!r}")
+            args = [sys.executable, "-c", LIMITS_WRAPPER, repr(limits), *cmd]
+
+    start = time.monotonic()
+    stdout_path, stderr_path = directory / "tikzpy.stdout", directory / "tikzpy.stderr"
+    with stdout_path.open("wb") as stdout, stderr_path.open("wb") as stderr:
+        process = subprocess.Popen(
+            args,
+            env=env,
+            stdout=stdout,
+            stderr=stderr,
+            start_new_session=posix,
+        )
+        try:
+            if prlimit:
+                _set_limits(process.pid, limits)
+            rusage = _wait(process, timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(process)
+            raise CompileTimeout(
+                f"Compilation timed out after {timeout:g} seconds when running {cmd=}"
+            ) from None
+        except BaseException:
+            # E.g. KeyboardInterrupt, which must not leave TeX running
+            _kill_group(process)
+            raise
+    usage = ResourceUsage(seconds=time.monotonic() - start, runs=1)
+    if rusage is not None:
+        usage.cpu_seconds = rusage.ru_utime + rusage.ru_stime
+        # ru_maxrss is in kilobytes, except on macOS
+        usage.max_rss = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    completed_process = subprocess.CompletedProcess(
+        cmd, process.returncode, stdout_path.read_bytes(), stderr_path.read_bytes()
+    )
+    return completed_process, usage
+
+
+def add_usage(total: ResourceUsage | None, usage: ResourceUsage) -> ResourceUsage:
+    """Returns the resources used by the runs of total and by the run of usage."""
+    if total is None:
+        return usage
+    return ResourceUsage(
+        seconds=total.seconds + usage.seconds,
+        cpu_seconds=(
+            None
+            if total.cpu_seconds is None or usage.cpu_seconds is None
+            else total.cpu_seconds + usage.cpu_seconds
+        ),
+        max_rss=max(
+            (rss for rss in (total.max_rss, usage.max_rss) if rss is not None),
+            default=None,
+        ),
+        runs=total.runs + usage.runs,
+    )
+
+
+def _limits(
+    cpu_limit: int | None, memory_limit: int | None
+) -> list[tuple[int, tuple[int, int]]]:
+    """Returns the (resource, (soft limit, hard limit)) pairs of the limits of a TeX run."""
+    import resource
+
+    limits = []
+    if cpu_limit is not None:
+        # SIGXCPU at the soft limit, and SIGKILL one second later for processes which
+        # ignore it
+        limits.append((resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1)))
+    if memory_limit is not None:
+        limits.append((resource.RLIMIT_AS, (memory_limit, memory_limit)))
+    return limits
+
+
+def _set_limits(pid: int, limits: list[tuple[int, tuple[int, int]]]) -> None:
+    """Sets the limits of the process pid, which was just started. Unlike a preexec_fn,
+    this is safe while other threads of this process are running, e.g. in `tikzpy serve`.
+    The CPU time which the process used before counts towards its limit."""
+    import resource
+
+    for limit, values in limits:
+        try:
+            resource.prlimit(pid, limit, values)
+        except ProcessLookupError:
+            # The process already exited
+            return
+
+
+def _wait(process: subprocess.Popen, timeout: float | None):
+    """Waits for process to exit and returns its resource usage, if the platform reports it.
+    Raises subprocess.TimeoutExpired after timeout seconds."""
+    if not hasattr(os, "wait4"):
+        process.wait(timeout)
+        return None
+    if timeout is None:
+        _, status, rusage = os.wait4(process.pid, 0)
+    else:
+        import subprocess
+
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+            if pid != 0:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(process.args, timeout)
+            time.sleep(min(delay, remaining))
+            delay = min(2 * delay, 0.05)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Kills process and every process which it started, and reaps it."""
+    if os.name == "posix":
+        import signal
+
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+    process.wait()
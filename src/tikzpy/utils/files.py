@@ -0,0 +1,290 @@
+import os
+import stat
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# hashlib, shutil and tempfile are imported by the functions which use them, as importing
+# them would otherwise be a noticeable part of the time taken by `import tikzpy`.
+
+CHUNK_SIZE = 1 << 16
+
+
+def _read_umask() -> int:
+    """Returns the umask of the process. It is read from /proc where possible, as otherwise it
+    can only be read by temporarily changing it, which races with threads creating files."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# The umask is read once, when tikzpy is imported, so later changes of it are not seen
+_UMASK = _read_umask()
+
+
+def file_digest(filepath: str | Path) -> str | None:
+    """Returns the SHA-256 hex digest of the file at filepath, or None if there is no such file.
+    The file is read in chunks, so large files are never held in memory."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    try:
+        with open(filepath, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _coalesce(chunks: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Joins consecutive small text chunks into chunks of at least size characters (except
+    the last one), so that streaming many small chunks does not cost a call per chunk."""
+    pending = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(pending)
+            pending.clear()
+            length = 0
+    if pending:
+        yield "".join(pending)
+
+
+def _mkstemp(filepath: Path) -> tuple[int, str]:
+    """Creates a temporary file next to filepath, which may atomically replace it. Returns
+    its file descriptor and path, like tempfile.mkstemp.
+
+    mkstemp creates files which only their owner may read, so the temporary file is given the
+    permissions of filepath, or, if there is no such file yet, the permissions which open()
+    would give a new file under the umask of the process when tikzpy was imported.
+    """
+    import tempfile
+
+    try:
+        mode = stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(
+        dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp"
+    )
+    try:
+        os.chmod(tmp_path, mode)
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp_path)
+        raise
+    return fd, tmp_path
+
+
+def _write_temp_file(filepath: Path, chunks: Iterable[str]) -> tuple[str, str]:
+    """Streams the text chunks into a new temporary file in the directory of filepath.
+    Returns the path of the temporary file and the SHA-256 hex digest of its content."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    fd, tmp_path = _mkstemp(filepath)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in _coalesce(chunks):
+                data = chunk.encode("utf-8")
+                digest.update(data)
+                f.write(data)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+
+def atomic_write(filepath: str | Path, chunks: Iterable[str]) -> str:
+    """Writes the text chunks to filepath such that readers never observe a partially written file.
+
+    The chunks are streamed into a temporary file next to filepath, which then atomically
+    replaces filepath via os.replace. Returns the SHA-256 hex digest of the content.
+    """
+    tmp_path, digest = _write_temp_file(Path(filepath), chunks)
+    try:
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return digest
+
+
+def write_if_changed(filepath: str | Path, chunks: Iterable[str]) -> bool:
+    """Writes the text chunks to filepath, unless the file already has exactly that content.
+
+    The chunks are streamed into a temporary file next to filepath while being hashed. If the
+    hash matches the existing file, the temporary file is discarded and the existing file (and
+    its modification time) is left untouched. Otherwise, the temporary file atomically replaces
+    filepath via os.replace. Returns whether filepath was written.
+    """
+    tmp_path, digest = _write_temp_file(Path(filepath), chunks)
+    try:
+        if digest == file_digest(filepath):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def atomic_move(src: str | Path, dst: str | Path) -> None:
+    """Moves the file src to dst such that readers of dst never observe a partially written file.
+
+    Unlike shutil.move, which falls back to copying directly into dst when src and dst live on
+    different filesystems, the file is first copied next to dst and then atomically renamed.
+    """
+    try:
+        os.replace(src, dst)
+        return
+    except OSError:
+        # Most likely src and dst are on different filesystems
+        pass
+    atomic_copy(src, dst)
+    os.remove(src)
+
+
+def atomic_write_bytes(filepath: str | Path, data: bytes) -> None:
+    """Writes data to filepath such that readers of filepath never observe a partially
+    written file, like atomic_write does for text."""
+    filepath = Path(filepath)
+    fd, tmp_path = _mkstemp(filepath)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_copy(src: str | Path, dst: str | Path) -> None:
+    """Copies the file src to dst such that readers of dst never observe a partially written
+    file, by copying it next to dst and then atomically renaming the copy."""
+    import shutil
+
+    dst = Path(dst)
+    fd, tmp_path = _mkstemp(dst)
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(filepath: str | Path, blocking: bool = True) -> Iterator[None]:
+    """Holds an exclusive lock associated with filepath, blocking until it is available.
+
+    The lock is held on a sibling file named "<filepath>.lock", so it serializes every process
+    which writes filepath through this function. The lock file is left in place afterwards,
+    unless its holder removes it with remove_lock_file. Processes which were waiting on a
+    removed lock file then lock the new one. If blocking is False, BlockingIOError is raised
+    instead of waiting for a lock held elsewhere.
+    """
+    lock_path = lock_file_path(filepath)
+    while True:
+        with open(lock_path, "a+b") as lock_file:
+            _lock(lock_file, lock_path, blocking)
+            try:
+                if _is_current(lock_file, lock_path):
+                    yield
+                    return
+            finally:
+                _unlock(lock_file)
+
+
+def lock_file_path(filepath: str | Path) -> Path:
+    """Returns the path of the lock file which file_lock holds for filepath."""
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.name}.lock")
+
+
+def remove_lock_file(filepath: str | Path) -> None:
+    """Removes the lock file of filepath, which must be held by this process with file_lock.
+    On Windows, where open files cannot be removed, the lock file is left in place."""
+    try:
+        lock_file_path(filepath).unlink(missing_ok=True)
+    except PermissionError:
+        pass
+
+
+def _is_current(lock_file, lock_path: Path) -> bool:
+    """Returns whether lock_file is still the file at lock_path, i.e. it was not removed by
+    remove_lock_file while we waited to lock it."""
+    try:
+        current = os.stat(lock_path)
+    except FileNotFoundError:
+        return False
+    locked = os.fstat(lock_file.fileno())
+    return (locked.st_dev, locked.st_ino) == (current.st_dev, current.st_ino)
+
+
+def _lock(lock_file, lock_path: Path, blocking: bool) -> None:
+    if os.name == "nt":
+        import msvcrt
+
+        while True:
+            try:
+                # LK_LOCK itself gives up after 10 seconds, so we keep retrying
+                lock_file.seek(0)
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                msvcrt.locking(lock_file.fileno(), mode, 1)
+                return
+            except OSError:
+                if not blocking:
+                    raise BlockingIOError(f"{lock_path} is locked") from None
+    else:
+        import fcntl
+
+        # Raises BlockingIOError if the lock is held and LOCK_NB is given
+        mode = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        fcntl.flock(lock_file, mode)
+
+
+def _unlock(lock_file) -> None:
+    if os.name == "nt":
+        import msvcrt
+
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_file(
+    filepath: str | Path,
+    chunks: Iterable[str],
+    only_if_changed: bool = False,
+    lock: bool = False,
+) -> bool:
+    """Atomically writes the text chunks to filepath. Returns whether filepath was written.
+
+    Parameters:
+        only_if_changed: Leave filepath untouched if it already has exactly this content.
+        lock: Hold file_lock(filepath) while writing, to serialize concurrent writers.
+    """
+    with file_lock(filepath) if lock else nullcontext():
+        if only_if_changed:
+            return write_if_changed(filepath, chunks)
+        atomic_write(filepath, chunks)
+        return True
@@ -1,4 +1,5 @@
 import re
+from collections.abc import Iterable
 from pathlib import Path, WindowsPath
 
 
@@ -74,38 +75,26 @@ def find_image_end_boundary(img_data):
     return ind
 
 
-def extract_error_content(log_lines: list[str]) -> str:
+def extract_error_content(log_lines: Iterable[str]) -> str | None:
     """
-    Scans the provided text for LaTeX error messages.
+    Scans the lines of a LaTeX log for its first error message.
 
-    This function searches the given text for lines that begin with "! " which
-    typically indicates the start of an error message in LaTeX logs. It then
-    continues to collect all subsequent lines until it encounters a line that
-    begins with "? ", which usually indicates the end of the error message.
-    All collected lines are appended to a list and returned.
+    The lines are parsed by `tikzpy.utils.tex_log.iter_diagnostics`, so the error message
+    begins with the line starting with "! " and ends with a "?" prompt or with the context
+    of the offending line of code, after its "l.<line number>" line.
 
     Parameters:
-    text (str): The input text to scan for error messages.
+    log_lines (Iterable[str]): The lines of the log, e.g. an open log file.
 
     Returns:
-    list: A list of strings containing the lines of the error message.
-          If no error message is found, the list will be empty.
+    str: The lines of the first error message, or None if there is no error.
     """
-    error_lines = []
-    recording = False
-
-    for line in log_lines:
-        if line.startswith("! "):
-            recording = True
-        if recording:
-            error_lines.append(line)
-            if line.startswith("?"):
-                break
-
-    if len(error_lines) == 0:
-        return None
+    from tikzpy.utils.tex_log import iter_diagnostics
 
-    return "".join(error_lines)
+    for diagnostic in iter_diagnostics(log_lines):
+        if diagnostic.severity == "error":
+            return diagnostic.message
+    return None
 
 
 def in_notebook() -> bool:
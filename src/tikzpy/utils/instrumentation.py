@@ -0,0 +1,101 @@
+import re
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# The stages of TikzPicture.compile(), in the order in which they run
+COMPILE_STAGES = ("codegen", "write", "tex", "parse_log", "move_pdf")
+
+# latexmk announces every (re)run of the TeX engine with a line such as
+#   Latexmk: Run number 1 of rule 'pdflatex'
+TEX_RUN = re.compile(rb"Run number \d+ of rule '(?:pdf|xe|lua)?latex")
+
+
+@dataclass
+class CompileEvent:
+    """A stage of TikzPicture.compile() which has finished.
+
+    Attributes:
+        stage: One of "codegen", "write", "tex", "parse_log" or "move_pdf".
+        seconds: The wall clock time which the stage took.
+        bytes: The number of bytes which the stage produced or consumed, if any: the size of the
+            generated TeX code, of the TeX file, of the log file or of the PDF.
+        details: Extra information about the stage. For the "tex" stage, this has the command,
+            the engine, its return code and "tex_runs", the number of times the TeX engine ran:
+            1 when the engine is run directly, or the runs which latexmk reported, which it
+            does not with quiet=True (None).
+    """
+
+    stage: str
+    seconds: float
+    bytes: int | None = None
+    details: dict = field(default_factory=dict)
+
+
+EventCallback = Callable[[CompileEvent], None]
+
+
+class CompileProfile:
+    """Collects the CompileEvents of one or more compilations.
+
+    A CompileProfile is callable, so it can be passed as the `on_event` argument of
+    TikzPicture.compile().
+
+    ```python
+    profile = CompileProfile()
+    tikz.compile(on_event=profile)
+    print(profile.by_stage())  # {"codegen": 0.002, "write": 0.0004, "tex": 1.3, ...}
+    ```
+    """
+
+    def __init__(self) -> None:
+        self.events: list[CompileEvent] = []
+
+    def __call__(self, event: CompileEvent) -> None:
+        self.events.append(event)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(event.seconds for event in self.events)
+
+    def by_stage(self) -> dict[str, float]:
+        """Returns the total time spent in each stage."""
+        totals: dict[str, float] = {}
+        for event in self.events:
+            totals[event.stage] = totals.get(event.stage, 0.0) + event.seconds
+        return totals
+
+
+class _Stage:
+    """What the body of a stage() block can report about the stage."""
+
+    __slots__ = ("bytes", "details")
+
+    def __init__(self) -> None:
+        self.bytes: int | None = None
+        self.details: dict = {}
+
+
+@contextmanager
+def stage(on_event: EventCallback | None, name: str) -> Iterator[_Stage | None]:
+    """Times the body of the with block and reports it to on_event as a CompileEvent.
+
+    The body can fill in the bytes and details of the event on the yielded object. If on_event
+    is None, nothing is timed and None is yielded, so that the body can skip measuring sizes.
+    The event is only reported if the body does not raise.
+    """
+    if on_event is None:
+        yield None
+        return
+    info = _Stage()
+    start = time.perf_counter()
+    yield info
+    seconds = time.perf_counter() - start
+    on_event(CompileEvent(name, seconds, info.bytes, info.details))
+
+
+def count_tex_runs(output: bytes) -> int | None:
+    """Counts the runs of the TeX engine announced in the output of latexmk, or returns None
+    if there are no announcements to count."""
+    return len(TEX_RUN.findall(output)) or None
@@ -0,0 +1,72 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+
+# Chunks smaller than this are not worth sending to another process
+MIN_CHUNK_SIZE = 1_000
+# The number of chunks per process, so that processes which finish early pick up more work
+CHUNKS_PER_PROCESS = 4
+
+# The drawing objects of the picture being rendered, in a forked worker process
+_drawing_objects: list = []
+
+
+def render_code(
+    drawing_objects: list,
+    processes: int,
+    indent: str = "    ",
+    start_method: str | None = None,
+) -> str:
+    """Returns the code of the drawing objects, one per line, rendered in chunks by a pool
+    of processes and concatenated in order.
+
+    The workers are started with start_method ("fork", "spawn" or "forkserver"), or with
+    the default start method of multiprocessing if it is None. Forking is only safe if no
+    other thread of this process is running, e.g. one which builds another picture. With
+    "fork", the workers inherit the drawing objects from this process, so they are neither
+    serialized nor copied up front, and only the rendered code of each chunk is sent back.
+    Otherwise, each chunk is pickled and sent to a worker. Too few objects to fill two
+    chunks are rendered in this process.
+    """
+    num_chunks = max(1, processes) * CHUNKS_PER_PROCESS
+    chunk_size = max(MIN_CHUNK_SIZE, ceil(len(drawing_objects) / num_chunks))
+    if processes <= 1 or len(drawing_objects) <= chunk_size:
+        return _render(drawing_objects, indent)
+    ranges = [
+        (start, min(start + chunk_size, len(drawing_objects)))
+        for start in range(0, len(drawing_objects), chunk_size)
+    ]
+    processes = min(processes, len(ranges))
+
+    context = multiprocessing.get_context(start_method)
+    if context.get_start_method() == "fork":
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=context,
+            initializer=_set_drawing_objects,
+            initargs=(drawing_objects,),
+        ) as pool:
+            futures = [
+                pool.submit(_render_range, start, stop, indent) for start, stop in ranges
+            ]
+            return "".join(future.result() for future in futures)
+
+    with ProcessPoolExecutor(processes, mp_context=context) as pool:
+        futures = [
+            pool.submit(_render, drawing_objects[start:stop], indent)
+            for start, stop in ranges
+        ]
+        return "".join(future.result() for future in futures)
+
+
+def _set_drawing_objects(drawing_objects: list) -> None:
+    global _drawing_objects
+    _drawing_objects = drawing_objects
+
+
+def _render_range(start: int, stop: int, indent: str) -> str:
+    return _render(_drawing_objects[start:stop], indent)
+
+
+def _render(drawing_objects: list, indent: str) -> str:
+    return "".join(indent + draw_obj.code + "\n" for draw_obj in drawing_objects)
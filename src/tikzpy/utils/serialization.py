@@ -0,0 +1,664 @@
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Callable, Sequence
+from numbers import Integral, Real
+
+from tikzpy.drawing_objects.arc import Arc
+from tikzpy.drawing_objects.circle import Circle
+from tikzpy.drawing_objects.drawing_object import DrawingObject
+from tikzpy.drawing_objects.ellipse import Ellipse
+from tikzpy.drawing_objects.line import Line
+from tikzpy.drawing_objects.node import Node
+from tikzpy.drawing_objects.pic import Pic
+from tikzpy.drawing_objects.plotcoordinates import PlotCoordinates
+from tikzpy.drawing_objects.point import Point
+from tikzpy.drawing_objects.rectangle import Rectangle
+from tikzpy.drawing_objects.xy_plane import R2_Space
+from tikzpy.tikz_environments.clip import Clip
+from tikzpy.tikz_environments.scope import Scope
+from tikzpy.tikz_environments.tikz_command import TikzCommand
+from tikzpy.tikz_environments.tikz_picture import TikzPicture
+from tikzpy.tikz_environments.tikz_style import TikzStyle
+
+SCENE_VERSION = 1
+
+# The binary format is a header (MAGIC, the format version and the length of the
+# structure), the structure of the scene as JSON, and then a data section holding the
+# coordinate arrays referenced by the structure. Arrays are little-endian and 8-byte
+# aligned, so that they can be loaded without copying them.
+MAGIC = b"TIKZPY\x00\x00"
+HEADER = struct.Struct("<8sII")
+ALIGNMENT = 8
+ITEM_SIZES = {"d": 8, "q": 8, "i": 4}
+# Lists of numbers, and runs of objects of the same type, which are shorter than this are
+# stored as plain JSON, where they take less space than arrays or columns.
+MIN_ARRAY_LENGTH = 8
+MIN_BATCH_LENGTH = 8
+
+
+def to_dict(obj) -> dict:
+    """Converts a drawing object, Node, R2_Space, Scope, Clip, TikzStyle, TikzCommand or
+    TikzPicture into a dict of plain Python values, which can be saved with `json.dump`."""
+    data = _dump(obj, raw=False)
+    data["version"] = SCENE_VERSION
+    return data
+
+
+def from_dict(data: dict):
+    """Recreates the object saved in a dict returned by `to_dict`."""
+    _check_version(data.get("version", SCENE_VERSION))
+    return _load(data)
+
+
+def to_bytes(obj) -> bytes:
+    """Encodes an object supported by `to_dict` in a compact binary format.
+
+    Coordinates are stored as arrays: the points of a PlotCoordinates as one array per axis,
+    and long runs of objects of the same type (e.g. thousands of circles) as one column per
+    attribute.
+    """
+    data = _dump(obj, raw=True)
+    data["version"] = SCENE_VERSION
+    writer = _BinaryWriter()
+    structure = json.dumps(writer.encode(data), separators=(",", ":"))
+    structure = structure.encode("utf-8")
+    header = HEADER.pack(MAGIC, SCENE_VERSION, len(structure))
+    chunks = [header, structure, _padding(len(header) + len(structure))]
+    chunks.extend(writer.chunks)
+    return b"".join(chunks)
+
+
+def from_bytes(data: bytes | bytearray | memoryview):
+    """Recreates the object encoded by `to_bytes`.
+
+    The coordinates of a PlotCoordinates are not copied: the plot reads them directly from
+    data, which therefore must not be modified while the plot is in use.
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("The data is too short to be a tikzpy scene")
+    magic, version, length = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("The data is not a tikzpy scene")
+    _check_version(version)
+    start = HEADER.size + length
+    structure = json.loads(bytes(view[HEADER.size : start]))
+    reader = _BinaryReader(view[start + len(_padding(start)) :])
+    return _load(reader.decode(structure))
+
+
+def _check_version(version: int) -> None:
+    if version > SCENE_VERSION:
+        raise ValueError(
+            f"The scene has version {version}, but this version of tikzpy only supports "
+            f"scenes up to version {SCENE_VERSION}"
+        )
+
+
+def _padding(length: int) -> bytes:
+    return bytes(-length % ALIGNMENT)
+
+
+# Conversion of objects to and from dicts
+
+
+def _dump(obj, raw: bool) -> dict:
+    """Converts obj to a dict. If raw is True, the coordinate columns of a PlotCoordinates
+    are returned as is instead of being converted to lists."""
+    dumper = _DUMPERS.get(type(obj))
+    if dumper is None:
+        raise TypeError(f"Cannot serialize an object of type {type(obj).__name__}")
+    data = {"type": type(obj).__name__}
+    data.update(dumper(obj, raw))
+    return data
+
+
+def _load(data: dict):
+    loader = _LOADERS.get(data.get("type"))
+    if loader is None:
+        raise ValueError(f"Unknown object type {data.get('type')!r}")
+    return loader(data)
+
+
+def _number(value):
+    """Converts value (e.g. a numpy float) to a plain int or float."""
+    if value is None or type(value) in (int, float):
+        return value
+    if isinstance(value, Integral):
+        return int(value)
+    if isinstance(value, Real):
+        return float(value)
+    raise TypeError(f"Cannot serialize the number {value!r}")
+
+
+def _point(point: Point | None) -> list | None:
+    if point is None:
+        return None
+    if point.z is None:
+        return [_number(point.x), _number(point.y)]
+    return [_number(point.x), _number(point.y), _number(point.z)]
+
+
+def _column(values: Sequence, raw: bool) -> Sequence:
+    if raw and isinstance(values, memoryview):
+        return values
+    values = list(values)
+    if all(type(value) is float for value in values):
+        return values
+    return [_number(value) for value in values]
+
+
+def _dump_node(node: Node, raw: bool) -> dict:
+    return {
+        "position": _point(node.position),
+        "options": node.options,
+        "text": node.text,
+    }
+
+
+def _dump_drawing_object(draw_obj: DrawingObject) -> dict:
+    node = draw_obj.node
+    return {
+        "action": draw_obj.action,
+        "options": draw_obj.options,
+        "node": None if node is None else _dump_node(node, False),
+    }
+
+
+def _dump_line(line: Line, raw: bool) -> dict:
+    return {
+        **_dump_drawing_object(line),
+        "start": _point(line.start),
+        "end": _point(line.end),
+        "to_options": line.to_options,
+        "control_pts": [_point(point) for point in line.control_pts],
+    }
+
+
+def _dump_circle(circle: Circle, raw: bool) -> dict:
+    return {
+        **_dump_drawing_object(circle),
+        "center": _point(circle.center),
+        "radius": _number(circle.radius),
+    }
+
+
+def _dump_ellipse(ellipse: Ellipse, raw: bool) -> dict:
+    return {
+        **_dump_drawing_object(ellipse),
+        "center": _point(ellipse.center),
+        "x_axis": _number(ellipse.x_axis),
+        "y_axis": _number(ellipse.y_axis),
+    }
+
+
+def _dump_rectangle(rectangle: Rectangle, raw: bool) -> dict:
+    return {
+        **_dump_drawing_object(rectangle),
+        "left_corner": _point(rectangle.left_corner),
+        "width": _number(rectangle.width),
+        "height": _number(rectangle.height),
+    }
+
+
+def _dump_arc(arc: Arc, raw: bool) -> dict:
+    return {
+        **_dump_drawing_object(arc),
+        "position": _point(arc.position),
+        "start_angle": _number(arc.start_angle),
+        "end_angle": _number(arc.end_angle),
+        "radius": _number(arc.radius),
+        "x_radius": _number(arc.x_radius),
+        "y_radius": _number(arc.y_radius),
+        "radians": arc.radians,
+        "draw_from_start": arc.draw_from_start,
+    }
+
+
+def _dump_plot_coordinates(plot: PlotCoordinates, raw: bool) -> dict:
+    if plot._points is None:
+        columns = plot._columns
+    else:
+        points = plot._points
+        columns = [[point.x for point in points], [point.y for point in points]]
+        if any(point.z is not None for point in points):
+            columns.append([point.z for point in points])
+    return {
+        **_dump_drawing_object(plot),
+        "plot_options": plot.plot_options,
+        "external": plot.external,
+        "relative": plot.relative,
+        "precision": plot.precision,
+        "points": dict(zip("xyz", (_column(column, raw) for column in columns))),
+    }
+
+
+def _dump_pic(pic: Pic, raw: bool) -> dict:
+    return {
+        "name": pic.name,
+        "position": _point(pic.position),
+        "rotate": _number(pic.rotate_angle),
+        "scale": _number(pic.scale_factor),
+        "options": pic.options,
+    }
+
+
+def _dump_scope(scope: Scope, raw: bool) -> dict:
+    return {
+        "options": scope.options,
+        "transform": scope.transform,
+        "transforms": [_dump_transform(*transform) for transform in scope.transforms],
+        "drawing_objects": [_dump(obj, raw) for obj in scope.drawing_objects],
+    }
+
+
+def _dump_transform(name: str, *args) -> list:
+    if name == "rotate":
+        angle, about_pt = args
+        return [name, _number(angle), _point(about_pt)]
+    return [name, *(_number(arg) for arg in args)]
+
+
+def _dump_clip(clip: Clip, raw: bool) -> dict:
+    return {"draw_obj": _dump(clip.draw_obj, raw), "draw": clip.draw}
+
+
+def _dump_tikz_command(command: TikzCommand, raw: bool) -> dict:
+    return {"code": command.code}
+
+
+def _dump_tikz_style(style: TikzStyle, raw: bool) -> dict:
+    return {"style_name": style.style_name, "style_settings": style.style_settings}
+
+
+def _dump_r2_space(xy_plane: R2_Space, raw: bool) -> dict:
+    return {
+        "x_interval": [_number(value) for value in xy_plane.x_interval],
+        "y_interval": [_number(value) for value in xy_plane.y_interval],
+        "origin": [_number(value) for value in xy_plane.origin],
+        "x_axis_options": xy_plane.x_axis_options,
+        "y_axis_options": xy_plane.y_axis_options,
+        "x_label": xy_plane.x_label,
+        "y_label": xy_plane.y_label,
+        "nticks": xy_plane.nticks,
+        "show_labels": xy_plane.show_labels,
+    }
+
+
+def _dump_tikz_picture(tikz: TikzPicture, raw: bool) -> dict:
+    data = {
+        "options": tikz.options,
+        "preamble": dict(tikz._preamble),
+        "postamble": dict(tikz._postamble),
+        "interned_styles": {
+            options: style.style_name
+            for options, style in tikz._interned_styles.items()
+        },
+        "drawing_objects": [_dump(obj, raw) for obj in tikz.drawing_objects],
+    }
+    if hasattr(tikz, "tdplotsetmaincoords"):
+        data["tdplotsetmaincoords"] = list(tikz.tdplotsetmaincoords)
+    return data
+
+
+def _coords(point: list | None) -> tuple | None:
+    return None if point is None else tuple(point)
+
+
+def _load_node(data: dict) -> Node:
+    return Node(_coords(data["position"]), data["options"], data["text"])
+
+
+def _load_pic(data: dict) -> Pic:
+    return Pic(
+        data["name"],
+        _coords(data["position"]),
+        data["rotate"],
+        data["scale"],
+        data["options"],
+    )
+
+
+def _with_node(draw_obj: DrawingObject, data: dict) -> DrawingObject:
+    if data["node"] is not None:
+        draw_obj.node = _load_node(data["node"])
+    return draw_obj
+
+
+def _load_line(data: dict) -> Line:
+    line = Line(
+        _coords(data["start"]),
+        _coords(data["end"]),
+        options=data["options"],
+        to_options=data["to_options"],
+        control_pts=[_coords(point) for point in data["control_pts"]],
+        action=data["action"],
+    )
+    return _with_node(line, data)
+
+
+def _load_circle(data: dict) -> Circle:
+    circle = Circle(
+        _coords(data["center"]), data["radius"], data["options"], data["action"]
+    )
+    return _with_node(circle, data)
+
+
+def _load_ellipse(data: dict) -> Ellipse:
+    ellipse = Ellipse(
+        _coords(data["center"]),
+        data["x_axis"],
+        data["y_axis"],
+        data["options"],
+        data["action"],
+    )
+    return _with_node(ellipse, data)
+
+
+def _load_rectangle(data: dict) -> Rectangle:
+    rectangle = Rectangle(
+        _coords(data["left_corner"]),
+        data["width"],
+        data["height"],
+        data["options"],
+        data["action"],
+    )
+    return _with_node(rectangle, data)
+
+
+def _load_arc(data: dict) -> Arc:
+    arc = Arc(
+        _coords(data["position"]),
+        data["start_angle"],
+        data["end_angle"],
+        radius=data["radius"],
+        x_radius=data["x_radius"],
+        y_radius=data["y_radius"],
+        options=data["options"],
+        radians=data["radians"],
+        draw_from_start=data["draw_from_start"],
+        action=data["action"],
+    )
+    return _with_node(arc, data)
+
+
+def _load_plot_coordinates(data: dict) -> PlotCoordinates:
+    points = data["points"]
+    plot = PlotCoordinates.from_columns(
+        points["x"],
+        points["y"],
+        points.get("z"),
+        options=data["options"],
+        plot_options=data["plot_options"],
+        action=data["action"],
+    )
+    plot.external = data.get("external", False)
+    plot.relative = data.get("relative", False)
+    plot.precision = data.get("precision", 4)
+    return _with_node(plot, data)
+
+
+def _load_transform(name: str, *args) -> tuple:
+    if name == "rotate":
+        angle, about_pt = args
+        return (name, angle, None if about_pt is None else Point(_coords(about_pt)))
+    return (name, *args)
+
+
+def _load_scope(data: dict) -> Scope:
+    scope = Scope(data["options"], transform=data.get("transform", "objects"))
+    scope.transforms = [_load_transform(*t) for t in data.get("transforms", [])]
+    scope.drawing_objects = [_load(obj) for obj in data["drawing_objects"]]
+    return scope
+
+
+def _load_clip(data: dict) -> Clip:
+    return Clip(_load(data["draw_obj"]), draw=data["draw"])
+
+
+def _load_tikz_command(data: dict) -> TikzCommand:
+    return TikzCommand(data["code"])
+
+
+def _load_tikz_style(data: dict) -> TikzStyle:
+    return TikzStyle(data["style_name"], data["style_settings"])
+
+
+def _load_r2_space(data: dict) -> R2_Space:
+    xy_plane = R2_Space(
+        tuple(data["x_interval"]),
+        tuple(data["y_interval"]),
+        tuple(data["origin"]),
+        show_labels=data["show_labels"],
+    )
+    xy_plane.x_axis_options = data["x_axis_options"]
+    xy_plane.y_axis_options = data["y_axis_options"]
+    xy_plane.x_label = data["x_label"]
+    xy_plane.y_label = data["y_label"]
+    xy_plane.nticks = data["nticks"]
+    return xy_plane
+
+
+def _load_tikz_picture(data: dict) -> TikzPicture:
+    tikz = TikzPicture(options=data["options"])
+    tikz._preamble = dict(data["preamble"])
+    tikz._postamble = dict(data["postamble"])
+    tikz._interned_styles = {
+        options: TikzStyle(style_name, options)
+        for options, style_name in data["interned_styles"].items()
+    }
+    if "tdplotsetmaincoords" in data:
+        tikz.tdplotsetmaincoords = tuple(data["tdplotsetmaincoords"])
+    tikz.drawing_objects = [_load(obj) for obj in data["drawing_objects"]]
+    return tikz
+
+
+_DUMPERS: dict[type, Callable[..., dict]] = {
+    Arc: _dump_arc,
+    Circle: _dump_circle,
+    Clip: _dump_clip,
+    Ellipse: _dump_ellipse,
+    Line: _dump_line,
+    Node: _dump_node,
+    Pic: _dump_pic,
+    PlotCoordinates: _dump_plot_coordinates,
+    R2_Space: _dump_r2_space,
+    Rectangle: _dump_rectangle,
+    Scope: _dump_scope,
+    TikzCommand: _dump_tikz_command,
+    TikzPicture: _dump_tikz_picture,
+    TikzStyle: _dump_tikz_style,
+}
+
+_LOADERS: dict[str, Callable[[dict], object]] = {
+    "Arc": _load_arc,
+    "Circle": _load_circle,
+    "Clip": _load_clip,
+    "Ellipse": _load_ellipse,
+    "Line": _load_line,
+    "Node": _load_node,
+    "Pic": _load_pic,
+    "PlotCoordinates": _load_plot_coordinates,
+    "R2_Space": _load_r2_space,
+    "Rectangle": _load_rectangle,
+    "Scope": _load_scope,
+    "TikzCommand": _load_tikz_command,
+    "TikzPicture": _load_tikz_picture,
+    "TikzStyle": _load_tikz_style,
+}
+
+
+# The binary format
+
+
+def _typecode(values: Sequence) -> str | None:
+    """The array typecode which can hold values exactly, or None if there is none."""
+    types = set(map(type, values))
+    if types == {float}:
+        return "d"
+    if types == {int}:
+        low, high = min(values), max(values)
+        if -(2**31) <= low and high < 2**31:
+            return "i"
+        if -(2**63) <= low and high < 2**63:
+            return "q"
+    return None
+
+
+class _BinaryWriter:
+    """Replaces the numeric arrays in a dict returned by _dump with references into the
+    data section, which it accumulates in chunks."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes | memoryview] = []
+        self.size = 0
+
+    def encode(self, value):
+        if isinstance(value, dict):
+            return {key: self.encode(item) for key, item in value.items()}
+        if isinstance(value, memoryview):
+            return self._buffer(value)
+        if isinstance(value, list):
+            if len(value) >= MIN_ARRAY_LENGTH:
+                typecode = _typecode(value)
+                if typecode is not None:
+                    return self._array(array(typecode, value))
+                if all(isinstance(item, dict) and "type" in item for item in value):
+                    return self._objects(value)
+            return [self.encode(item) for item in value]
+        return value
+
+    def _buffer(self, view: memoryview) -> dict:
+        """Writes a buffer (e.g. the column of a PlotCoordinates loaded by from_bytes)."""
+        if view.format in ("d", "q") and sys.byteorder == "little":
+            if not view.c_contiguous:
+                # E.g. a column of a file of coordinates, which is a strided view
+                view = memoryview(view.tobytes()).cast(view.format)
+            return self._write(view.format, view, len(view))
+        values = view.tolist()
+        return self.encode(values) if isinstance(values, list) else values
+
+    def _array(self, values: array) -> dict:
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        return self._write(values.typecode, values, len(values))
+
+    def _write(self, typecode: str, data, length: int) -> dict:
+        offset = self.size
+        self.chunks.append(data)
+        self.size += length * ITEM_SIZES[typecode]
+        padding = _padding(self.size)
+        if padding:
+            self.chunks.append(padding)
+            self.size += len(padding)
+        return {"$array": [typecode, offset, length]}
+
+    def _objects(self, objects: list[dict]) -> list:
+        """Stores the runs of objects of the same type and with the same keys as columns."""
+        encoded = []
+        start = 0
+        while start < len(objects):
+            signature = (objects[start]["type"], tuple(objects[start]))
+            end = start + 1
+            while (
+                end < len(objects)
+                and (objects[end]["type"], tuple(objects[end])) == signature
+            ):
+                end += 1
+            run = objects[start:end]
+            if len(run) >= MIN_BATCH_LENGTH:
+                columns = {
+                    key: self._column([obj[key] for obj in run]) for key in run[0]
+                }
+                encoded.append({"$batch": len(run), "columns": columns})
+            else:
+                encoded.extend(self.encode(obj) for obj in run)
+            start = end
+        return encoded
+
+    def _column(self, values: list) -> dict:
+        first = values[0]
+        if isinstance(first, (str, int, float, type(None))) and all(
+            type(value) is type(first) and value == first for value in values
+        ):
+            return {"$const": first}
+        typecode = _typecode(values)
+        if typecode is not None:
+            return self._array(array(typecode, values))
+        if all(type(value) is str for value in values):
+            strings = list(dict.fromkeys(values))
+            index = {string: idx for idx, string in enumerate(strings)}
+            indices = array("i", [index[value] for value in values])
+            return {"$strings": strings, "index": self._array(indices)}
+        if all(type(value) is list for value in values):
+            # Points, e.g. the centers of a run of circles, are stored as one column per axis
+            if len({len(value) for value in values}) == 1 and len(first) in (2, 3):
+                axes = list(zip(*values))
+                typecodes = [_typecode(axis) for axis in axes]
+                if None not in typecodes:
+                    return {
+                        "$points": [
+                            self._array(array(typecode, axis))
+                            for typecode, axis in zip(typecodes, axes)
+                        ]
+                    }
+        return {"$values": [self.encode(value) for value in values]}
+
+
+class _BinaryReader:
+    """Undoes the work of _BinaryWriter, given the data section of the binary format."""
+
+    def __init__(self, data: memoryview) -> None:
+        self.data = data
+
+    def decode(self, value):
+        if isinstance(value, dict):
+            if "$array" in value:
+                return self._array(value)
+            return {key: self.decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            decoded = []
+            for item in value:
+                if isinstance(item, dict) and "$batch" in item:
+                    decoded.extend(self._batch(item))
+                else:
+                    decoded.append(self.decode(item))
+            return decoded
+        return value
+
+    def _array(self, reference: dict) -> Sequence:
+        typecode, offset, length = reference["$array"]
+        if typecode not in ITEM_SIZES:
+            raise ValueError(f"Unknown array type {typecode!r}")
+        end = offset + length * ITEM_SIZES[typecode]
+        if offset < 0 or length < 0 or end > len(self.data):
+            raise ValueError("The data is truncated")
+        if sys.byteorder == "big":
+            values = array(typecode, self.data[offset:end])
+            values.byteswap()
+            return values
+        return self.data[offset:end].cast(typecode)
+
+    def _batch(self, batch: dict) -> list[dict]:
+        length = batch["$batch"]
+        keys = list(batch["columns"])
+        columns = [
+            self._column(column, length) for column in batch["columns"].values()
+        ]
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    def _column(self, column: dict, length: int) -> list:
+        if "$const" in column:
+            return [column["$const"]] * length
+        if "$array" in column:
+            return self._array(column).tolist()
+        if "$strings" in column:
+            strings = column["$strings"]
+            return [strings[idx] for idx in self._array(column["index"])]
+        if "$points" in column:
+            axes = [self._array(axis).tolist() for axis in column["$points"]]
+            return [list(point) for point in zip(*axes)]
+        return [self.decode(value) for value in column["$values"]]
@@ -0,0 +1,130 @@
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from tikzpy.utils.types import Diagnostic
+
+# The number of lines of an error message we keep. TeX error messages are short, but the
+# context of an error can be arbitrarily long if the offending line of code is.
+MAX_ERROR_LINES = 50
+
+ERROR_LINE_NUMBER = re.compile(r"^l\.(\d+)")
+BOX_WARNING = re.compile(r"^(Overfull|Underfull) \\[hv]box")
+BOX_LINE = re.compile(r"lines? (\d+)")
+INPUT_LINE = re.compile(r"on input line (\d+)\.")
+TEX_WARNING = re.compile(r"^(?:LaTeX|Package [^ ]+|Class [^ ]+) Warning: ")
+
+
+def iter_diagnostics(log_lines: Iterable[str]) -> Iterator[Diagnostic]:
+    """Incrementally parses the lines of a TeX log file into Diagnostics.
+
+    Lines are consumed one at a time and at most MAX_ERROR_LINES lines are buffered, so
+    arbitrarily large log files are parsed in bounded memory. The following are recognized:
+
+    - Errors, which begin with "! " and end after the "l.<line number>" context line.
+    - Overfull and underfull box warnings.
+    - Missing character warnings, which occur when a font does not contain a character.
+    - LaTeX, package and class warnings, e.g. "LaTeX Warning: ... on input line 12."
+    """
+    # The lines of the error or warning currently being read, if any
+    error_lines = None
+    warning_lines = None
+    error_line_number = None
+
+    for line in log_lines:
+        if error_lines is not None:
+            if line.startswith("! "):
+                yield _error(error_lines, error_line_number)
+                error_lines = None
+            else:
+                error_lines.append(line)
+                # The error ends with a "?" prompt, or with the line after the
+                # "l.<line number>" line, which is the rest of the offending code.
+                if (
+                    line.startswith("?")
+                    or error_line_number is not None
+                    or len(error_lines) >= MAX_ERROR_LINES
+                ):
+                    yield _error(error_lines, error_line_number)
+                    error_lines = None
+                elif match := ERROR_LINE_NUMBER.match(line):
+                    error_line_number = int(match.group(1))
+                continue
+
+        if warning_lines is not None and line.startswith("! "):
+            yield _warning(warning_lines)
+            warning_lines = None
+        elif warning_lines is not None:
+            if line.strip() != "":
+                warning_lines.append(line.strip())
+            if (
+                line.strip() == ""
+                or INPUT_LINE.search(line)
+                or len(warning_lines) >= MAX_ERROR_LINES
+            ):
+                yield _warning(warning_lines)
+                warning_lines = None
+            continue
+
+        if line.startswith("! "):
+            error_lines = [line]
+            error_line_number = None
+        elif BOX_WARNING.match(line):
+            match = BOX_LINE.search(line)
+            yield Diagnostic(
+                severity="warning",
+                kind=f"{line.split()[0].lower()} box",
+                message=line.rstrip("\n"),
+                line=int(match.group(1)) if match else None,
+            )
+        elif line.startswith("Missing character: "):
+            yield Diagnostic(
+                severity="warning",
+                kind="missing character",
+                message=line.rstrip("\n"),
+            )
+        elif TEX_WARNING.match(line):
+            warning_lines = [line.strip()]
+            if INPUT_LINE.search(line):
+                yield _warning(warning_lines)
+                warning_lines = None
+
+    if error_lines is not None:
+        yield _error(error_lines, error_line_number)
+    if warning_lines is not None:
+        yield _warning(warning_lines)
+
+
+def _error(lines: list[str], line_number: int | None) -> Diagnostic:
+    return Diagnostic(
+        severity="error", kind="error", message="".join(lines), line=line_number
+    )
+
+
+def _warning(lines: list[str]) -> Diagnostic:
+    # Long warnings are wrapped over several lines of the log file
+    message = " ".join(lines)
+    match = INPUT_LINE.search(message)
+    return Diagnostic(
+        severity="warning",
+        kind="warning",
+        message=message,
+        line=int(match.group(1)) if match else None,
+    )
+
+
+def parse_log_file(
+    logfile: Path, max_warnings: int | None = 100
+) -> list[Diagnostic]:
+    """Streams the TeX log file through iter_diagnostics. Every error is kept, but at most
+    max_warnings warnings are, so that the result stays small for very large pictures."""
+    diagnostics = []
+    num_warnings = 0
+    with logfile.open(encoding="utf-8", errors="replace") as f:
+        for diagnostic in iter_diagnostics(f):
+            if diagnostic.severity == "warning":
+                num_warnings += 1
+                if max_warnings is not None and num_warnings > max_warnings:
+                    continue
+            diagnostics.append(diagnostic)
+    return diagnostics
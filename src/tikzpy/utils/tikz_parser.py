@@ -0,0 +1,662 @@
+import re
+from collections.abc import Iterable, Iterator
+from math import atan2, cos, degrees, radians, sin
+from pathlib import Path
+
+from tikzpy.drawing_objects.arc import Arc
+from tikzpy.drawing_objects.circle import Circle
+from tikzpy.drawing_objects.drawing_object import DrawingObject
+from tikzpy.drawing_objects.ellipse import Ellipse
+from tikzpy.drawing_objects.line import Line
+from tikzpy.drawing_objects.node import Node
+from tikzpy.drawing_objects.plotcoordinates import PlotCoordinates
+from tikzpy.drawing_objects.rectangle import Rectangle
+from tikzpy.tikz_environments.clip import Clip
+from tikzpy.tikz_environments.scope import Scope
+from tikzpy.tikz_environments.tikz_command import TikzCommand
+from tikzpy.tikz_environments.tikz_picture import TikzPicture
+from tikzpy.tikz_environments.tikz_style import TikzStyle
+
+# Commands whose statements end with a semicolon, like paths
+PATH_COMMANDS = {
+    "clip",
+    "coordinate",
+    "draw",
+    "fill",
+    "filldraw",
+    "matrix",
+    "node",
+    "path",
+    "pattern",
+    "pic",
+    "shade",
+    "shadedraw",
+}
+ACTIONS = {"draw", "fill", "filldraw", "path"}
+
+COMMENT = re.compile(r"(?<!\\)%.*")
+HEAD = re.compile(r"\\([A-Za-z@]+)")
+# The characters which matter when looking for the end of a statement
+PATH_SYNTAX = re.compile(r"(?<!\\)[;{}]")
+MACRO_SYNTAX = re.compile(r"(?<!\\)[{}\[\]]")
+NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+COORDINATE = re.compile(rf"\s*({NUMBER})\s*,\s*({NUMBER})\s*(?:,\s*({NUMBER})\s*)?")
+LENGTH = re.compile(rf"\s*({NUMBER})\s*(?:cm)?\s*")
+PLOT_POINT = rf"\(\s*({NUMBER})\s*,\s*({NUMBER})\s*(?:,\s*({NUMBER})\s*)?\)"
+PLOT_POINTS = re.compile(rf"(?:\s*{PLOT_POINT})*\s*")
+WORD = re.compile(r"--|\.\.|\+\+|[A-Za-z]+|\S")
+STYLE = re.compile(r"\s*([^=/{}]+?)\s*/\.style\s*=\s*\{(.*)\}\s*", re.DOTALL)
+GROUP_SYNTAX = {
+    "(": re.compile(r"[()]"),
+    "[": re.compile(r"(?<!\\)[\[\]{}]"),
+    "{": re.compile(r"(?<!\\)[{}]"),
+}
+
+
+def parse_tikz(code: str | Iterable[str]) -> TikzPicture:
+    r"""Parses the first tikzpicture environment in code into a TikzPicture.
+
+    code is either a string or an iterable of lines, such as an open file. The statements
+    which tikzpy emits (`\draw`, `\fill`, `\filldraw` and `\path` statements with lines,
+    control points, circles, ellipses, rectangles, arcs and plots, `\node`, `\clip` and
+    scopes) become drawing objects, which can then be shifted, scaled, rotated and so on.
+    Any other statement is kept verbatim as a TikzCommand.
+    """
+    for tikz in iter_pictures(code):
+        return tikz
+    raise ValueError("No tikzpicture environment found")
+
+
+def load_tikz(filepath: str | Path) -> TikzPicture:
+    """Parses the first tikzpicture environment in the file at filepath. The file is read
+    line by line, so only one statement of the file is held in memory at a time."""
+    with open(filepath, encoding="utf-8") as f:
+        return parse_tikz(f)
+
+
+def iter_pictures(code: str | Iterable[str]) -> Iterator[TikzPicture]:
+    """Yields a TikzPicture for every tikzpicture environment in code, as soon as the
+    environment ends. See parse_tikz."""
+    if isinstance(code, str):
+        code = code.splitlines(keepends=True)
+    splitter = _StatementSplitter()
+    builder = _PictureBuilder()
+    for line in code:
+        for line_number, statement in splitter.feed(line):
+            tikz = builder.add(statement, line_number)
+            if tikz is not None:
+                yield tikz
+    for line_number, statement in splitter.close():
+        tikz = builder.add(statement, line_number)
+        if tikz is not None:
+            yield tikz
+    if builder.stack:
+        raise ValueError("The tikzpicture environment is never ended")
+
+
+class _StatementSplitter:
+    r"""Splits TikZ code, fed line by line, into statements.
+
+    A statement is either a path statement (e.g. `\draw ... ;`), which ends with a semicolon
+    outside of braces, the beginning or end of an environment together with its arguments,
+    another macro (e.g. `\tikzset{...}`) together with its arguments, or a line of text.
+    The scan of a statement resumes where it stopped when the next line is fed, so long
+    statements spanning many lines are scanned in linear time.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.line_number = 0
+        self.start_line = 0
+        self.kind: str | None = None
+        self.scan = 0
+        self.depth = 0
+        self.groups = 0
+        # Whether the scan stopped right after the name or an argument of a macro
+        self.after_argument = False
+
+    def feed(self, line: str) -> list[tuple[int, str]]:
+        self.line_number += 1
+        if "%" in line:
+            line = COMMENT.sub("", line)
+        self.buffer += line
+        return self._split(eof=False)
+
+    def close(self) -> list[tuple[int, str]]:
+        return self._split(eof=True)
+
+    def _split(self, eof: bool) -> list[tuple[int, str]]:
+        statements = []
+        while True:
+            if self.kind is None:
+                self.buffer = self.buffer.lstrip()
+                if not self.buffer:
+                    return statements
+                self._begin_statement()
+            end = self._find_end(eof)
+            if end is None:
+                return statements
+            statements.append((self.start_line, self.buffer[:end].strip()))
+            self.buffer = self.buffer[end:]
+            self.kind = None
+
+    def _begin_statement(self) -> None:
+        self.start_line = self.line_number - self.buffer.count("\n")
+        if self.buffer.endswith("\n"):
+            self.start_line += 1
+        self.depth = 0
+        self.groups = 0
+        self.scan = 0
+        self.after_argument = False
+        match = HEAD.match(self.buffer)
+        if match is None:
+            self.kind = "text"
+        elif match.group(1) in PATH_COMMANDS:
+            self.kind = "path"
+        elif match.group(1) == "foreach":
+            self.kind = "foreach"
+        else:
+            # The macro may end right after its name, e.g. \centering
+            self.kind = "macro"
+            self.after_argument = True
+        if match is not None:
+            self.scan = match.end()
+
+    def _find_end(self, eof: bool) -> int | None:
+        """Returns the end of the current statement in the buffer, or None if more input is
+        needed to find it."""
+        buffer = self.buffer
+        if self.kind == "text":
+            end = buffer.find("\n", self.scan)
+            if end != -1:
+                return end + 1
+            self.scan = len(buffer)
+            return len(buffer) if eof else None
+
+        syntax = MACRO_SYNTAX if self.kind == "macro" else PATH_SYNTAX
+        while True:
+            if self.after_argument:
+                end = self._end_after_argument(eof)
+                if end != -1:
+                    return end
+                self.after_argument = False
+            match = syntax.search(buffer, self.scan)
+            if match is None:
+                self.scan = len(buffer)
+                return len(buffer) if eof else None
+            self.scan = match.end()
+            char = match.group()
+            if char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.groups += 1
+                    # A foreach statement ends with its body: \foreach \x in {...} {...}
+                    self.after_argument = self.kind == "macro" or self.groups >= 2
+            elif self.depth == 0:
+                return match.end()
+
+    def _end_after_argument(self, eof: bool) -> int | None:
+        """Returns the end of the statement if the macro at the scan position takes no
+        further arguments, -1 if it does, or None if the next line is needed to tell."""
+        rest = self.buffer[self.scan :].lstrip()
+        if not rest:
+            return len(self.buffer) if eof else None
+        if rest[0] in "{[" or (rest[0] == "=" and self.kind == "macro"):
+            return -1
+        if rest[0] == ";":
+            return len(self.buffer) - len(rest) + 1
+        return self.scan
+
+
+class _PictureBuilder:
+    """Builds TikzPictures from a sequence of statements."""
+
+    def __init__(self) -> None:
+        self.center = False
+        self.preamble: list = []
+        self.stack: list = []
+
+    def add(self, statement: str, line_number: int) -> TikzPicture | None:
+        """Adds the statement, and returns the picture if the statement ended it."""
+        match = HEAD.match(statement)
+        name = match.group(1) if match else ""
+        rest = statement[match.end() :] if match else statement
+
+        if name in ("begin", "end"):
+            env, args = _environment(rest)
+            if name == "begin":
+                return self._begin(env, args, statement)
+            return self._end(env, statement, line_number)
+
+        if not self.stack:
+            if name == "tikzset":
+                self.preamble.append(_style(statement, rest))
+            elif name == "tdplotsetmaincoords":
+                self.preamble.append(statement)
+            return None
+
+        env = self.stack[-1]
+        if name in ACTIONS:
+            env.draw(_parse_path(name, rest) or TikzCommand(statement))
+        elif name == "node":
+            env.draw(_parse_node(rest) or TikzCommand(statement))
+        elif name == "clip":
+            env.draw(_parse_clip(rest) or TikzCommand(statement))
+        else:
+            env.draw(TikzCommand(statement))
+        return None
+
+    def _begin(self, env: str, args: list[str], statement: str) -> None:
+        options = args[0][1:-1] if args and args[0][0] == "[" else ""
+        if env == "tikzpicture" and not self.stack:
+            tikz = TikzPicture(center=self.center, options=options)
+            for idx, item in enumerate(self.preamble):
+                if isinstance(item, TikzStyle):
+                    tikz.add_styles(item)
+                elif not _set_main_coords(tikz, item):
+                    tikz._preamble[f"tex:{idx}"] = item + "\n"
+            self.preamble = []
+            self.stack.append(tikz)
+        elif env == "center" and not self.stack:
+            self.center = True
+        elif self.stack and env == "scope" and len(args) <= 1:
+            scope = Scope(options)
+            self.stack[-1].draw(scope)
+            self.stack.append(scope)
+        elif self.stack:
+            self.stack[-1].draw(TikzCommand(statement))
+
+    def _end(self, env: str, statement: str, line_number: int) -> TikzPicture | None:
+        if not self.stack:
+            if env == "center":
+                self.center = False
+            return None
+        top = self.stack[-1]
+        if env == "tikzpicture" or (env == "scope" and isinstance(top, Scope)):
+            if env == "tikzpicture" and len(self.stack) > 1:
+                raise ValueError(
+                    f"Line {line_number}: the tikzpicture ends before its scopes"
+                )
+            self.stack.pop()
+            return top if env == "tikzpicture" else None
+        if env == "scope":
+            raise ValueError(f"Line {line_number}: unexpected \\end{{scope}}")
+        top.draw(TikzCommand(statement))
+        return None
+
+
+def _set_main_coords(tikz: TikzPicture, statement: str) -> bool:
+    r"""Applies a \tdplotsetmaincoords{theta}{phi} statement to tikz, if it is one."""
+    match = re.fullmatch(
+        rf"\\tdplotsetmaincoords\s*\{{({NUMBER})\}}\s*\{{({NUMBER})\}}", statement
+    )
+    if match is None:
+        return False
+    tikz.set_tdplotsetmaincoords(_number(match.group(1)), _number(match.group(2)))
+    return True
+
+
+def _environment(rest: str) -> tuple[str, list[str]]:
+    """Splits the text after \\begin or \\end into the environment name and its arguments."""
+    groups = []
+    pos = 0
+    while True:
+        while pos < len(rest) and rest[pos].isspace():
+            pos += 1
+        if pos == len(rest) or rest[pos] not in "{[":
+            break
+        end = _group_end(rest, pos)
+        if end is None:
+            break
+        groups.append(rest[pos:end])
+        pos = end
+    if not groups or groups[0][0] != "{":
+        return "", groups
+    return groups[0][1:-1].strip(), groups[1:]
+
+
+def _style(statement: str, rest: str) -> TikzStyle | str:
+    r"""Parses a \tikzset statement defining a single style, like those written by tikzpy.
+    Other statements are returned as is."""
+    match = re.fullmatch(r"\s*\{(.*)\}\s*", rest, re.DOTALL)
+    if match is not None:
+        match = STYLE.fullmatch(match.group(1))
+    if match is None:
+        return statement
+    settings = "{" + match.group(2) + "}"
+    if _group_end(settings, 0) != len(settings):
+        # The statement defines several styles
+        return statement
+    return TikzStyle(match.group(1), match.group(2).strip())
+
+
+def _group_end(text: str, pos: int) -> int | None:
+    """Returns the index after the group (parentheses, brackets or braces) which opens at
+    text[pos], or None if it is not closed. Brackets inside braces are ignored, e.g. in the
+    options [label={[red]above:A}]."""
+    opening = text[pos]
+    depth = 0
+    braces = 0
+    for match in GROUP_SYNTAX[opening].finditer(text, pos):
+        char = match.group()
+        if opening == "[" and char in "{}":
+            braces += 1 if char == "{" else -1
+        elif braces == 0:
+            depth += 1 if char == opening else -1
+            if depth == 0:
+                return match.end()
+    return None
+
+
+def _tokens(text: str) -> list[tuple[str, str]] | None:
+    """Splits the body of a path into coordinates, options, groups and words. Returns None if
+    a group is not closed."""
+    tokens = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        char = text[pos]
+        if char.isspace():
+            pos += 1
+        elif char in "([{":
+            end = _group_end(text, pos)
+            if end is None:
+                return None
+            kind = {"(": "coord", "[": "options", "{": "group"}[char]
+            tokens.append((kind, text[pos + 1 : end - 1]))
+            pos = end
+        else:
+            match = WORD.match(text, pos)
+            tokens.append(("word", match.group()))
+            pos = match.end()
+    return tokens
+
+
+def _number(text: str) -> int | float:
+    """Converts text to an int if it is written as one, so that it is written back as is."""
+    text = text.strip()
+    return int(text) if text.lstrip("+-").isdigit() else float(text)
+
+
+def _coordinate(token: tuple[str, str]) -> tuple | None:
+    kind, value = token
+    if kind != "coord":
+        return None
+    match = COORDINATE.fullmatch(value)
+    if match is None:
+        return None
+    return tuple(_number(value) for value in match.groups() if value is not None)
+
+
+def _length(text: str) -> int | float | None:
+    match = LENGTH.fullmatch(text)
+    return None if match is None else _number(match.group(1))
+
+
+def _key_values(options: str) -> dict[str, str]:
+    """Parses options like "start angle = 0, radius = 1cm" into a dict."""
+    values = {}
+    for option in options.split(","):
+        key, _, value = option.partition("=")
+        values[" ".join(key.split())] = value.strip()
+    return values
+
+
+def _text(group: str) -> str:
+    """The text of a node, without the spaces which tikzpy puts around it."""
+    if len(group) >= 2 and group[0] == " " and group[-1] == " ":
+        return group[1:-1]
+    return group.strip()
+
+
+def _split_node(tokens: list) -> tuple[list, Node | None] | None:
+    """Splits a trailing `node[options] at (x, y) {text}` from the tokens of a path."""
+    if ("word", "node") not in tokens:
+        return tokens, None
+    idx = tokens.index(("word", "node"))
+    node = _node(tokens[idx + 1 :])
+    if node is None:
+        return None
+    return tokens[:idx], node
+
+
+def _node(tokens: list) -> Node | None:
+    options = ""
+    if tokens and tokens[0][0] == "options":
+        options = tokens[0][1]
+        tokens = tokens[1:]
+    position = None
+    if len(tokens) == 3 and tokens[0] == ("word", "at"):
+        position = _coordinate(tokens[1])
+        if position is None:
+            return None
+        tokens = tokens[2:]
+    if len(tokens) != 1 or tokens[0][0] != "group":
+        return None
+    return Node(position, options, _text(tokens[0][1]))
+
+
+def _head_options(rest: str) -> tuple[str, str] | None:
+    """Splits the options in brackets at the start of rest from the rest of the statement."""
+    rest = rest.lstrip()
+    if not rest.startswith("["):
+        return "", rest
+    end = _group_end(rest, 0)
+    if end is None:
+        return None
+    return rest[1 : end - 1], rest[end:]
+
+
+def _parse_node(rest: str) -> Node | None:
+    rest = rest.rstrip()
+    if not rest.endswith(";"):
+        return None
+    tokens = _tokens(rest[:-1])
+    return None if tokens is None else _node(tokens)
+
+
+def _parse_clip(rest: str) -> Clip | None:
+    split = _head_options(rest)
+    if split is None:
+        return None
+    options, body = split
+    draw = False
+    if options:
+        match = re.fullmatch(r"\s*preaction\s*=\s*\{\s*draw\s*,?(.*)\}\s*", options)
+        if match is None:
+            return None
+        draw, options = True, match.group(1).strip()
+    draw_obj = _parse_path("draw", body)
+    if draw_obj is None or draw_obj.node is not None:
+        return None
+    draw_obj.options = options
+    return Clip(draw_obj, draw=draw)
+
+
+def _parse_path(action: str, rest: str) -> DrawingObject | None:
+    """Parses the part of a path statement after its command into a drawing object, or
+    returns None if it is not one that tikzpy can represent."""
+    split = _head_options(rest)
+    if split is None:
+        return None
+    options, body = split
+    body = body.rstrip()
+    if not body.endswith(";"):
+        return None
+    body = body[:-1]
+
+    if body.lstrip().startswith("plot"):
+        # Parse plots without tokenizing their (possibly very long) list of coordinates
+        draw_obj = _plot(body, options, action)
+    else:
+        tokens = _tokens(body)
+        split = None if tokens is None else _split_node(tokens)
+        if split is None:
+            return None
+        tokens, node = split
+        draw_obj = _shape(tokens, options, action)
+        if draw_obj is not None and node is not None:
+            draw_obj.node = node
+    return draw_obj
+
+
+def _plot(body: str, options: str, action: str) -> PlotCoordinates | None:
+    match = re.match(r"\s*plot\s*(\[[^\]]*\])?\s*coordinates\s*(?=\{)", body)
+    if match is None:
+        return None
+    end = _group_end(body, match.end())
+    if end is None or body[end:].strip():
+        return None
+    points = body[match.end() + 1 : end - 1]
+    if PLOT_POINTS.fullmatch(points) is None:
+        return None
+    xs, ys, zs = [], [], []
+    for x, y, z in re.findall(PLOT_POINT, points):
+        xs.append(_number(x))
+        ys.append(_number(y))
+        if z:
+            zs.append(_number(z))
+    if zs and len(zs) != len(xs):
+        return None
+    plot_options = match.group(1)[1:-1] if match.group(1) else ""
+    return PlotCoordinates.from_columns(
+        xs, ys, zs or None, options, plot_options, action
+    )
+
+
+def _shape(tokens: list, options: str, action: str) -> DrawingObject | None:
+    """Matches the tokens of a path against the shapes which tikzpy draws."""
+    if len(tokens) < 3:
+        return None
+    start = _coordinate(tokens[0])
+    if start is None:
+        return None
+    keyword = tokens[1]
+
+    if keyword in (("word", "to"), ("word", "--")):
+        to_options = ""
+        rest = tokens[2:]
+        if keyword == ("word", "to") and rest[0][0] == "options":
+            to_options = rest[0][1]
+            rest = rest[1:]
+        end = _coordinate(rest[0]) if len(rest) == 1 else None
+        if end is None:
+            return None
+        return Line(start, end, options, to_options, action=action)
+
+    if keyword == ("word", ".."):
+        return _curve(start, tokens[2:], options, action)
+
+    if len(tokens) != 3:
+        return None
+    kind, value = tokens[2]
+    if keyword == ("word", "circle"):
+        if kind == "coord":
+            radius = _length(value)
+        elif kind == "options" and _key_values(value).keys() == {"radius"}:
+            radius = _length(_key_values(value)["radius"])
+        else:
+            return None
+        if radius is None:
+            return None
+        return Circle(start, radius, options, action)
+
+    if keyword == ("word", "ellipse") and kind == "coord":
+        axes = value.split(" and ")
+        if len(axes) != 2:
+            return None
+        x_axis, y_axis = _length(axes[0]), _length(axes[1])
+        if x_axis is None or y_axis is None:
+            return None
+        return Ellipse(start, x_axis, y_axis, options, action)
+
+    if keyword == ("word", "rectangle"):
+        corner = _coordinate(tokens[2])
+        if corner is None or len(corner) != 2 or len(start) != 2:
+            return None
+        width, height = corner[0] - start[0], corner[1] - start[1]
+        return Rectangle(start, width, height, options, action)
+
+    if keyword == ("word", "arc"):
+        return _arc(start, tokens[2], options, action)
+    return None
+
+
+def _curve(start: tuple, tokens: list, options: str, action: str) -> Line | None:
+    """Parses `.. controls (a) and (b) .. (end)`, given the tokens after the first `..`."""
+    if tokens[0] != ("word", "controls"):
+        return None
+    control_pts = []
+    idx = 1
+    while idx < len(tokens):
+        control_pts.append(_coordinate(tokens[idx]))
+        idx += 1
+        if idx == len(tokens) or tokens[idx] != ("word", "and"):
+            break
+        idx += 1
+    if tokens[idx : idx + 1] != [("word", "..")] or len(tokens) != idx + 2:
+        return None
+    end = _coordinate(tokens[idx + 1])
+    if end is None or None in control_pts:
+        return None
+    return Line(start, end, options, control_pts=control_pts, action=action)
+
+
+def _arc(start: tuple, token: tuple, options: str, action: str) -> Arc | None:
+    kind, value = token
+    if kind == "coord":
+        # The old syntax, arc (start angle:end angle:radius)
+        parts = value.split(":")
+        if len(parts) != 3:
+            return None
+        values = {"start angle": parts[0], "end angle": parts[1], "radius": parts[2]}
+    elif kind == "options":
+        values = _key_values(value)
+    else:
+        return None
+    try:
+        start_angle = _number(values.pop("start angle"))
+        end_angle = _number(values.pop("end angle"))
+    except (KeyError, ValueError):
+        return None
+    radii = {key: _length(length) for key, length in values.items()}
+    if None in radii.values():
+        return None
+
+    if radii.keys() == {"radius"}:
+        radius = radii["radius"]
+        return Arc(
+            start, start_angle, end_angle, radius, options=options, action=action
+        )
+    if radii.keys() != {"x radius", "y radius"}:
+        return None
+    # For elliptic arcs, TikZ's angles are the parameters t of the points
+    # (x_radius cos(t), y_radius sin(t)), whereas Arc takes the actual angles of the points.
+    x_radius, y_radius = radii["x radius"], radii["y radius"]
+    if not (0 <= start_angle <= 360 and 0 <= end_angle <= 360):
+        return None
+    angles = [
+        degrees(atan2(y_radius * sin(radians(t)), x_radius * cos(radians(t)))) % 360
+        for t in (start_angle, end_angle)
+    ]
+    arc = Arc(
+        start,
+        angles[0],
+        angles[1],
+        x_radius=x_radius,
+        y_radius=y_radius,
+        options=options,
+        action=action,
+    )
+    try:
+        geometry = arc._geometry
+    except ValueError:
+        return None
+    # Only accept the arc if it reproduces TikZ's parameters
+    if abs(geometry.start_angle - start_angle) > 1e-9 or (
+        abs(geometry.end_angle - end_angle) > 1e-9
+    ):
+        return None
+    return arc
@@ -1,7 +1,54 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Diagnostic:
+    """An error or warning reported in the log file of a TeX run.
+
+    Attributes:
+        severity: Either "error" or "warning".
+        kind: The kind of message, e.g. "error", "overfull box" or "missing character".
+        message: The text of the message, as found in the log file.
+        line: The line of the TeX file which the message refers to, if known.
+        object_index: The index in TikzPicture.drawing_objects of the drawing object whose
+            code contains that line, if any.
+    """
+
+    severity: str
+    kind: str
+    message: str
+    line: int | None = None
+    object_index: int | None = None
+
+
+@dataclass
+class ResourceUsage:
+    """The resources used by the TeX processes of a compilation.
+
+    Attributes:
+        seconds: The wall clock time which the TeX processes took.
+        cpu_seconds: The user and system CPU time of the TeX processes, if known.
+        max_rss: The peak resident memory, in bytes, of the largest TeX process, if known.
+        runs: The number of commands which were run, more than one if the "auto" engine
+            fell back to another engine.
+    """
+
+    seconds: float = 0.0
+    cpu_seconds: float | None = None
+    max_rss: int | None = None
+    runs: int = 0
+
+
 class CompileError(Exception):
-    def __init__(self, message):
+    def __init__(self, message, diagnostics: list[Diagnostic] | None = None):
         super().__init__(message)
         self.message = message
+        self.diagnostics = diagnostics if diagnostics is not None else []
 
     def __str__(self):
         return self.message
+
+
+class CompileTimeout(CompileError):
+    """Raised when the TeX processes of a compilation exceed its timeout. They are killed,
+    together with any processes which they started."""
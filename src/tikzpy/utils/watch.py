@@ -0,0 +1,403 @@
+import json
+import os
+import sys
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from tikzpy.tikz_environments.tikz_picture import TikzPicture
+from tikzpy.utils.types import CompileError
+
+# The page of the preview, which reloads the PDF whenever the server sends an event
+PREVIEW_PAGE = b"""\
+<!doctype html>
+<title>tikzpy watch</title>
+<style>
+  body { margin: 0; }
+  iframe { border: 0; width: 100vw; height: 100vh; }
+  pre { margin: 0; padding: 1em; background: #fdd; white-space: pre-wrap; }
+</style>
+<pre id="error" hidden></pre>
+<iframe id="pdf" src="/figure.pdf"></iframe>
+<script>
+  new EventSource("/events").onmessage = (event) => {
+    const state = JSON.parse(event.data);
+    const error = document.getElementById("error");
+    error.hidden = !state.error;
+    error.textContent = state.error || "";
+    if (!state.error) {
+      document.getElementById("pdf").src = "/figure.pdf?version=" + state.version;
+    }
+  };
+</script>
+"""
+
+
+@dataclass
+class ScriptResult:
+    """The outcome of running a figure script.
+
+    Attributes:
+        picture: The last TikzPicture which the script showed, or else the last one among
+            its global variables, if any.
+        files: The script and the files of the modules which it imported, except those of
+            the standard library and of installed packages.
+        error: The traceback of the script, if it raised an exception.
+    """
+
+    picture: TikzPicture | None = None
+    files: list[Path] = field(default_factory=list)
+    error: str | None = None
+
+
+def run_script(script: str | Path) -> ScriptResult:
+    """Runs script in a fresh Python process, as `python script` would, except that
+    TikzPicture.show() only records the picture, and returns what it produced. A fresh
+    process makes sure that changes to the modules which the script imports take effect."""
+    import subprocess
+    import tempfile
+
+    script = Path(script).resolve()
+    env = dict(os.environ)
+    # The process imports tikzpy from where this process did
+    tikzpy_path = str(Path(__file__).parents[2])
+    # An empty component would put the working directory on the path of the script
+    python_path = [tikzpy_path]
+    if env.get("PYTHONPATH"):
+        python_path.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(python_path)
+    with tempfile.TemporaryDirectory() as result_dir:
+        completed = subprocess.run(
+            [sys.executable, "-m", "tikzpy.utils.watch", str(script), result_dir],
+            capture_output=True,
+            env=env,
+            check=False,
+        )
+        result_dir = Path(result_dir)
+        result = ScriptResult(files=[script])
+        files_path = result_dir / "files.json"
+        if files_path.exists():
+            result.files = [Path(path) for path in json.loads(files_path.read_text())]
+        picture_path = result_dir / "picture.bin"
+        if picture_path.exists():
+            result.picture = TikzPicture.from_bytes(picture_path.read_bytes())
+    if completed.returncode != 0:
+        result.error = completed.stderr.decode("utf-8", errors="replace").strip()
+    return result
+
+
+def _run_script_here(script: str, result_dir: str) -> int:
+    """Runs script in this process for run_script(), and writes the files which it imported
+    and its picture into result_dir."""
+    import runpy
+    import sysconfig
+    import traceback
+
+    shown = []
+    TikzPicture.show = lambda self, *args, **kwargs: shown.append(self)
+    sys.argv = [script]
+    sys.path.insert(0, str(Path(script).parent))
+    namespace = {}
+    returncode = 0
+    try:
+        namespace = runpy.run_path(script, run_name="__main__")
+    except SystemExit as exit:
+        returncode = exit.code if isinstance(exit.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+        returncode = 1
+
+    library_paths = {
+        Path(sysconfig.get_paths()[name]).resolve()
+        for name in ("stdlib", "platstdlib", "purelib", "platlib")
+    }
+    files = [str(Path(script).resolve())]
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if filename is None:
+            continue
+        path = Path(filename).resolve()
+        if not any(path.is_relative_to(library) for library in library_paths):
+            files.append(str(path))
+    result_dir = Path(result_dir)
+    (result_dir / "files.json").write_text(json.dumps(sorted(set(files))))
+
+    pictures = shown or [
+        value for value in namespace.values() if isinstance(value, TikzPicture)
+    ]
+    if pictures:
+        (result_dir / "picture.bin").write_bytes(pictures[-1].to_bytes())
+    return returncode
+
+
+class FileWatcher:
+    """Polls the modification times and sizes of a set of files, which works alike on every
+    platform and file system, without a dependency on a file notification library."""
+
+    def __init__(self, paths: Iterable[str | Path] = ()) -> None:
+        self.watch(paths)
+
+    def watch(self, paths: Iterable[str | Path]) -> None:
+        """Watches the given files from now on, instead of the previous ones."""
+        self._stats = {Path(path): _stat(path) for path in paths}
+
+    @property
+    def paths(self) -> list[Path]:
+        return list(self._stats)
+
+    def changed(self) -> list[Path]:
+        """Returns the watched files which changed since they were last watched."""
+        return [path for path, stat in self._stats.items() if _stat(path) != stat]
+
+    def wait(
+        self,
+        interval: float = 0.2,
+        debounce: float = 0.3,
+        stop: threading.Event | None = None,
+    ) -> list[Path] | None:
+        """Blocks until some watched files change, checking every interval seconds, and
+        then until none of them change for debounce seconds, as editors often save a file
+        in several steps. Returns the changed files, or None if stop was set."""
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            changed = self.changed()
+            if not changed:
+                continue
+            stats = {path: _stat(path) for path in self._stats}
+            while not stop.wait(debounce):
+                latest = {path: _stat(path) for path in self._stats}
+                if latest == stats:
+                    return self.changed()
+                stats = latest
+        return None
+
+
+def _stat(path: str | Path) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PreviewServer:
+    """Serves a page on the loopback interface which shows the latest PDF, or the latest
+    error, and is pushed every update through server-sent events."""
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.pdf = b""
+        self.error: str | None = None
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._http_server: ThreadingHTTPServer | None = None
+
+    def start(self, port: int = 0) -> str:
+        """Starts the server on the given port, or on a free port if port is 0. Returns
+        the URL of the page."""
+        self._http_server = ThreadingHTTPServer(("127.0.0.1", port), _PreviewHandler)
+        self._http_server.daemon_threads = True
+        self._http_server.preview = self
+        thread = threading.Thread(
+            target=self._http_server.serve_forever,
+            kwargs={"poll_interval": 0.1},
+            daemon=True,
+        )
+        thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str | None:
+        if self._http_server is None:
+            return None
+        host, port = self._http_server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def publish(self, pdf: bytes) -> None:
+        self._update(pdf, None)
+
+    def publish_error(self, message: str) -> None:
+        self._update(self.pdf, message)
+
+    def _update(self, pdf: bytes, error: str | None) -> None:
+        with self._condition:
+            self.pdf = pdf
+            self.error = error
+            self.version += 1
+            self._condition.notify_all()
+
+    def next_state(self, version: int, timeout: float) -> dict | None:
+        """Waits up to timeout seconds for a version other than the given one, and returns
+        it with its error, or None if there is none or the server stopped."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.version != version or self._stopped, timeout
+            )
+            if self._stopped or self.version == version:
+                return None
+            return {"version": self.version, "error": self.error}
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    # Keeps the connections of browsers, which poll the page and the event stream, alive
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        preview = self.server.preview
+        path = self.path.partition("?")[0]
+        if path == "/":
+            self._send(200, "text/html; charset=utf-8", PREVIEW_PAGE)
+        elif path == "/figure.pdf":
+            self._send(200, "application/pdf", preview.pdf)
+        elif path == "/events":
+            self._stream_events(preview)
+        else:
+            self._send(404, "text/plain", b"Not found")
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self, preview: PreviewServer) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.close_connection = True
+        version = -1
+        try:
+            while not preview._stopped:
+                state = preview.next_state(version, timeout=15)
+                if state is None:
+                    # A comment, which keeps proxies from closing an idle stream
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    version = state["version"]
+                    self.wfile.write(f"data: {json.dumps(state)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The page was closed
+            pass
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class Watch:
+    """Runs a figure script whenever it or a module which it imports changes, and compiles
+    its picture into output when its TeX code changed.
+
+    ```python
+    Watch("examples/lorenz/lorenz.py").run()
+    ```
+
+    Parameters:
+        script (str | Path): The script, which creates a TikzPicture, e.g. one of examples/.
+        output (str | Path): The compiled PDF. Defaults to the script with a .pdf suffix.
+        preview (PreviewServer): If provided, the PDFs and errors are pushed to it.
+        log (callable): Called with a message after each step. Defaults to print.
+        compile_options: Further arguments of TikzPicture.compile(), e.g. engine or remote.
+            The picture is compiled in a Workspace unless remote is given.
+    """
+
+    def __init__(
+        self,
+        script: str | Path,
+        output: str | Path | None = None,
+        preview: PreviewServer | None = None,
+        log: Callable[[str], None] = print,
+        **compile_options,
+    ) -> None:
+        self.script = Path(script).resolve()
+        self.output = Path(output) if output else self.script.with_suffix(".pdf")
+        self.preview = preview
+        self.log = log
+        if "remote" not in compile_options and "workspace" not in compile_options:
+            from tikzpy.utils.workspace import Workspace
+
+            compile_options["workspace"] = Workspace()
+        self.compile_options = compile_options
+        # The TeX code of the last picture which was compiled
+        self.code: str | None = None
+        self.watcher = FileWatcher([self.script])
+
+    def step(self) -> bool:
+        """Runs the script, and compiles its picture if its code changed. Returns whether
+        the picture was compiled."""
+        result = run_script(self.script)
+        self.watcher.watch(result.files)
+        if result.error is not None:
+            self._error(f"{self.script.name} failed:\n{result.error}")
+            return False
+        if result.picture is None:
+            self._error(f"{self.script.name} created no TikzPicture")
+            return False
+        code = result.picture.code()
+        if code == self.code:
+            self.log("The TeX code did not change")
+            return False
+        try:
+            pdf_file = result.picture.compile(self.output, **self.compile_options)
+        except CompileError as error:
+            self._error(f"Compilation failed:\n{error}")
+            return False
+        except Exception as error:
+            # E.g. an unknown engine, or an unreachable remote server, which must not stop
+            # the watch
+            self._error(f"Compilation failed:\n{type(error).__name__}: {error}")
+            return False
+        self.log(f"Compiled {pdf_file} ({_diff_summary(self.code, code)})")
+        self.code = code
+        if self.preview is not None:
+            self.preview.publish(pdf_file.read_bytes())
+        return True
+
+    def run(
+        self,
+        interval: float = 0.2,
+        debounce: float = 0.3,
+        stop: threading.Event | None = None,
+    ) -> None:
+        """Runs step() now and whenever the watched files change, until stop is set."""
+        self.step()
+        while (changed := self.watcher.wait(interval, debounce, stop)) is not None:
+            self.log(f"{', '.join(path.name for path in changed)} changed")
+            self.step()
+
+    def _error(self, message: str) -> None:
+        self.log(message)
+        if self.preview is not None:
+            self.preview.publish_error(message)
+
+
+def _diff_summary(old: str | None, new: str) -> str:
+    """Describes how many lines of TeX code differ between old and new."""
+    if old is None:
+        return f"{new.count(chr(10)) + 1} lines"
+    import difflib
+
+    added = removed = 0
+    for line in difflib.unified_diff(old.splitlines(), new.splitlines(), n=0):
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return f"+{added} -{removed} lines"
+
+
+if __name__ == "__main__":
+    sys.exit(_run_script_here(*sys.argv[1:]))
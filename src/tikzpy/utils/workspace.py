@@ -0,0 +1,196 @@
+import os
+import re
+import stat
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from tikzpy.utils.files import file_lock, remove_lock_file
+
+# hashlib, shutil and tempfile are imported by the functions which use them, as importing
+# them would otherwise be a noticeable part of the time taken by `import tikzpy`.
+
+# The directory of the default workspace on Linux, a tmpfs which is kept in memory
+SHARED_MEMORY_DIR = Path("/dev/shm")
+
+# The characters of PDF file names which are replaced in the names of build directories
+UNSAFE_NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_-]")
+# The length up to which PDF file names are kept in the names of build directories
+MAX_STEM_LENGTH = 64
+
+
+class Workspace:
+    """A directory of persistent build directories, in which TikzPicture.compile() runs TeX.
+
+    Unlike the temporary directory which compile() otherwise uses, a build directory is
+    kept between compilations, together with the .aux, .fls and .fdb_latexmk files of TeX
+    and latexmk. A picture whose TeX code did not change is then not compiled again, and
+    latexmk only reruns TeX as far as needed.
+
+    ```python
+    workspace = Workspace(max_size=100 * 2**20)
+    tikz.compile("figure.pdf", workspace=workspace)
+    ```
+
+    Each PDF destination has a build directory of its own, which is locked while it is in
+    use, so that processes compiling the same picture wait for each other. After each
+    compilation, the build directories which were not used for max_age seconds are removed,
+    and then the least recently used ones until the workspace takes at most max_size bytes.
+
+    Parameters:
+        root (str | Path): The directory of the workspace. Defaults to a "tikzpy-<user>"
+            directory in /dev/shm if tmpfs is True and it exists, which avoids slow disks
+            altogether, and in the temporary directory of the system otherwise. As other
+            users can create that directory first, it is only used if it is a directory
+            which belongs to the user and which only they can access; PermissionError is
+            raised otherwise.
+        tmpfs (bool): Whether the default root may be in /dev/shm.
+        max_age (float): The time, in seconds, after which unused build directories are
+            removed, or None to keep them.
+        max_size (int): The size, in bytes, which the build directories may take in total,
+            or None for no limit.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        tmpfs: bool = True,
+        max_age: float | None = 7 * 24 * 3600,
+        max_size: int | None = 2**30,
+    ) -> None:
+        # Whether the root is a predictable directory shared by every user
+        self._shared_location = root is None
+        if root is None:
+            root = default_root(tmpfs)
+        self.root = Path(root)
+        self.max_age = max_age
+        self.max_size = max_size
+
+    @contextmanager
+    def build_dir(self, name: str) -> Iterator[Path]:
+        """Creates the build directory with the given name if needed, and yields it while
+        holding its lock. Cleans up the workspace afterwards."""
+        directory = self.root / name
+        self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self._shared_location:
+            check_private_dir(self.root)
+        with file_lock(directory):
+            # Created under the lock, as clean() may have just removed it
+            directory.mkdir(exist_ok=True)
+            # The modification time marks when the build directory was last used
+            os.utime(directory)
+            yield directory
+        self.clean(keep=name)
+
+    def build_dirs(self) -> list[Path]:
+        """Returns the build directories of the workspace, least recently used first."""
+        if not self.root.is_dir():
+            return []
+        directories = [path for path in self.root.iterdir() if path.is_dir()]
+        return sorted(directories, key=lambda path: path.stat().st_mtime)
+
+    def clean(self, keep: str | None = None) -> list[Path]:
+        """Removes the build directories which exceed max_age or max_size, except the one
+        named keep and those which are in use. Returns the removed directories."""
+        now = time.time()
+        directories = [path for path in self.build_dirs() if path.name != keep]
+        sizes = {path: _size(path) for path in directories}
+        total = sum(sizes.values())
+        if keep is not None and (self.root / keep).is_dir():
+            total += _size(self.root / keep)
+        removed = []
+        for path in directories:
+            age = now - path.stat().st_mtime
+            too_old = self.max_age is not None and age > self.max_age
+            too_big = self.max_size is not None and total > self.max_size
+            if not (too_old or too_big):
+                continue
+            if _remove_unless_locked(path):
+                removed.append(path)
+                total -= sizes[path]
+        # The lock files of build directories which were removed otherwise
+        if self.root.is_dir():
+            for lock_path in self.root.glob("*.lock"):
+                directory = lock_path.with_suffix("")
+                if directory.name != keep and not directory.exists():
+                    _remove_unless_locked(directory)
+        return removed
+
+    def __repr__(self) -> str:
+        return f"Workspace({str(self.root)!r})"
+
+
+def default_root(tmpfs: bool = True) -> Path:
+    """Returns the default directory of workspaces, which is named after the user. See
+    check_private_dir."""
+    if hasattr(os, "getuid"):
+        user = os.getuid()
+    else:
+        import getpass
+
+        user = getpass.getuser()
+    if tmpfs and SHARED_MEMORY_DIR.is_dir() and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        return SHARED_MEMORY_DIR / f"tikzpy-{user}"
+    import tempfile
+
+    return Path(tempfile.gettempdir()) / f"tikzpy-{user}"
+
+
+def check_private_dir(directory: Path) -> None:
+    """Raises PermissionError unless directory is a directory, not a symbolic link, which
+    belongs to the user and which other users cannot access. Otherwise, another user could
+    have created it to plant files, e.g. .sty files which TeX would load."""
+    info = os.lstat(directory)
+    if stat.S_ISLNK(info.st_mode) or not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"The workspace {directory} is not a directory")
+    if not hasattr(os, "getuid"):
+        # On Windows, the temporary directory of the system is private to the user
+        return
+    if info.st_uid != os.getuid():
+        raise PermissionError(
+            f"The workspace {directory} belongs to another user (uid {info.st_uid})"
+        )
+    if info.st_mode & 0o077:
+        raise PermissionError(
+            f"The workspace {directory} can be accessed by other users "
+            f"(mode {stat.S_IMODE(info.st_mode):o}). Remove it, or make it private with "
+            f"`chmod 700 {directory}` if you created it."
+        )
+
+
+def build_name(destination: Path) -> str:
+    """Returns the name of the build directory for the PDF destination, which is readable
+    and yet distinct for destinations with the same file name. Only letters, digits, "_"
+    and "-" of the file name are kept, so that the path of the TeX file in the build
+    directory is safe to pass to TeX and never contains spaces, quotes or "%"."""
+    import hashlib
+
+    path_hash = hashlib.sha256(str(destination.resolve()).encode("utf-8")).hexdigest()
+    stem = UNSAFE_NAME_CHARACTERS.sub("_", destination.stem)[:MAX_STEM_LENGTH]
+    return f"{stem}-{path_hash[:12]}"
+
+
+def _size(directory: Path) -> int:
+    size = 0
+    for path in directory.rglob("*"):
+        try:
+            if path.is_file():
+                size += path.stat().st_size
+        except FileNotFoundError:
+            # Removed by a compilation in progress
+            pass
+    return size
+
+
+def _remove_unless_locked(directory: Path) -> bool:
+    import shutil
+
+    try:
+        with file_lock(directory, blocking=False):
+            if directory.exists():
+                shutil.rmtree(directory)
+            remove_lock_file(directory)
+    except BlockingIOError:
+        return False
+    return True
@@ -37,7 +37,7 @@ TEX_FILE = r"""%!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 
 
 def test_pdf_creation():
-    """Test that the pdf file is generated as tikz_code/tex_file.pdf."""
+    """Test that the pdf file is generated as tikz_code/tex_file_<hash>.pdf."""
     with tempfile.TemporaryDirectory() as tmp_dir:
         tikz = TikzPicture(tikz_code_dir=tmp_dir)
         # Line
@@ -49,9 +49,12 @@ def test_pdf_creation():
         )
         tikz.write()
         pdf_location = tikz.compile()
-        correct_pdf_file = Path(tmp_dir, "tex_file.pdf")
-        assert correct_pdf_file.exists()
-        assert pdf_location.resolve() == correct_pdf_file.resolve()
+        assert pdf_location.exists()
+        assert pdf_location.parent == Path(tmp_dir).resolve()
+        assert pdf_location.name.startswith("tex_file_")
+        assert pdf_location.suffix == ".pdf"
+        # Compiling the same picture again produces the same file name
+        assert tikz.compile() == pdf_location
 
 
 def test_tikz_file_creation():
@@ -1,16 +1,25 @@
+import subprocess
 import tempfile
 from pathlib import Path
-from unittest.mock import Mock
 
 import pytest
 
-import tikzpy
 from tikzpy import TikzPicture
-from tikzpy.utils.types import CompileError
+from tikzpy.utils import engines
+from tikzpy.utils.types import CompileError, ResourceUsage
 
 
-def completed_process_factory(returncode=0):
-    return Mock(returncode=returncode)
+def run_tex_factory(returncode=0, log=None):
+    """Returns a replacement of engines.run_tex which exits with returncode, after writing
+    log into the log file if it is not None."""
+
+    def run_tex(cmd, env, directory, *args, **kwargs):
+        if log is not None:
+            (Path(directory) / "tex_file.log").write_text(log)
+        completed_process = subprocess.CompletedProcess(cmd, returncode, b"", b"")
+        return completed_process, ResourceUsage(runs=1)
+
+    return run_tex
 
 
 def test_tikz_picture_write_tex_file():
@@ -24,26 +33,22 @@ def test_tikz_picture_write_tex_file():
 
 
 def test_compile_smoke(mocker):
-    # Spy on the subprocess call in the compile method
-    spy = mocker.spy(
-        tikzpy.tikz_environments.tikz_picture.subprocess,
-        "run",
-    )
+    # Spy on the TeX engine run by the compile method
+    spy = mocker.spy(engines, "run_tex")
 
     with tempfile.TemporaryDirectory() as tmp_dir:
         pdf_dest = Path(tmp_dir) / "pdf_file.pdf"
         tikz = TikzPicture()
         tikz.circle((0, 0), 3, options="thin, fill=orange!15")
         assert pdf_dest.resolve() == tikz.compile(pdf_dest)
-        assert spy.spy_return.returncode == 0
+        completed_process, usage = spy.spy_return
+        assert completed_process.returncode == 0
+        assert usage.runs == 1
 
 
 def test_compile_error_no_log_file(mocker):
-    # Mock the subprocess call to simulate failure
-    mocker.patch(
-        "tikzpy.tikz_environments.tikz_picture.subprocess.run",
-        completed_process_factory(-1),
-    )
+    # Mock the TeX engine to simulate failure
+    mocker.patch.object(engines, "run_tex", run_tex_factory(1))
     with tempfile.TemporaryDirectory():
         tikz = TikzPicture()
         tikz.circle((0, 0), 3, options="thin, fill=orange!15")
@@ -53,36 +58,30 @@ def test_compile_error_no_log_file(mocker):
 
 
 def test_compile_error_log_file_parsing_failed(mocker):
-    # Mock the subprocess call to simulate failure
-    mocker.patch(
-        "tikzpy.tikz_environments.tikz_picture.subprocess.run",
-        completed_process_factory(-1),
-    )
+    # Mock the TeX engine to simulate failure, with a log file which has no text
+    mocker.patch.object(engines, "run_tex", run_tex_factory(1, log=""))
     with tempfile.TemporaryDirectory():
         tikz = TikzPicture()
         tikz.circle((0, 0), 3, options="thin, fill=orange!15")
-
-        # Pretend the log file exists
-        mocker.patch(
-            "tikzpy.tikz_environments.tikz_picture.Path.exists",
-            return_value=True,
-        )
-        # Make fake log file have no text
-        mocker.patch(
-            "tikzpy.tikz_environments.tikz_picture.Path.read_text",
-            return_value="",
-        )
         with pytest.raises(CompileError) as e:
             tikz.compile()
         assert "Failed to parse log file" in e.value.message
 
 
+def test_compile_error_killed_by_signal(mocker):
+    # Mock the TeX engine to simulate being killed, e.g. for exceeding cpu_limit
+    mocker.patch.object(engines, "run_tex", run_tex_factory(-9))
+    with tempfile.TemporaryDirectory():
+        tikz = TikzPicture()
+        tikz.circle((0, 0), 3, options="thin, fill=orange!15")
+        with pytest.raises(CompileError) as e:
+            tikz.compile()
+        assert "was killed by signal 9" in e.value.message
+
+
 def test_compile_compile_error_log_file_parsing(mocker):
-    # Spy on the subprocess call in the compile method
-    spy = mocker.spy(
-        tikzpy.tikz_environments.tikz_picture.subprocess,
-        "run",
-    )
+    # Spy on the TeX engine run by the compile method
+    spy = mocker.spy(engines, "run_tex")
 
     with tempfile.TemporaryDirectory():
         tikz = TikzPicture()
@@ -93,4 +92,8 @@ def test_compile_compile_error_log_file_parsing(mocker):
             "! Package pgfkeys Error: I do not know the key '/tikz/meow'"
             in e.value.message
         )
-        assert spy.spy_return.returncode != 0
+        (error,) = [d for d in e.value.diagnostics if d.severity == "error"]
+        assert error.object_index == 0
+        assert tikz.diagnostics == e.value.diagnostics
+        completed_process, _ = spy.spy_return
+        assert completed_process.returncode != 0
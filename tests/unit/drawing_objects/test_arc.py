@@ -34,3 +34,49 @@ def test_arc_construction(object, request):
         arc.code
         == r"\draw (0, 0) arc [start angle = 20, end angle = 90, radius = 4cm];"
     )
+
+
+def test_arc_geometry_is_cached(mock_arc):
+    geometry = mock_arc._geometry
+    assert geometry.arc_type == "circle"
+    assert geometry.radius_statement == "radius = 4cm"
+    assert mock_arc._geometry is geometry
+    assert mock_arc.arc_type() == "circle"
+    assert mock_arc._geometry is geometry
+
+
+def test_arc_geometry_invalidated_on_write(mock_arc):
+    geometry = mock_arc._geometry
+    mock_arc.radius = None
+    mock_arc.x_radius = 4
+    mock_arc.y_radius = 2
+    assert mock_arc._geometry is not geometry
+    assert mock_arc.arc_type() == "ellipse"
+    assert mock_arc.radius_statement == "x radius = 4cm, y radius = 2cm"
+
+    mock_arc.draw_from_start = False
+    mock_arc.start_angle = 0
+    assert mock_arc.draw_start() == (4, 0)
+    mock_arc.shift_(1, 1)
+    assert mock_arc.draw_start() == (5, 1)
+
+
+def test_arc_transforms_return_copies(mock_arc):
+    shifted = mock_arc.shift(1, 1)
+    assert shifted is not mock_arc
+    assert tuple(shifted.position) == (1, 1)
+    assert tuple(mock_arc.position) == (0, 0)
+    assert mock_arc.scale(2).radius == 8
+    assert mock_arc.radius == 4
+    rotated = mock_arc.rotate(90, about_pt=(1, 0))
+    assert tuple(rotated.position) == pytest.approx((1, -1))
+    assert tuple(mock_arc.position) == (0, 0)
+
+
+def test_arc_invalid_radii():
+    arc = Arc((0, 0), 20, 90, radius=4, x_radius=1)
+    with pytest.raises(ValueError):
+        arc.code
+    arc = Arc((0, 0), 20, 90, x_radius=-1, y_radius=1)
+    with pytest.raises(ValueError):
+        arc.arc_type()
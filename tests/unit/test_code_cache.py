@@ -0,0 +1,113 @@
+import pickle
+
+import pytest
+
+from tikzpy import Arc, Circle, Line, PlotCoordinates, Point, Rectangle, TikzPicture
+
+
+@pytest.fixture
+def count_commands(monkeypatch):
+    """Counts how often the _command property of a drawing class is evaluated."""
+    counts = {}
+
+    def patch(cls):
+        original = cls._command
+
+        def counting_command(self):
+            counts[cls] = counts.get(cls, 0) + 1
+            return original.fget(self)
+
+        monkeypatch.setattr(cls, "_command", property(counting_command))
+
+    for cls in (Arc, Circle, Line, PlotCoordinates, Rectangle):
+        patch(cls)
+    return counts
+
+
+def test_code_is_cached(count_commands):
+    tikz = TikzPicture()
+    tikz.circle((0, 0), 1)
+    tikz.arc((0, 0), 20, 90, 4)
+    first = tikz.code()
+    assert tikz.code() == first
+    assert count_commands == {Circle: 1, Arc: 1}
+
+
+def test_code_invalidated_on_assignment(count_commands):
+    tikz = TikzPicture()
+    circle = tikz.circle((0, 0), 1)
+    line = tikz.line((0, 0), (1, 1))
+    tikz.code()
+
+    circle.center = (2, 2)
+    line.options = "thick"
+    assert circle.code == r"\draw (2, 2) circle (1cm);"
+    assert line.code == r"\draw[thick] (0, 0) to (1, 1);"
+    assert count_commands == {Circle: 2, Line: 2}
+
+
+def test_code_invalidated_on_inplace_transform(count_commands):
+    tikz = TikzPicture()
+    rectangle = tikz.rectangle((0, 0), 1, 1)
+    plot = tikz.plot_coordinates([(0, 0), (1, 1)])
+    tikz.code()
+
+    rectangle.shift_(1, 1)
+    plot.scale_(2)
+    plot.add_point(3, 3)
+    assert rectangle.code == r"\draw (1, 1) rectangle (2, 2);"
+    assert plot.code == r"\draw plot coordinates {(0, 0) (2, 2) (3, 3) };"
+    assert count_commands == {Rectangle: 2, PlotCoordinates: 2}
+
+
+def test_code_with_node_changes():
+    tikz = TikzPicture()
+    circle = tikz.circle((0, 0), 1)
+    circle.add_node(options="left", text="A")
+    assert circle.code == r"\draw (0, 0) circle (1cm) node[left] { A };"
+    circle.node.text = "B"
+    assert circle.code == r"\draw (0, 0) circle (1cm) node[left] { B };"
+
+
+def test_code_invalidated_on_owned_point_mutation():
+    line = Line((0, 0), (1, 1), control_pts=[(0.5, 0)])
+    circle = Circle((0, 0), 1)
+    assert line.code == r"\draw (0, 0) .. controls (0.5, 0)  .. (1, 1);"
+    assert circle.code == r"\draw (0, 0) circle (1cm);"
+
+    line.start.x = 5
+    line.end.shift_(1, 1)
+    line.control_pts[0].y = 2
+    circle.center.x = 3
+    assert line.code == r"\draw (5, 0) .. controls (0.5, 2)  .. (2, 2);"
+    assert circle.code == r"\draw (3, 0) circle (1cm);"
+
+
+def test_code_invalidated_on_owned_list_mutation():
+    plot = PlotCoordinates([(0, 0), (1, 1)])
+    assert plot.code == r"\draw plot coordinates {(0, 0) (1, 1) };"
+    plot.points.append(Point(2, 2))
+    assert plot.code == r"\draw plot coordinates {(0, 0) (1, 1) (2, 2) };"
+    plot.points[-1].x = 3
+    assert plot.code == r"\draw plot coordinates {(0, 0) (1, 1) (3, 2) };"
+    del plot.points[0]
+    assert plot.code == r"\draw plot coordinates {(1, 1) (3, 2) };"
+
+    line = Line((0, 0), (1, 1))
+    assert line.code == r"\draw (0, 0) to (1, 1);"
+    line.control_pts.extend([Point(0.5, 0)])
+    assert line.code == r"\draw (0, 0) .. controls (0.5, 0)  .. (1, 1);"
+
+
+def test_copies_track_their_own_points():
+    line = Line((0, 0), (1, 1))
+    copy = line.copy()
+    assert line.code == copy.code == r"\draw (0, 0) to (1, 1);"
+    copy.start.x = 5
+    assert line.code == r"\draw (0, 0) to (1, 1);"
+    assert copy.code == r"\draw (5, 0) to (1, 1);"
+
+    plot = pickle.loads(pickle.dumps(PlotCoordinates([(0, 0), (1, 1)])))
+    assert plot.code == r"\draw plot coordinates {(0, 0) (1, 1) };"
+    plot.points[0].y = 4
+    assert plot.code == r"\draw plot coordinates {(0, 4) (1, 1) };"
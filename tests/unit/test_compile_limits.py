@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.utils import engines
+from tikzpy.utils.types import CompileError, CompileTimeout
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="needs process groups")
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_resource_usage(tmp_path):
+    completed_process, usage = engines.run_tex(
+        python("print('This is pdfTeX'); sum(range(10**6))"), None, tmp_path
+    )
+    assert completed_process.returncode == 0
+    assert completed_process.stdout.strip() == b"This is pdfTeX"
+    assert usage.runs == 1
+    assert usage.seconds > 0
+    if hasattr(os, "wait4"):
+        assert usage.cpu_seconds > 0
+        assert usage.max_rss > 2**20
+
+
+@posix_only
+def test_timeout_kills_the_process_group(tmp_path):
+    # The shell starts a child which would outlive the shell if only the shell was killed
+    pid_file = tmp_path / "child.pid"
+    cmd = ["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"]
+    start = time.monotonic()
+    with pytest.raises(CompileTimeout, match="timed out after 0.3 seconds"):
+        engines.run_tex(cmd, None, tmp_path, timeout=0.3)
+    assert time.monotonic() - start < 5
+    child = int(pid_file.read_text())
+    # The child is gone, apart from a zombie waiting to be reaped by init
+    for _ in range(100):
+        try:
+            with open(f"/proc/{child}/stat") as stat:
+                if stat.read().split()[2] == "Z":
+                    break
+        except FileNotFoundError:
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("The child of the timed out command is still running")
+
+
+@posix_only
+def test_cpu_limit(tmp_path):
+    completed_process, usage = engines.run_tex(
+        python("while True: pass"), None, tmp_path, timeout=10, cpu_limit=1
+    )
+    assert completed_process.returncode < 0
+    # CPU time is accounted in clock ticks
+    assert 0.9 <= usage.cpu_seconds < 3
+
+
+@posix_only
+def test_memory_limit(tmp_path):
+    completed_process, _ = engines.run_tex(
+        python("b'x' * 2**30"), None, tmp_path, memory_limit=2**29
+    )
+    assert completed_process.returncode == 1
+    assert b"MemoryError" in completed_process.stderr
+
+
+@posix_only
+def test_limits_without_prlimit(tmp_path, monkeypatch):
+    import resource
+
+    # As on macOS, where the limits are set by a wrapper which execs the command
+    monkeypatch.delattr(resource, "prlimit", raising=False)
+    completed_process, _ = engines.run_tex(
+        python("import resource; print(resource.getrlimit(resource.RLIMIT_AS))"),
+        None,
+        tmp_path,
+        cpu_limit=5,
+        memory_limit=2**30,
+    )
+    assert completed_process.returncode == 0
+    assert completed_process.stdout.strip() == b"(1073741824, 1073741824)"
+    with pytest.raises(FileNotFoundError):
+        engines.run_tex(["tikzpy-no-such-engine"], None, tmp_path, cpu_limit=5)
+
+
+def test_compile_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        engines, "engine_command", lambda *args: python("import time; time.sleep(30)")
+    )
+    tikz = TikzPicture()
+    tikz.line((0, 0), (1, 1))
+    with pytest.raises(CompileTimeout) as exc_info:
+        tikz.compile(tmp_path / "out.pdf", engine="pdflatex", timeout=0.3)
+    assert isinstance(exc_info.value, CompileError)
+    assert tikz.resource_usage.seconds == pytest.approx(0.3, abs=0.1)
+    assert tikz.resource_usage.runs == 1
+
+
+@posix_only
+def test_compile_killed_by_cpu_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        engines, "engine_command", lambda *args: python("while True: pass")
+    )
+    tikz = TikzPicture()
+    with pytest.raises(CompileError, match="may have exceeded cpu_limit"):
+        tikz.compile(tmp_path / "out.pdf", engine="pdflatex", cpu_limit=1)
+    assert tikz.resource_usage.cpu_seconds >= 0.9
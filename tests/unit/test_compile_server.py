@@ -0,0 +1,178 @@
+import json
+import subprocess
+import threading
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.__main__ import main
+from tikzpy.utils import engines
+from tikzpy.utils.compile_server import CompileServer
+from tikzpy.utils.types import CompileError, ResourceUsage
+
+
+@pytest.fixture
+def release():
+    """Set when fake TeX runs may proceed."""
+    release = threading.Event()
+    release.set()
+    yield release
+    # Otherwise the server would wait for its workers forever after a failed test
+    release.set()
+
+
+@pytest.fixture
+def fake_tex(monkeypatch, release):
+    """Replaces the TeX engine by a function which waits for `release` to be set, and then
+    writes a PDF with the TeX code, or fails if the code has "error". Returns the list of
+    the TeX codes which it compiled."""
+    runs = []
+
+    def run(cmd, *args):
+        release.wait()
+        tex_file = Path(cmd[-1])
+        code = tex_file.read_text()
+        runs.append(code)
+        if "error" in code:
+            log = "! Undefined control sequence.\nl.5 "
+            tex_file.with_suffix(".log").write_text(log)
+            return subprocess.CompletedProcess(cmd, 1, b"", b""), ResourceUsage()
+        tex_file.with_suffix(".log").write_text("This is pdfTeX\n")
+        tex_file.with_suffix(".pdf").write_text(code)
+        return subprocess.CompletedProcess(cmd, 0, b"", b""), ResourceUsage()
+
+    monkeypatch.setattr(engines, "run_tex", run)
+    return runs
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = CompileServer(tmp_path / "cache", workers=1)
+    server.start()
+    yield server
+    server.shutdown()
+
+
+def picture(x):
+    tikz = TikzPicture()
+    tikz.line((0, 0), (x, 1))
+    return tikz
+
+
+def test_remote_compile(tmp_path, server, fake_tex):
+    tikz = picture(1)
+    pdf = tikz.compile(tmp_path / "out.pdf", remote=server.url)
+    assert pdf == (tmp_path / "out.pdf").resolve()
+    assert tikz.code() in pdf.read_text()
+
+    # The PDF is named after the TeX file, as for local compilations
+    tikz.BASE_DIR = tmp_path
+    pdf = tikz.compile(remote=server.url)
+    assert pdf.name.startswith("tex_file_")
+    assert len(fake_tex) == 1
+    assert server.status()["cache_hits"] == 1
+
+    with urlopen(f"{server.url}/status") as response:
+        status = json.load(response)
+    assert status["compiled"] == 1
+    assert status["workers"] == 1
+
+
+def test_identical_pictures_in_flight_are_compiled_once(
+    tmp_path, server, fake_tex, release
+):
+    release.clear()
+    results = []
+
+    def compile_picture(idx):
+        results.append(picture(1).compile(tmp_path / f"{idx}.pdf", remote=server.url))
+
+    threads = [threading.Thread(target=compile_picture, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    while server.status()["deduplicated"] < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(fake_tex) == 1
+    assert len({pdf.read_text() for pdf in results}) == 1
+
+
+def test_priority_queue(server, fake_tex, release):
+    release.clear()
+    # The first picture occupies the only worker while the others are queued
+    futures = [server.submit(picture(0).to_bytes())]
+    while server.status()["queued"] > 0:
+        threading.Event().wait(0.01)
+    futures += [
+        server.submit(picture(x).to_bytes(), priority=priority)
+        for x, priority in [(1, 0), (2, 10), (3, 5)]
+    ]
+    release.set()
+    for future in futures:
+        future.result()
+    order = [next(x for x in range(4) if f"({x}, 1)" in code) for code in fake_tex]
+    assert order == [0, 2, 3, 1]
+
+
+def test_remote_errors(tmp_path, server, fake_tex):
+    tikz = picture(1)
+    tikz.node((0, 0), text="error")
+    with pytest.raises(CompileError) as exc_info:
+        tikz.compile(tmp_path / "out.pdf", remote=server.url)
+    assert "Undefined control sequence" in str(exc_info.value)
+    assert tikz.diagnostics == exc_info.value.diagnostics
+    assert tikz.diagnostics[0].line == 5
+    with pytest.raises(ValueError, match="Unknown TeX engine"):
+        picture(1).compile(tmp_path / "out.pdf", remote=server.url, engine="context")
+    assert server.status()["failed"] == 2
+
+
+@pytest.mark.parametrize(
+    "path, content_type, size, status",
+    [
+        # Without the token of the server
+        ("/compile", "application/octet-stream", 1, 403),
+        # Not a picture, e.g. a form posted by a web page
+        ("/{token}/compile", "text/plain", 1, 415),
+        # Larger than max_request_size
+        ("/{token}/compile", "application/octet-stream", 65, 413),
+    ],
+)
+def test_rejected_requests(server, fake_tex, path, content_type, size, status):
+    server.max_request_size = 64
+    host = server.url.rsplit("/", 1)[0]
+    url = host + path.format(token=server.token)
+    headers = {"Content-Type": content_type}
+    with pytest.raises(HTTPError) as exc_info:
+        urlopen(Request(url, data=b"x" * size, headers=headers, method="POST"))
+    assert exc_info.value.code == status
+    with pytest.raises(HTTPError, match="403"):
+        urlopen(f"{host}/status")
+    with pytest.raises(PermissionError, match="Invalid token"):
+        picture(1).compile(remote=f"{host}/not-the-token")
+    assert fake_tex == []
+
+
+def test_cache_size_is_bounded(tmp_path, fake_tex):
+    server = CompileServer(tmp_path / "cache", workers=1, max_cache_size=1)
+    server.start()
+    try:
+        first = server.submit(picture(1).to_bytes()).result()[1]
+        second = server.submit(picture(2).to_bytes()).result()[1]
+    finally:
+        server.shutdown()
+    # The least recently used PDF was removed, but not the one just compiled
+    assert not first.exists()
+    assert second.exists()
+    assert server._cache.build_dirs() == [second.parent]
+
+
+def test_cli_help(capsys):
+    with pytest.raises(SystemExit):
+        main(["serve", "--help"])
+    assert "--workers" in capsys.readouterr().out
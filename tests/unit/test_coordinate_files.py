@@ -0,0 +1,113 @@
+import struct
+from array import array
+
+import pytest
+
+from tikzpy import PlotCoordinates, Point, TikzPicture
+from tikzpy.drawing_objects import plotcoordinates
+from tikzpy.utils.coordinate_files import buffer_columns, map_columns
+
+POINTS = [(t / 4, (t * t) % 7 - 3.5) for t in range(40)]
+
+
+def write_raw(path, points, typecode="d"):
+    path.write_bytes(array(typecode, [c for point in points for c in point]).tobytes())
+    return path
+
+
+def write_npy(path, points, fortran_order=False):
+    """Writes a float64 .npy file of version 1.0, as numpy.save would."""
+    rows = list(zip(*points)) if fortran_order else points
+    header = (
+        f"{{'descr': '<f8', 'fortran_order': {fortran_order}, "
+        f"'shape': ({len(points)}, {len(points[0])}), }}"
+    )
+    header += " " * (63 - (10 + len(header)) % 64) + "\n"
+    path.write_bytes(
+        b"\x93NUMPY\x01\x00"
+        + struct.pack("<H", len(header))
+        + header.encode("latin1")
+        + array("d", [c for row in rows for c in row]).tobytes()
+    )
+    return path
+
+
+def test_raw_file_matches_points(tmp_path):
+    path = write_raw(tmp_path / "coords.bin", POINTS)
+    plot = PlotCoordinates(path, options="blue", plot_options="smooth")
+    assert plot._points is None
+    assert plot.code == PlotCoordinates(POINTS, "blue", "smooth").code
+    assert plot.points == [Point(point) for point in POINTS]
+
+
+def test_raw_file_dtype_and_shape(tmp_path):
+    points = [(x, x + 1, x + 2) for x in range(10)]
+    path = write_raw(tmp_path / "coords.bin", points, "i")
+    plot = PlotCoordinates(path, dtype="int32", shape=(4, 3))
+    assert plot.code == PlotCoordinates(points[:4]).code
+
+
+@pytest.mark.parametrize("fortran_order", [False, True])
+def test_npy_file(tmp_path, fortran_order):
+    path = write_npy(tmp_path / "coords.npy", POINTS, fortran_order)
+    tikz = TikzPicture()
+    plot = tikz.plot_coordinates(str(path))
+    assert plot.code == PlotCoordinates(POINTS).code
+
+
+def test_two_dimensional_buffers():
+    flat = array("d", [c for point in POINTS for c in point])
+    view = memoryview(flat).cast("B").cast("d", (len(POINTS), 2))
+    plot = PlotCoordinates(view)
+    assert plot._points is None
+    assert plot.code == PlotCoordinates(POINTS).code
+    assert buffer_columns(POINTS) is None
+
+
+def test_streamed_code_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(plotcoordinates, "WINDOW_SIZE", 8)
+    path = write_raw(tmp_path / "coords.bin", POINTS)
+    tikz = TikzPicture()
+    plot = tikz.plot_coordinates(path)
+    plot.add_node((0, 0), text="end")
+    scope = tikz.scope()
+    scope.plot_coordinates(path, action="fill")
+    tikz.write(tmp_path / "tikz_code.tex")
+
+    # The code was formatted in windows, without Points or caching the whole command
+    assert plot._points is None
+    assert "_command_cache" not in plot.__dict__
+    assert len(list(plot.code_chunks())) > 3
+    assert (tmp_path / "tikz_code.tex").read_text() == tikz.code()
+    assert "".join(tikz.code_chunks()) == tikz.code()
+    # Nor is the code cached when it is generated at once
+    assert "_command_cache" not in plot.__dict__
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"dtype": "complex128"}, "Unsupported coordinate dtype"),
+        ({"dtype": ">f8"}, "byte order"),
+        ({"shape": (-1, 4)}, "2 or 3 columns"),
+        ({"shape": (100, 2)}, "has 40 rows"),
+    ],
+)
+def test_invalid_files(tmp_path, kwargs, message):
+    path = write_raw(tmp_path / "coords.bin", POINTS)
+    with pytest.raises(ValueError, match=message):
+        map_columns(path, **kwargs)
+
+
+def test_empty_file_and_misplaced_dtype(tmp_path):
+    (tmp_path / "empty.bin").write_bytes(b"")
+    with pytest.raises(ValueError, match="empty"):
+        PlotCoordinates(tmp_path / "empty.bin")
+    with pytest.raises(ValueError, match="files of coordinates"):
+        PlotCoordinates(POINTS, dtype="float64")
+
+
+def test_serialize_file_plot(tmp_path):
+    tikz = TikzPicture()
+    tikz.plot_coordinates(write_raw(tmp_path / "coords.bin", POINTS))
+    assert TikzPicture.from_bytes(tikz.to_bytes()).code() == tikz.code()
@@ -0,0 +1,134 @@
+import math
+from array import array
+
+from tikzpy import Circle, Line, Node, PlotCoordinates, Point, Rectangle, TikzPicture
+from tikzpy.tikz_environments.tikz_command import TikzCommand
+
+
+def test_bounding_boxes():
+    line = Line((0, 2), (1, 1), control_pts=[(3, -1)])
+    assert line.bounding_box() == (Point(0, -1), Point(3, 2))
+    assert Line((0, 0), (1, 1), to_options="bend left").bounding_box() is None
+    assert Circle((1, 1), 2).bounding_box() == (Point(-1, -1), Point(3, 3))
+    assert Rectangle((1, 1), -2, 3).bounding_box() == (Point(-1, 1), Point(1, 4))
+    plot = PlotCoordinates([(0, 1), (2, -1)])
+    assert plot.bounding_box() == (Point(0, -1), Point(2, 1))
+    plot = PlotCoordinates.from_columns([0, 2], [1, -1])
+    assert plot.bounding_box() == (Point(0, -1), Point(2, 1))
+    assert Circle((0, 0, 1), 1).bounding_box() is None
+
+
+def test_bounding_box_of_arc():
+    tikz = TikzPicture()
+    # The quarter of the unit circle, drawn from (1, 0)
+    arc = tikz.arc((1, 0), 0, 90, radius=1)
+    south_west, north_east = arc.bounding_box()
+    assert math.isclose(south_west.x, -1) and math.isclose(south_west.y, -1)
+    assert math.isclose(north_east.x, 1) and math.isclose(north_east.y, 1)
+    arc = tikz.arc((0, 0), 0, 90, x_radius=2, y_radius=1, draw_from_start=False)
+    assert arc.bounding_box() == (Point(-2, -1), Point(2, 1))
+
+
+def test_cull_against_clip():
+    tikz = TikzPicture()
+    tikz.circle((100, 100), 1)
+    scope = tikz.scope()
+    scope.clip(Rectangle((0, 0), 2, 2))
+    circles = [scope.circle((x, 0), 0.5) for x in range(10)]
+    scope.node((50, 50), text="kept")
+    assert tikz.cull() == 7
+    # Objects before the clip and outside of the scope are not clipped
+    assert len(tikz.drawing_objects) == 2
+    assert scope.drawing_objects[1:] == circles[:3] + [scope.drawing_objects[-1]]
+    assert isinstance(scope.drawing_objects[-1], Node)
+
+
+def test_cull_against_viewport():
+    tikz = TikzPicture()
+    inside = tikz.line((0, 0), (1, 1))
+    crossing = tikz.line((-5, 0), (5, 0))
+    tikz.line((5, 5), (6, 6))
+    labelled = tikz.line((5, 5), (6, 6))
+    labelled.add_node(options="right", text="label")
+    shifted = tikz.circle((5, 5), 1, options="xshift=-5cm")
+    command = tikz.add_command(r"\draw (10, 10) -- (11, 11);")
+    assert tikz.cull(viewport=((0, 0), (2, 2))) == 1
+    assert tikz.drawing_objects == [inside, crossing, labelled, shifted, command]
+
+
+def test_margin():
+    tikz = TikzPicture()
+    tikz.circle((3, 0), 0.5)
+    assert tikz.cull(viewport=((0, 0), (2, 2)), margin=0.6) == 0
+    assert tikz.cull(viewport=((0, 0), (2, 2)), margin=0.4) == 1
+
+
+def test_transformed_scopes_are_not_culled_against_outer_regions():
+    tikz = TikzPicture()
+    scope = tikz.scope(options="xshift=10cm")
+    circle = scope.circle((-10, 0), 0.5)
+    assert tikz.cull(viewport=((-1, -1), (1, 1))) == 0
+    assert scope.drawing_objects == [circle]
+
+
+def test_emptied_scopes_are_removed():
+    tikz = TikzPicture()
+    scope = tikz.scope()
+    scope.clip(Circle((0, 0), 1))
+    scope.circle((5, 5), 1)
+    empty = tikz.scope()
+    assert tikz.cull() == 1
+    assert tikz.drawing_objects == [empty]
+
+
+def test_plots_are_trimmed():
+    tikz = TikzPicture()
+    xs = array("d", [x / 10 for x in range(-100, 101)])
+    ys = array("d", [math.sin(x) for x in xs])
+    tikz.draw(PlotCoordinates.from_columns(xs, ys))
+    tikz.plot_coordinates([(x, 0) for x in range(-10, 11)])
+    assert tikz.cull(viewport=((0, -2), (1, 2))) == 0
+    trimmed, trimmed_points = tikz.drawing_objects
+    # The trimmed columns are views of the original ones
+    assert trimmed._columns[0].obj is xs
+    # The runs start and end with the points just outside of the viewport
+    assert trimmed.points[0].x == -0.1 and trimmed.points[-1].x == 1.1
+    assert [pt.x for pt in trimmed_points.points] == [-1, 0, 1, 2]
+
+
+def test_plots_leaving_and_entering_are_split():
+    tikz = TikzPicture()
+    plot = tikz.plot_coordinates(
+        [(0, 0), (1, 0), (5, 0), (6, 0), (7, 0), (5, 0.5), (1, 0.5), (0, 0.5)],
+        options="red",
+    )
+    assert tikz.cull(viewport=((0, -1), (2, 1))) == 0
+    first, second = tikz.drawing_objects
+    assert [pt.x for pt in first.points] == [0, 1, 5]
+    assert [pt.x for pt in second.points] == [5, 1, 0]
+    assert first.options == second.options == plot.options
+
+
+def test_smooth_plots_keep_more_neighbours():
+    tikz = TikzPicture()
+    tikz.plot_coordinates([(x, 0) for x in range(10)], plot_options="smooth")
+    tikz.cull(viewport=((4.5, -1), (4.6, 1)))
+    # Segments are tested together with their neighbours, which are then kept as well
+    assert [pt.x for pt in tikz.drawing_objects[0].points] == [2, 3, 4, 5, 6, 7]
+
+
+def test_filled_and_closed_plots_are_kept_whole():
+    tikz = TikzPicture()
+    closed = tikz.plot_coordinates([(x, 0) for x in range(10)], plot_options="cycle")
+    filled = tikz.plot_coordinates([(x, 1) for x in range(10)], action="fill")
+    tikz.cull(viewport=((0, -1), (1, 2)))
+    assert tikz.drawing_objects == [closed, filled]
+
+
+def test_cull_keeps_commands():
+    tikz = TikzPicture()
+    scope = tikz.scope()
+    scope.clip(Circle((0, 0), 1))
+    command = scope.add_command(r"\draw (5, 5) circle (1);")
+    assert tikz.cull() == 0
+    assert isinstance(command, TikzCommand) and command in scope.drawing_objects
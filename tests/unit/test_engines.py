@@ -0,0 +1,137 @@
+import os
+import shutil
+import subprocess
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.utils import engines
+from tikzpy.utils.instrumentation import CompileProfile
+from tikzpy.utils.types import ResourceUsage
+
+
+@pytest.fixture
+def fake_latexmk(monkeypatch):
+    """Replaces latexmk by a function in which pdflatex runs out of memory, unless it is
+    given larger memory settings. Returns the list of the commands and environments."""
+    runs = []
+
+    def run(cmd, env, *args):
+        command = " ".join(cmd)
+        runs.append((command, env))
+        tex_file = Path(command.split()[-1])
+        large_memory = env is not None and "TEXMFCNF" in env
+        pdflatex = command.startswith("pdflatex") or " -pdf " in command
+        usage = ResourceUsage(seconds=1.0, cpu_seconds=0.5, max_rss=2**20, runs=1)
+        if pdflatex and not large_memory:
+            tex_file.with_suffix(".log").write_text(
+                "! TeX capacity exceeded, sorry [main memory size=5000000].\n"
+                "l.12 \\draw plot coordinates {\n"
+            )
+            return subprocess.CompletedProcess(cmd, 12, b"", b""), usage
+        tex_file.with_suffix(".log").write_text("This is LuaHBTeX\n")
+        tex_file.with_suffix(".pdf").write_bytes(b"%PDF-1.5\n")
+        return subprocess.CompletedProcess(cmd, 0, b"", b""), usage
+
+    monkeypatch.setattr(engines, "run_tex", run)
+    monkeypatch.setattr(engines, "_engine_cache", OrderedDict())
+    return runs
+
+
+@pytest.fixture
+def tikz():
+    tikz = TikzPicture()
+    tikz.plot_coordinates([(x, x**2) for x in range(100)])
+    return tikz
+
+
+def test_fallback_to_lualatex(tmp_path, tikz, fake_latexmk, monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: f"/usr/bin/{name}")
+    profile = CompileProfile()
+    tikz.compile(tmp_path / "out.pdf", on_event=profile)
+    assert [cmd.split()[0] for cmd, _ in fake_latexmk] == ["pdflatex", "lualatex"]
+    tex_events = [event for event in profile.events if event.stage == "tex"]
+    assert [event.details["engine"] for event in tex_events] == ["pdflatex", "lualatex"]
+
+    # The engine which worked is used directly for the same picture
+    tikz.compile(tmp_path / "out.pdf")
+    assert fake_latexmk[-1][0].split()[0] == "lualatex"
+    assert len(fake_latexmk) == 3
+
+
+def test_fallback_to_larger_memory(tmp_path, tikz, fake_latexmk, monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    tikz.compile(tmp_path / "out.pdf")
+    (first, first_env), (second, second_env) = fake_latexmk
+    assert first == second
+    assert first_env is None
+    cnf_dir = second_env["TEXMFCNF"].split(os.pathsep)[0]
+    assert cnf_dir == str(Path(second.split()[-1]).parent)
+    # The trailing separator keeps the default texmf.cnf files
+    assert second_env["TEXMFCNF"].endswith(os.pathsep)
+
+
+def test_engine_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(engines, "_engine_cache", OrderedDict())
+    monkeypatch.setattr(engines, "ENGINE_CACHE_SIZE", 2)
+    engines.remember_engine("a", "lualatex", False)
+    engines.remember_engine("b", "lualatex", False)
+    # Looking "a" up makes "b" the least recently used entry
+    assert engines.engine_attempts("auto", "a") == [("lualatex", False)]
+    engines.remember_engine("c", "pdflatex", True)
+    assert list(engines._engine_cache) == ["a", "c"]
+
+
+def test_explicit_engine(tmp_path, tikz, fake_latexmk):
+    tikz.compile(tmp_path / "out.pdf", engine="xelatex")
+    assert [cmd.split()[0] for cmd, _ in fake_latexmk] == ["xelatex"]
+    # Without "auto", pdflatex is not retried
+    with pytest.raises(Exception, match="TeX capacity exceeded"):
+        tikz.compile(tmp_path / "out.pdf", engine="pdflatex")
+    assert len(fake_latexmk) == 2
+
+
+def test_unknown_engine(tikz):
+    with pytest.raises(ValueError, match="Unknown TeX engine 'context'"):
+        tikz.compile(engine="context")
+
+
+def test_single_pass_without_latexmk(tmp_path, tikz, fake_latexmk):
+    profile = CompileProfile()
+    tikz.compile(tmp_path / "out.pdf", engine="lualatex", on_event=profile)
+    ((cmd, _),) = fake_latexmk
+    assert cmd.startswith("lualatex -halt-on-error -interaction=nonstopmode ")
+    (tex,) = [event for event in profile.events if event.stage == "tex"]
+    assert tex.details["tex_runs"] == 1
+
+
+def test_latexmk_for_reruns(tmp_path, tikz, fake_latexmk):
+    tikz.options = "remember picture"
+    tikz.compile(tmp_path / "out.pdf", engine="lualatex")
+    assert fake_latexmk[-1][0].startswith("latexmk -lualatex ")
+    tikz.options = ""
+    tikz.compile(tmp_path / "out.pdf", engine="lualatex", latexmk=True)
+    assert fake_latexmk[-1][0].startswith("latexmk -lualatex ")
+
+
+def test_latexmk_arguments_are_not_split():
+    tex_file = "/tmp/my figures; rm -rf ~/tex_file.tex"
+    cmd = engines.latexmk_command("pdflatex", True, tex_file, "/tmp/my figures")
+    assert cmd == [
+        "latexmk",
+        "-pdf",
+        "-quiet",
+        "-interaction=nonstopmode",
+        "-output-directory=/tmp/my figures",
+        tex_file,
+    ]
+
+
+def test_missing_engine(tmp_path, tikz, monkeypatch):
+    monkeypatch.setattr(
+        engines, "engine_command", lambda *args: ["tikzpy-no-such-engine", *args[1:]]
+    )
+    with pytest.raises(Exception, match="Could not run xelatex"):
+        tikz.compile(tmp_path / "out.pdf", engine="xelatex")
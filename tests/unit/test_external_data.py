@@ -0,0 +1,65 @@
+import math
+import os
+from array import array
+
+from tikzpy import PlotCoordinates, TikzPicture
+from tikzpy.drawing_objects import plotcoordinates
+
+POINTS = [(t / 10, math.sin(t / 10)) for t in range(100)]
+
+
+def test_external_plot_code():
+    plot = PlotCoordinates(POINTS, options="red", plot_options="smooth", external=True)
+    assert plot.data_filename.startswith("tikzpy_data_")
+    assert plot.code == f"\\draw[red] plot[smooth] file {{{plot.data_filename}}};"
+    # The name follows the content
+    same = PlotCoordinates(POINTS, external=True)
+    assert same.data_filename == plot.data_filename
+    plot.add_point(10, 0)
+    assert plot.data_filename != same.data_filename
+
+
+def test_columns_and_points_give_the_same_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(plotcoordinates, "WINDOW_SIZE", 16)
+    xs, ys = (array("d", column) for column in zip(*POINTS))
+    from_columns = PlotCoordinates.from_columns(xs, ys)
+    from_columns.external = True
+    from_points = PlotCoordinates(POINTS, external=True)
+    assert from_columns.data_filename == from_points.data_filename
+
+    assert from_columns.write_data_file(tmp_path)
+    lines = (tmp_path / from_columns.data_filename).read_text().splitlines()
+    assert lines[:2] == ["0.0 0.0", f"0.1 {math.sin(0.1)}"]
+    assert len(lines) == len(POINTS)
+
+
+def test_write_data_files_next_to_tex_file(tmp_path):
+    tikz = TikzPicture()
+    plot = tikz.plot_coordinates(POINTS, external=True)
+    tikz.scope().plot_coordinates(POINTS[:10], external=True)
+    tikz.plot_coordinates(POINTS[:10])
+    tikz.write_tex_file(tmp_path / "figure.tex")
+
+    data_files = sorted(tmp_path.glob("tikzpy_data_*.table"))
+    assert len(data_files) == 2
+    assert f"file {{{plot.data_filename}}}" in (tmp_path / "figure.tex").read_text()
+
+    # Existing data files have the same content, so they are not rewritten
+    data_file = tmp_path / plot.data_filename
+    os.utime(data_file, (0, 0))
+    tikz.write(tmp_path / "tikz_code.tex")
+    assert data_file.stat().st_mtime == 0
+    assert tikz._write_data_files(tmp_path) == 0
+
+
+def test_3d_plots_stay_inline():
+    plot = PlotCoordinates([(0, 0, 0), (1, 1, 1)], external=True)
+    assert plot.data_filename is None
+    assert "coordinates" in plot.code
+
+
+def test_serialization_keeps_external_plots():
+    tikz = TikzPicture()
+    tikz.plot_coordinates(POINTS, external=True)
+    assert TikzPicture.from_dict(tikz.to_dict()).code() == tikz.code()
+    assert TikzPicture.from_bytes(tikz.to_bytes()).code() == tikz.code()
@@ -0,0 +1,133 @@
+import errno
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.utils import files
+from tikzpy.utils.files import (
+    atomic_copy,
+    atomic_move,
+    atomic_write,
+    atomic_write_bytes,
+    file_digest,
+    write_if_changed,
+)
+
+
+def test_write_if_changed(tmp_path):
+    filepath = tmp_path / "foo.tex"
+    assert write_if_changed(filepath, ["foo", "bar"])
+    assert filepath.read_text() == "foobar"
+
+    os.utime(filepath, (0, 0))
+    assert not write_if_changed(filepath, ["foob", "ar"])
+    assert filepath.stat().st_mtime == 0
+
+    assert write_if_changed(filepath, ["baz"])
+    assert filepath.read_text() == "baz"
+    # No temporary files are left behind
+    assert list(tmp_path.iterdir()) == [filepath]
+
+
+def test_file_digest(tmp_path):
+    assert file_digest(tmp_path / "missing.tex") is None
+    filepath = tmp_path / "foo.tex"
+    filepath.write_text("foo")
+    assert (
+        file_digest(filepath)
+        == "2c26b46b68ffc68ff99b453c1d30413413422d706483bfa0f98a5e886266e7ae"
+    )
+
+
+def test_tikz_picture_write_only_if_changed(tmp_path):
+    tikz = TikzPicture(tikz_code_dir=tmp_path)
+    circle = tikz.circle((0, 0), 1)
+    assert tikz.write(only_if_changed=True)
+    assert tikz.write_tex_file("tex_file.tex", only_if_changed=True)
+    assert not tikz.write(only_if_changed=True)
+    assert not tikz.write_tex_file("tex_file.tex", only_if_changed=True)
+
+    circle.radius = 2
+    assert tikz.write(only_if_changed=True)
+    assert tikz.write_tex_file("tex_file.tex", only_if_changed=True)
+    assert (tmp_path / "tikz_code.tex").read_text() == tikz.code()
+    assert tikz.code() in (tmp_path / "tex_file.tex").read_text()
+
+
+def test_atomic_write(tmp_path):
+    filepath = tmp_path / "foo.tex"
+    filepath.write_text("old")
+    assert atomic_write(filepath, ["new"]) == file_digest(filepath)
+    assert filepath.read_text() == "new"
+    assert list(tmp_path.iterdir()) == [filepath]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+def test_atomic_writes_keep_file_modes(tmp_path, monkeypatch):
+    assert files._read_umask() == files._UMASK
+    monkeypatch.setattr(files, "_UMASK", 0o022)
+    # New files get the mode which open() would give them
+    atomic_write(tmp_path / "new.tex", ["foo"])
+    atomic_write_bytes(tmp_path / "new.pdf", b"foo")
+    atomic_copy(tmp_path / "new.pdf", tmp_path / "copy.pdf")
+    write_if_changed(tmp_path / "changed.tex", ["foo"])
+    for name in ["new.tex", "new.pdf", "copy.pdf", "changed.tex"]:
+        assert stat.S_IMODE((tmp_path / name).stat().st_mode) == 0o644
+
+    # Existing files keep their mode
+    os.chmod(tmp_path / "new.tex", 0o640)
+    atomic_write(tmp_path / "new.tex", ["bar"])
+    os.chmod(tmp_path / "changed.tex", 0o664)
+    assert write_if_changed(tmp_path / "changed.tex", ["bar"])
+    assert stat.S_IMODE((tmp_path / "new.tex").stat().st_mode) == 0o640
+    assert stat.S_IMODE((tmp_path / "changed.tex").stat().st_mode) == 0o664
+
+
+def test_atomic_move(tmp_path):
+    src = tmp_path / "src.pdf"
+    dst = tmp_path / "dst.pdf"
+    src.write_bytes(b"%PDF")
+    dst.write_bytes(b"old")
+    atomic_move(src, dst)
+    assert not src.exists()
+    assert dst.read_bytes() == b"%PDF"
+
+
+def test_atomic_move_across_filesystems(tmp_path, monkeypatch):
+    src = tmp_path / "src.pdf"
+    dst = tmp_path / "dst.pdf"
+    src.write_bytes(b"%PDF")
+    real_replace = os.replace
+
+    def replace(a, b):
+        # Simulate os.replace failing across devices for the initial move
+        if Path(a) == src:
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        real_replace(a, b)
+
+    monkeypatch.setattr(os, "replace", replace)
+    atomic_move(src, dst)
+    assert not src.exists()
+    assert dst.read_bytes() == b"%PDF"
+    assert list(tmp_path.iterdir()) == [dst]
+
+
+def test_concurrent_locked_writes(tmp_path):
+    tikz = TikzPicture(tikz_code_dir=tmp_path)
+    for x in range(100):
+        tikz.circle((x, 0), 1)
+
+    def write(_):
+        return tikz.write(lock=True)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(write, range(32)))
+    assert (tmp_path / "tikz_code.tex").read_text() == tikz.code()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "tikz_code.tex",
+        "tikz_code.tex.lock",
+    ]
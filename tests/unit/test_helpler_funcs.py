@@ -15,8 +15,6 @@ Type  H <return>  for immediate help.
 
 l.28     \\draw[dashed meow]
                             (3, 0) arc [start angle = 0.0, end angle = 179.9...
-
-?
 """
 
 
@@ -56,16 +54,15 @@ def test_replace_code():
 
 
 def test_extract_error_content(mock_latex_error_msg):
-    new_mock_latex_error_msg = mock_latex_error_msg + "\nFoo Bar"
+    new_mock_latex_error_msg = mock_latex_error_msg + "\n?\nFoo Bar"
     lines = new_mock_latex_error_msg.splitlines(keepends=True)
     assert mock_latex_error_msg == extract_error_content(lines)
 
 
-def test_extract_error_content_no_question_mark(mock_latex_error_msg):
-    new_mock_latex_error_msg = mock_latex_error_msg + "\nFoo bar"
-    new_mock_latex_error_msg = new_mock_latex_error_msg.replace("?", "")
-    lines = new_mock_latex_error_msg.splitlines(keepends=True)
-    assert new_mock_latex_error_msg == extract_error_content(lines)
+def test_extract_error_content_ends_at_prompt(mock_latex_error_msg):
+    error_msg = mock_latex_error_msg.split("l.28")[0] + "?\n"
+    lines = (error_msg + "Foo bar\n").splitlines(keepends=True)
+    assert error_msg == extract_error_content(lines)
 
 
 def test_extract_error_content_no_error_lines(mock_latex_error_msg):
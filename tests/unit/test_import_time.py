@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import tikzpy
+
+# Modules which are only needed to compile or display a picture
+DEFERRED_MODULES = {
+    "dataclasses",
+    "hashlib",
+    "inspect",
+    "IPython",
+    "pymupdf",
+    "shutil",
+    "subprocess",
+    "tempfile",
+    "webbrowser",
+}
+
+
+def imported_modules(statement: str) -> set[str]:
+    """Runs statement in a fresh interpreter under `python -X importtime` and returns the
+    names of the modules it imported."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(tikzpy.__file__).parent.parent), env.get("PYTHONPATH", "")]
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules = set()
+    for line in completed.stderr.splitlines():
+        # Lines look like "import time:       405 |       1516 |   os", after a header line
+        if line.startswith("import time:") and line.count("|") == 2:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                modules.add(name.strip())
+    return modules
+
+
+def test_import_tikzpy_is_lazy():
+    modules = imported_modules("import tikzpy")
+    assert "tikzpy" in modules
+    assert not any(name.startswith("tikzpy.") for name in modules)
+    assert not DEFERRED_MODULES & modules
+
+
+@pytest.mark.parametrize("name", ["Point", "Line", "TikzPicture"])
+def test_import_name_defers_heavy_modules(name):
+    modules = imported_modules(f"from tikzpy import {name}; {name}")
+    assert not DEFERRED_MODULES & modules
+
+
+def test_lazy_attributes():
+    from tikzpy.tikz_environments.tikz_picture import TikzPicture
+
+    assert tikzpy.TikzPicture is TikzPicture
+    assert set(tikzpy.__all__) <= set(dir(tikzpy))
+    for name in tikzpy.__all__:
+        assert getattr(tikzpy, name).__name__ == name
+    with pytest.raises(AttributeError):
+        tikzpy.Foo
@@ -0,0 +1,83 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.utils import engines
+from tikzpy.utils.instrumentation import (
+    COMPILE_STAGES,
+    CompileProfile,
+    count_tex_runs,
+    stage,
+)
+from tikzpy.utils.types import ResourceUsage
+
+LATEXMK_OUTPUT = b"""\
+Latexmk: Run number 1 of rule 'pdflatex'
+This is pdfTeX, Version 3.141592653
+Latexmk: Run number 2 of rule 'pdflatex'
+This is pdfTeX, Version 3.141592653
+"""
+
+
+@pytest.fixture
+def fake_latexmk(monkeypatch):
+    """Replaces latexmk by a function which writes a log file and a PDF."""
+
+    def run(cmd, *args):
+        tex_file = Path(cmd[-1])
+        tex_file.with_suffix(".log").write_text("This is pdfTeX\n")
+        tex_file.with_suffix(".pdf").write_bytes(b"%PDF-1.5\n" + b"0" * 100)
+        completed_process = subprocess.CompletedProcess(cmd, 0, LATEXMK_OUTPUT, b"")
+        return completed_process, ResourceUsage(seconds=0.5, runs=1)
+
+    monkeypatch.setattr(engines, "run_tex", run)
+
+
+def test_compile_events(tmp_path, fake_latexmk):
+    tikz = TikzPicture()
+    tikz.line((0, 0), (1, 1))
+    profile = CompileProfile()
+    tikz.compile(tmp_path / "out.pdf", on_event=profile, latexmk=True)
+
+    assert tuple(event.stage for event in profile.events) == COMPILE_STAGES
+    assert all(event.seconds >= 0 for event in profile.events)
+    codegen, write, tex, parse_log, move_pdf = profile.events
+    assert codegen.bytes == write.bytes > len(tikz.code())
+    assert tex.details["returncode"] == 0
+    assert tex.details["tex_runs"] == 2
+    assert parse_log.bytes == len("This is pdfTeX\n")
+    assert move_pdf.bytes == 109
+    assert set(profile.by_stage()) == set(COMPILE_STAGES)
+    assert profile.total_seconds == pytest.approx(sum(profile.by_stage().values()))
+
+
+def test_compile_without_callback(tmp_path, fake_latexmk):
+    tikz = TikzPicture()
+    tikz.line((0, 0), (1, 1))
+    assert tikz.compile(tmp_path / "out.pdf") == (tmp_path / "out.pdf").resolve()
+
+
+def test_stage():
+    events = []
+    with stage(events.append, "codegen") as info:
+        info.bytes = 10
+        info.details["foo"] = 1
+    assert len(events) == 1
+    assert events[0].stage == "codegen"
+    assert events[0].bytes == 10
+    assert events[0].details == {"foo": 1}
+
+    with stage(None, "codegen") as info:
+        assert info is None
+
+    with pytest.raises(ValueError):
+        with stage(events.append, "tex"):
+            raise ValueError
+    assert len(events) == 1
+
+
+def test_count_tex_runs():
+    assert count_tex_runs(LATEXMK_OUTPUT) == 2
+    assert count_tex_runs(b"") is None
@@ -0,0 +1,35 @@
+from tikzpy import TikzPicture
+
+
+def test_intern_options():
+    tikz = TikzPicture()
+    circles = [
+        tikz.circle((x, 0), 0.3, options="fill=ProcessBlue!50") for x in range(3)
+    ]
+    line = tikz.line((0, 0), (1, 1), options="thick")
+    scope = tikz.scope()
+    scoped_circle = scope.circle((0, 1), 0.3, options="fill=ProcessBlue!50")
+
+    styles = tikz.intern_options()
+    assert [style.style_name for style in styles] == ["tikzpy_style_0"]
+    assert styles[0].style_settings == "fill=ProcessBlue!50"
+    for circle in circles + [scoped_circle]:
+        assert circle.code == r"\draw[tikzpy_style_0] (%s, %s) circle (0.3cm);" % (
+            circle.center.x,
+            circle.center.y,
+        )
+    # Options used only once are left alone
+    assert line.options == "thick"
+    assert "\\tikzset{ tikzpy_style_0/.style={ fill=ProcessBlue!50 }" in tikz.code()
+
+
+def test_intern_options_repeated_pass():
+    tikz = TikzPicture()
+    tikz.circle((0, 0), 1, options="red")
+    tikz.circle((1, 0), 1, options="red")
+    tikz.intern_options()
+
+    new_circle = tikz.circle((2, 0), 1, options="red")
+    assert tikz.intern_options() == []
+    assert new_circle.options == "tikzpy_style_0"
+    assert len(tikz._interned_styles) == 1
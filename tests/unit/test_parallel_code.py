@@ -0,0 +1,64 @@
+import multiprocessing
+import pickle
+from array import array
+
+import pytest
+
+from tikzpy import PlotCoordinates, TikzPicture
+from tikzpy.utils import parallel
+
+
+@pytest.fixture
+def tikz():
+    tikz = TikzPicture(center=True)
+    for idx in range(250):
+        tikz.circle((idx, 0), 0.5, options="fill=red")
+        tikz.line((idx, 0), (idx, 1))
+        tikz.node((idx, 2), text=f"${idx}$")
+        tikz.plot_coordinates([(idx, 3), (idx + 0.5, 4)])
+    tikz.scope(options="xshift=1cm").circle((0, 0), 1)
+    return tikz
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 50)
+
+
+def test_parallel_code_matches_sequential_code(tikz):
+    assert tikz.code(processes=3) == tikz.code()
+
+
+def test_parallel_code_without_fork(tikz):
+    assert tikz.code(processes=2, start_method="spawn") == tikz.code()
+
+
+def test_parallel_code_of_column_plots_without_fork(tikz, tmp_path):
+    filepath = tmp_path / "points.bin"
+    filepath.write_bytes(array("f", [0, 1, 2, 3, 4, 5]).tobytes())
+    for idx in range(100):
+        xs = memoryview(array("d", [idx, idx + 1, idx + 2]))
+        tikz.draw(PlotCoordinates.from_columns(xs, array("i", [0, 1, 0])))
+        tikz.draw(PlotCoordinates(filepath, dtype="float32"))
+    assert tikz.code(processes=2, start_method="spawn") == tikz.code()
+
+    plot = pickle.loads(pickle.dumps(tikz.drawing_objects[-1]))
+    assert plot.code == tikz.drawing_objects[-1].code
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="no fork"
+)
+def test_parallel_code_with_fork(tikz):
+    assert tikz.code(processes=2, start_method="fork") == tikz.code()
+
+
+def test_small_pictures_are_rendered_in_process(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("A process pool was started")
+
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", no_pool)
+    tikz = TikzPicture()
+    for idx in range(50):
+        tikz.circle((idx, 0), 1)
+    assert tikz.code(processes=4) == tikz.code()
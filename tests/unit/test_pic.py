@@ -0,0 +1,77 @@
+import pytest
+from pytest import approx
+
+from tikzpy import Pic, Scope, TikzPicture
+
+
+@pytest.fixture
+def tikz():
+    tikz = TikzPicture()
+    neuron = Scope()
+    neuron.circle((0, 0), 0.5, options="fill=blue!20")
+    neuron.line((-0.3, 0), (0.3, 0))
+    tikz.define_symbol("neuron", neuron)
+    for idx in range(3):
+        tikz.place("neuron", at=(idx, 0))
+    tikz.place("neuron", at=(0, 2), rotate=45, scale=2, options="red")
+    return tikz
+
+
+def test_symbols_are_emitted_once(tikz):
+    code = tikz.code()
+    assert code.startswith(
+        "\\tikzset{neuron/.pic={\n"
+        "    \\draw[fill=blue!20] (0, 0) circle (0.5cm);\n"
+        "    \\draw (-0.3, 0) to (0.3, 0);\n"
+        "}}\n"
+        "\\begin{tikzpicture}\n"
+    )
+    assert code.count("circle") == 1
+    assert "    \\pic at (1, 0) {neuron};\n" in code
+    assert "    \\pic[rotate=45, scale=2, red] at (0, 2) {neuron};\n" in code
+
+
+def test_scope_options_are_kept():
+    tikz = TikzPicture()
+    block = Scope(options="thick", transform="options")
+    block.rectangle((0, 0), 2, 1)
+    block.shift(-1, 0)
+    tikz.define_symbol("block", block)
+    assert tikz.code().startswith(
+        "\\tikzset{block/.pic={\n"
+        "    \\begin{scope}[shift={(-1, 0)}, thick]\n"
+        "        \\draw (0, 0) rectangle (2, 1);\n"
+        "    \\end{scope}\n"
+        "}}\n"
+    )
+
+
+def test_undefined_symbol():
+    with pytest.raises(ValueError, match="No symbol named 'neuron'"):
+        TikzPicture().place("neuron")
+
+
+def test_transform_pic():
+    pic = Pic("neuron", (1, 0))
+    rotated = pic.rotate(90, about_pt=(0, 0))
+    assert pic.code == "\\pic at (1, 0) {neuron};"
+    assert tuple(rotated.position) == approx((0, 1))
+    assert rotated.rotate_angle == 90
+    pic.scale_(3)
+    pic.shift_(1, 1)
+    assert pic.code == "\\pic[scale=3] at (4, 1) {neuron};"
+
+
+def test_pics_in_transformed_scopes_are_flattened():
+    scope = Scope()
+    scope.draw(Pic("neuron", (1, 0)))
+    scope.scale(2)
+    scope.flatten()
+    assert scope.drawing_objects[0].code == "\\pic[scale=2] at (2, 0) {neuron};"
+
+
+def test_serialization(tikz):
+    assert TikzPicture.from_dict(tikz.to_dict()).code() == tikz.code()
+    loaded = TikzPicture.from_bytes(tikz.to_bytes())
+    assert loaded.code() == tikz.code()
+    loaded.place("neuron", at=(5, 5))
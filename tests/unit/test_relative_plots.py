@@ -0,0 +1,70 @@
+import math
+import re
+from array import array
+
+from tikzpy import PlotCoordinates, TikzPicture
+from tikzpy.drawing_objects import plotcoordinates
+
+POINTS = [(t / 100, math.sin(t / 100)) for t in range(1000)]
+
+
+def decode(code):
+    """The absolute points of the path of a relative plot."""
+    points = []
+    for relative, x, y in re.findall(r"(\+\+)?\((-?[\d.]+), ?(-?[\d.]+)\)", code):
+        x, y = float(x), float(y)
+        if relative:
+            x, y = points[-1][0] + x, points[-1][1] + y
+        points.append((x, y))
+    return points
+
+
+def test_relative_code():
+    plot = PlotCoordinates([(0, 0), (0.5, 0.25), (0.5, 0.25), (1, 1)], relative=True)
+    # Steps of zero length are left out
+    assert plot.code == "\\draw (0, 0) --++(0.5,0.25) --++(0.5,0.75);"
+
+
+def test_steps_are_rounded_without_drift():
+    plot = PlotCoordinates(POINTS, relative=True, precision=3)
+    decoded = decode(plot.code)
+    assert len(decoded) == len(POINTS)
+    for (x, y), (x_0, y_0) in zip(decoded, POINTS):
+        assert abs(x - x_0) < 1e-3 and abs(y - y_0) < 1e-3
+    assert len(plot.code) < len(PlotCoordinates(POINTS).code)
+
+
+def test_absolute_resyncs():
+    code = PlotCoordinates(POINTS, relative=True).code
+    absolute = re.findall(r"-- \((-?[\d.]+), (-?[\d.]+)\)", code)
+    assert len(absolute) == len(POINTS) // plotcoordinates.RESYNC_INTERVAL - 1
+    assert absolute[0] == ("1", "0.8415")
+
+
+def test_streamed_relative_columns(monkeypatch):
+    monkeypatch.setattr(plotcoordinates, "WINDOW_SIZE", 64)
+    xs, ys = (array("d", column) for column in zip(*POINTS))
+    from_columns = PlotCoordinates.from_columns(xs, ys)
+    from_columns.relative = True
+    from_points = PlotCoordinates(POINTS, relative=True)
+    assert "".join(from_columns.code_chunks()) == from_points.code
+    assert from_columns.code == from_points.code
+
+
+def test_plot_options_stay_absolute():
+    plot = PlotCoordinates(POINTS[:3], plot_options="smooth", relative=True)
+    assert plot.code == PlotCoordinates(POINTS[:3], plot_options="smooth").code
+
+
+def test_mark_options_stay_absolute():
+    for options in ["mark=*", "blue, only marks", "mark size=2pt", "smooth"]:
+        plot = PlotCoordinates(POINTS[:3], options=options, relative=True)
+        assert plot.code == PlotCoordinates(POINTS[:3], options=options).code
+    plot = PlotCoordinates(POINTS[:3], options="blue, thick", relative=True)
+    assert "--++" in plot.code
+
+
+def test_serialization_keeps_relative_plots():
+    tikz = TikzPicture()
+    tikz.plot_coordinates(POINTS, relative=True, precision=2)
+    assert TikzPicture.from_dict(tikz.to_dict()).code() == tikz.code()
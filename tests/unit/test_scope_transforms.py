@@ -0,0 +1,117 @@
+import pytest
+from pytest import approx
+
+from tikzpy import Arc, Circle, Point, Rectangle, Scope, TikzPicture
+
+
+@pytest.fixture
+def tikz():
+    tikz = TikzPicture()
+    scope = tikz.scope(options="thick", transform="options")
+    scope.circle((1, 0), 1)
+    scope.rectangle((0, 0), 1, 2)
+    scope.arc((0, 0), 0, 90, radius=1)
+    scope.clip(Circle((0, 0), 3))
+    scope.add_command(r"\draw (0, 0) -- (1, 1);")
+    return tikz
+
+
+def test_transforms_are_scope_options(tikz):
+    scope = tikz.drawing_objects[0]
+    circle = scope.drawing_objects[0]
+    scope.shift(1, 2)
+    scope.scale(3)
+    scope.rotate(90, about_pt=(1, 1))
+    # The last transformation applies first, so it comes first
+    assert scope.code.startswith(
+        "\\begin{scope}[rotate around={90:(1, 1)}, scale=3, shift={(1, 2)}, thick]\n"
+    )
+    # The drawing objects are not touched
+    assert circle.center == Point(1, 0)
+
+
+def test_consecutive_transforms_are_merged(tikz):
+    scope = tikz.drawing_objects[0]
+    scope.shift(1, 0)
+    scope.shift(0, 1)
+    scope.scale(2)
+    scope.scale(1.5)
+    scope.rotate(10)
+    scope.rotate(20)
+    scope.rotate(30, about_pt=(1, 0))
+    assert scope.all_options == (
+        "rotate around={30:(1, 0)}, rotate=30, scale=3.0, shift={(1, 1)}, thick"
+    )
+
+
+def test_flatten(tikz):
+    scope = tikz.drawing_objects[0]
+    circle, rectangle, arc, clip, _ = scope.drawing_objects
+    inner = Scope(transform="options")
+    scope.draw(inner)
+    inner_circle = inner.circle((0, 0), 1)
+    inner.shift(1, 0)
+    scope.shift(1, 2)
+    scope.scale(2)
+    scope.rotate(90)
+    scope.flatten()
+
+    assert scope.transforms == [] and inner.transforms == []
+    assert scope.code.startswith("\\begin{scope}[thick]\n")
+    assert tuple(circle.center) == approx((-4, 4))
+    assert circle.radius == 2
+    assert tuple(rectangle.left_corner) == approx((-4, 2))
+    assert (rectangle.width, rectangle.height) == (2, 4)
+    assert tuple(arc.position) == approx((-4, 2)) and arc.radius == 2
+    assert tuple(clip.draw_obj.center) == approx((-4, 2)) and clip.draw_obj.radius == 6
+    assert tuple(inner_circle.center) == approx((-4, 4))
+
+
+def test_serialization_keeps_transforms(tikz):
+    scope = tikz.drawing_objects[0]
+    scope.shift(1, 2)
+    scope.rotate(45, about_pt=(0, 1))
+    assert TikzPicture.from_dict(tikz.to_dict()).code() == tikz.code()
+    assert TikzPicture.from_bytes(tikz.to_bytes()).code() == tikz.code()
+
+
+def test_transforms_move_objects_by_default():
+    tikz = TikzPicture()
+    scope = tikz.scope(options="thick")
+    circle = scope.circle((1, 0), 1)
+    scope.clip(Rectangle((0, 0), 1, 1))
+    inner = Scope(transform="options")
+    scope.draw(inner)
+    inner_circle = inner.circle((0, 0), 1)
+    scope.shift(1, 2)
+    scope.scale(2)
+    scope.rotate(90, about_pt=(0, 0))
+
+    assert scope.transforms == []
+    assert scope.code.startswith("\\begin{scope}[thick]\n")
+    assert tuple(circle.center) == approx((-4, 4))
+    assert circle.radius == 2
+    assert tuple(scope.drawing_objects[1].draw_obj.left_corner) == approx((-4, 2))
+    # Nested scopes are transformed by their own method
+    assert inner.all_options == "rotate around={90:(0, 0)}, scale=2, shift={(1, 2)}"
+    assert inner_circle.center == Point(0, 0)
+
+
+def test_unknown_transform_mode():
+    with pytest.raises(ValueError, match="transform must be one of"):
+        Scope(transform="children")
+
+
+def test_clip_transforms_return_copies():
+    arc = Arc((0, 0), 0, 90, x_radius=1, y_radius=2)
+    arc.scale_(2)
+    assert (arc.x_radius, arc.y_radius) == (2, 4)
+    tikz = TikzPicture()
+    scope = tikz.scope()
+    scope.clip(Rectangle((0, 0), 1, 1))
+    clip = scope.drawing_objects[0]
+    shifted = clip.shift(1, 1)
+    assert shifted.draw_obj.left_corner == Point(1, 1)
+    assert clip.draw_obj.left_corner == Point(0, 0)
+    clip.shift_(1, 1)
+    assert clip.draw_obj.left_corner == Point(1, 1)
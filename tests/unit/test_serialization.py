@@ -0,0 +1,116 @@
+import json
+import math
+from array import array
+
+import pytest
+
+from tikzpy import Circle, Line, PlotCoordinates, R2_Space, TikzPicture
+from tikzpy.tikz_environments.tikz_command import TikzCommand
+from tikzpy.tikz_environments.tikz_style import TikzStyle
+from tikzpy.utils.serialization import from_bytes, from_dict, to_bytes, to_dict
+
+
+@pytest.fixture
+def tikz():
+    tikz = TikzPicture(center=True, options="scale=2")
+    tikz.set_tdplotsetmaincoords(60, 110)
+    tikz.tikzset("my_style", "thick, red")
+    tikz.line((0, 0), (1, 2.5), options="->", to_options="bend left")
+    tikz.line((0, 0, 1), (1, 1, 1), control_pts=[(0.5, 2), (0.7, -1)])
+    circle = tikz.circle((1, 1), 0.5, options="fill=blue", action="filldraw")
+    circle.add_node((1, 1), options="above", text="$O$")
+    tikz.ellipse((0, 0), 2, 1, action="fill")
+    tikz.rectangle((-1, -1), 2, 3)
+    tikz.arc((0, 0), 0, 180, radius=1, draw_from_start=False)
+    tikz.arc((0, 0), 0, math.pi, x_radius=1, y_radius=2, radians=True)
+    tikz.plot_coordinates([(t / 10, math.sin(t / 10)) for t in range(50)])
+    tikz.plot_coordinates([(0, 0), (1, 1), (2, 0)], plot_options="smooth cycle")
+    tikz.node((3, 3), text="hello")
+    tikz.add_command(r"\draw (0, 0) -- (1, 1);")
+    tikz.draw(R2_Space(x_interval=(-1, 1), y_interval=(0, 2)))
+    scope = tikz.scope(options="xshift=1cm")
+    scope.clip(Circle((0, 0), 1), draw=True)
+    for x in range(20):
+        scope.circle((x, 0), 0.25, options="fill=red" if x % 2 else "fill=blue")
+    for x in range(20):
+        scope.line((x, 0), (x, 1.5 * x))
+    tikz.intern_options()
+    return tikz
+
+
+def test_dict_round_trip(tikz):
+    data = json.loads(json.dumps(tikz.to_dict()))
+    assert data["version"] == 1
+    loaded = TikzPicture.from_dict(data)
+    assert loaded.code() == tikz.code()
+    assert loaded._interned_styles.keys() == tikz._interned_styles.keys()
+    assert loaded.tdplotsetmaincoords == (60, 110)
+
+
+def test_bytes_round_trip(tikz):
+    data = tikz.to_bytes()
+    loaded = TikzPicture.from_bytes(data)
+    assert loaded.code() == tikz.code()
+    assert loaded.to_dict() == tikz.to_dict()
+    assert TikzPicture.from_bytes(loaded.to_bytes()).code() == tikz.code()
+    # The runs of 20 circles and lines are stored as columns
+    assert len(data) < len(json.dumps(tikz.to_dict()))
+
+
+def test_bytes_plot_coordinates_zero_copy():
+    tikz = TikzPicture()
+    plot = tikz.plot_coordinates([(t / 10, t / 20) for t in range(1000)])
+    data = tikz.to_bytes()
+    loaded = TikzPicture.from_bytes(data).drawing_objects[0]
+    assert loaded._points is None
+    assert all(isinstance(column, memoryview) for column in loaded._columns)
+    assert loaded._columns[0].obj is memoryview(data).obj
+    assert loaded.code == plot.code
+    # Modifying the plot converts its columns into points
+    loaded.shift_(1, 1)
+    assert loaded.points[0].x == 1
+    assert loaded.code == plot.shift(1, 1).code
+
+
+def test_plot_coordinates_from_columns():
+    xs = array("d", [0.0, 1.5, 3.0])
+    ys = array("d", [1.0, 2.0, 0.5])
+    plot = PlotCoordinates.from_columns(xs, ys, plot_options="smooth")
+    assert plot.code == PlotCoordinates(list(zip(xs, ys)), plot_options="smooth").code
+    copy = plot.copy(options="red")
+    assert copy._columns[0] is plot._columns[0]
+    assert copy.code == (
+        r"\draw[red] plot[smooth] coordinates {(0.0, 1.0) (1.5, 2.0) (3.0, 0.5) };"
+    )
+    plot.add_point(4, 4)
+    assert plot.points[-1].x == 4
+    assert len(copy.points) == 3
+    with pytest.raises(ValueError):
+        PlotCoordinates.from_columns([0, 1], [0])
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        Line((0, 0), (1, 1)),
+        Circle((0, 0), 1),
+        TikzStyle("foo", "red"),
+        TikzCommand(r"\draw (0, 0);"),
+    ],
+)
+def test_objects_round_trip(obj):
+    assert repr(from_dict(to_dict(obj))) == repr(obj)
+    assert repr(from_bytes(to_bytes(obj))) == repr(obj)
+
+
+def test_errors():
+    with pytest.raises(TypeError):
+        to_dict(object())
+    with pytest.raises(ValueError):
+        from_dict({"type": "Foo"})
+    with pytest.raises(ValueError):
+        from_dict({"type": "Line", "version": 1000})
+    with pytest.raises(ValueError):
+        from_bytes(b"not a scene at all")
+    with pytest.raises(TypeError):
+        TikzPicture.from_dict(to_dict(Circle((0, 0), 1)))
@@ -0,0 +1,116 @@
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.templates.tex_file import TEX_FILE
+from tikzpy.utils.tex_log import iter_diagnostics, parse_log_file
+
+ERROR = """\
+! Package pgfkeys Error: I do not know the key '/tikz/dashed meow' and I am goi
+ng to ignore it. Perhaps you misspelled it.
+
+See the pgfkeys package documentation for explanation.
+Type  H <return>  for immediate help.
+ ...
+
+l.28     \\draw[dashed meow]
+                            (3, 0) arc [start angle = 0.0, end angle = 179.9...
+"""
+
+
+@pytest.fixture
+def mock_log():
+    return (
+        "This is pdfTeX, Version 3.141592653\n"
+        "Overfull \\hbox (12.3pt too wide) in paragraph at lines 27--30\n"
+        "[]\\OT1/cmr/m/n/12 foo\n"
+        "Missing character: There is no ^^A in font nullfont!\n"
+        + ERROR
+        + "\n"
+        "LaTeX Warning: Reference `foo' on page 1 undefined on input line\n"
+        " 31.\n"
+        "\n"
+        "Package tikz Warning: Snakes have been superseded by decorations. Please\n"
+        "(tikz)                use the decoration libraries instead.\n"
+        "\n"
+        "! Emergency stop.\n"
+        "<*> tex_file.tex\n"
+    )
+
+
+def test_iter_diagnostics(mock_log):
+    diagnostics = list(iter_diagnostics(mock_log.splitlines(keepends=True)))
+    assert [(d.severity, d.kind, d.line) for d in diagnostics] == [
+        ("warning", "overfull box", 27),
+        ("warning", "missing character", None),
+        ("error", "error", 28),
+        ("warning", "warning", 31),
+        ("warning", "warning", None),
+        ("error", "error", None),
+    ]
+    assert diagnostics[2].message == ERROR
+    assert diagnostics[3].message == (
+        "LaTeX Warning: Reference `foo' on page 1 undefined on input line 31."
+    )
+    assert diagnostics[5].message == "! Emergency stop.\n<*> tex_file.tex\n"
+
+
+def test_parse_log_file_max_warnings(tmp_path, mock_log):
+    logfile = tmp_path / "tex_file.log"
+    logfile.write_text(mock_log)
+    diagnostics = parse_log_file(logfile, max_warnings=1)
+    assert [(d.severity, d.kind) for d in diagnostics] == [
+        ("warning", "overfull box"),
+        ("error", "error"),
+        ("error", "error"),
+    ]
+
+
+def test_object_index_at_line():
+    tikz = TikzPicture(center=True)
+    tikz.circle((0, 0), 1)
+    scope = tikz.scope()
+    scope.line((0, 0), (1, 1))
+    tikz.node((0, 0), text="A")
+
+    # Line 1: \begin{center}, line 2: \begin{tikzpicture}
+    lines = tikz.code().splitlines()
+    assert lines[2].strip() == r"\draw (0, 0) circle (1cm);"
+    assert [tikz.object_index_at_line(line) for line in range(1, 10)] == [
+        None,
+        None,
+        0,
+        1,
+        1,
+        1,
+        1,  # The blank line after \end{scope}
+        2,
+        None,
+    ]
+
+
+def test_read_diagnostics_maps_objects(tmp_path):
+    tikz = TikzPicture()
+    tikz.circle((0, 0), 1)
+    tikz.circle((0, 0), 2, options="meow")
+    first_line = TEX_FILE.partition("fillme")[0].count("\n") + 1
+    tex_line = first_line + 2
+    logfile = tmp_path / "tex_file.log"
+    logfile.write_text(ERROR.replace("l.28", f"l.{tex_line}"))
+
+    (error,) = tikz._read_diagnostics(logfile)
+    assert error.object_index == 1
+    assert tikz._error_message(error).endswith(
+        r"drawing_objects[1]: \draw[meow] (0, 0) circle (2cm);"
+    )
+
+
+def test_error_message_truncates_code(tmp_path):
+    tikz = TikzPicture()
+    tikz.plot_coordinates([(x, x) for x in range(10_000)], options="meow")
+    first_line = TEX_FILE.partition("fillme")[0].count("\n") + 1
+    logfile = tmp_path / "tex_file.log"
+    logfile.write_text(ERROR.replace("l.28", f"l.{first_line + 1}"))
+
+    (error,) = tikz._read_diagnostics(logfile)
+    code = tikz.drawing_objects[0].code
+    assert tikz._error_message(error).endswith(f"drawing_objects[0]: {code[:200]}...")
@@ -0,0 +1,106 @@
+import copy
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tikzpy import Circle, Line, Scope, TikzPicture
+
+NUM_THREADS = 8
+
+
+def run_in_threads(func, num_threads=NUM_THREADS):
+    """Runs func(idx) in num_threads threads, which start at the same time."""
+    barrier = threading.Barrier(num_threads)
+
+    def run(idx):
+        barrier.wait()
+        func(idx)
+
+    with ThreadPoolExecutor(num_threads) as pool:
+        for future in [pool.submit(run, idx) for idx in range(num_threads)]:
+            future.result()
+
+
+def test_concurrent_draws():
+    tikz = TikzPicture(thread_safe=True)
+
+    def draw(idx):
+        for x in range(200):
+            # The objects of one draw() call stay together
+            tikz.draw(Circle((x, idx), 0.5), Line((x, idx), (x + 1, idx)))
+
+    run_in_threads(draw)
+    objects = tikz.drawing_objects
+    assert len(objects) == 2 * 200 * NUM_THREADS
+    for circle, line in zip(objects[::2], objects[1::2]):
+        assert isinstance(circle, Circle) and isinstance(line, Line)
+        assert circle.center == line.start
+
+
+def test_concurrent_styles():
+    tikz = TikzPicture(thread_safe=True)
+
+    def add_styles(idx):
+        for num in range(100):
+            tikz.tikzset(f"style_{idx}_{num}", "red")
+            tikz.add_option(f"opt_{idx}_{num}")
+
+    run_in_threads(add_styles)
+    code = tikz.code()
+    for idx in range(NUM_THREADS):
+        for num in range(100):
+            assert f"style_{idx}_{num}/.style" in code
+            assert f"opt_{idx}_{num}" in tikz.options
+
+
+def test_fragments_are_attached_in_key_order():
+    tikz = TikzPicture()
+    tikz.line((0, 0), (1, 1))
+
+    def draw_row(fragments, row):
+        scope = fragments.scope(key=row, options=f"row {row}")
+        for col in range(10):
+            scope.circle((col, row), 0.4)
+
+    with tikz.fragments() as fragments, ThreadPoolExecutor(NUM_THREADS) as pool:
+        # Submit the rows out of order
+        for row in reversed(range(20)):
+            pool.submit(draw_row, fragments, row)
+
+    scopes = tikz.drawing_objects[1:]
+    assert [scope.options for scope in scopes] == [f"row {row}" for row in range(20)]
+    assert all(len(scope.drawing_objects) == 10 for scope in scopes)
+
+
+def test_fragments():
+    scope = Scope()
+    fragments = scope.fragments()
+    second = fragments.scope((1, 0))
+    first = fragments.scope((0, 5))
+    with pytest.raises(ValueError, match="already exists"):
+        fragments.scope((0, 5))
+    assert fragments.attach() == [first, second]
+    assert scope.drawing_objects == [first, second]
+    # Attached fragments are not attached again
+    assert fragments.attach() == []
+
+
+def test_fragments_are_not_attached_after_an_exception():
+    tikz = TikzPicture()
+    with pytest.raises(RuntimeError):
+        with tikz.fragments() as fragments:
+            fragments.scope(0).circle((0, 0), 1)
+            raise RuntimeError
+    assert tikz.drawing_objects == []
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_copies_have_their_own_lock(thread_safe):
+    tikz = TikzPicture(thread_safe=thread_safe)
+    tikz.scope().circle((0, 0), 1)
+    for tikz_copy in (copy.deepcopy(tikz), pickle.loads(pickle.dumps(tikz))):
+        assert tikz_copy.thread_safe == thread_safe
+        assert tikz_copy._lock is not tikz._lock
+        assert tikz_copy.code() == tikz.code()
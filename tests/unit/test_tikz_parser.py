@@ -0,0 +1,176 @@
+import math
+
+import pytest
+
+from tikzpy import (
+    Arc,
+    Circle,
+    Clip,
+    Ellipse,
+    Line,
+    Node,
+    PlotCoordinates,
+    Point,
+    Rectangle,
+    Scope,
+    TikzPicture,
+)
+from tikzpy.tikz_environments.tikz_command import TikzCommand
+from tikzpy.utils.tikz_parser import iter_pictures, load_tikz, parse_tikz
+
+
+@pytest.fixture
+def tikz():
+    tikz = TikzPicture(center=True, options="scale=2")
+    tikz.set_tdplotsetmaincoords(60, 110)
+    tikz.tikzset("my_style", "thick, red")
+    tikz.line((0, 0), (1, 2.5), options="->", to_options="bend left")
+    tikz.line((0, 0, 1), (1, 1, 1), control_pts=[(0.5, 2), (0.7, -1)])
+    circle = tikz.circle((1, 1), 0.5, options="fill=blue", action="filldraw")
+    circle.add_node((1, 1), options="above", text="$O$")
+    tikz.ellipse((0, 0), 2, 1, action="fill")
+    tikz.rectangle((-1, -1), 2, 3)
+    tikz.arc((0, 0), 0, 180, radius=1, draw_from_start=False)
+    tikz.arc((0, 0), 30, 150, x_radius=1, y_radius=2)
+    tikz.plot_coordinates([(t / 10, math.sin(t / 10)) for t in range(50)])
+    tikz.plot_coordinates([(0, 0), (1, 1), (2, 0)], plot_options="smooth cycle")
+    tikz.node((3, 3), text="hello", options="my_style")
+    tikz.add_command(r"\foreach \x in {1, 2} { \draw (\x, 0) -- (\x, 1); }")
+    scope = tikz.scope(options="xshift=1cm")
+    scope.clip(Circle((0, 0), 1), draw=True)
+    for x in range(5):
+        scope.circle((x, 0), 0.25, options="fill=red")
+    return tikz
+
+
+def test_round_trip(tikz):
+    parsed = parse_tikz(tikz.code())
+    assert parsed.code() == tikz.code()
+    assert [type(obj) for obj in parsed.drawing_objects] == [
+        Line,
+        Line,
+        Circle,
+        Ellipse,
+        Rectangle,
+        Arc,
+        Arc,
+        PlotCoordinates,
+        PlotCoordinates,
+        Node,
+        TikzCommand,
+        Scope,
+    ]
+    assert [type(obj) for obj in parsed.drawing_objects[-1].drawing_objects] == [
+        Clip
+    ] + [Circle] * 5
+    assert parsed.tdplotsetmaincoords == (60, 110)
+
+
+def test_parsed_objects_can_be_transformed(tikz):
+    parsed = parse_tikz(tikz.code())
+    for original, copy in zip(tikz.drawing_objects, parsed.drawing_objects):
+        if isinstance(original, (Line, Circle, Rectangle, PlotCoordinates)):
+            original.shift_(1, -1)
+            copy.shift_(1, -1)
+    assert parsed.code() == tikz.code()
+
+
+def test_hand_written_code():
+    parsed = parse_tikz(
+        r"""
+        % A comment; with a semicolon
+        \begin{tikzpicture}[>=stealth]
+            \draw[->, thick] (0,0) -- (1, 2)
+                ; % A statement spanning lines
+            \fill (1, 1) circle (0.5cm);
+            \draw (0, 0) circle [radius=2];
+            \path[draw] (0, 0) rectangle (2, 1);
+            \draw (1, 0) arc (0:90:1);
+            \draw (0, 0) ellipse (2 and 1);
+            \node[left] at (0, 0) {$A$};
+            \node (B) at (1, 0) {B};
+            \draw[red] plot coordinates {(0, 0) (1, 1)
+                (2, 0)};
+            \foreach \x in {1,2,3}
+            {
+                \draw (\x, 0) -- (\x, 1);
+            }
+        \end{tikzpicture}
+        """
+    )
+    line, fill, circle, rect, arc, ellipse, node, named, plot, loop = (
+        parsed.drawing_objects
+    )
+    assert (line.start, line.end, line.options) == (
+        Point(0, 0),
+        Point(1, 2),
+        "->, thick",
+    )
+    assert (fill.action, fill.center, fill.radius) == ("fill", Point(1, 1), 0.5)
+    assert circle.radius == 2
+    assert (rect.action, rect.width, rect.height) == ("path", 2, 1)
+    assert (arc.position, arc.start_angle, arc.end_angle, arc.radius) == (
+        Point(1, 0),
+        0,
+        90,
+        1,
+    )
+    assert (ellipse.x_axis, ellipse.y_axis) == (2, 1)
+    assert (node.position, node.text, node.options) == (Point(0, 0), "$A$", "left")
+    assert isinstance(named, TikzCommand)
+    assert plot.points == [Point(0, 0), Point(1, 1), Point(2, 0)]
+    assert isinstance(loop, TikzCommand)
+    assert loop.code.startswith(r"\foreach \x in {1,2,3}")
+    assert parsed.options == ">=stealth"
+
+
+def test_styles_and_other_statements_before_the_picture():
+    parsed = parse_tikz(
+        r"""
+        \tikzset{dot/.style={circle, fill, inner sep=1pt}}
+        \tikzset{a/.style={red}, b/.style={blue}}
+        \begin{tikzpicture}
+            \node[dot] at (0, 0) {};
+        \end{tikzpicture}
+        """
+    )
+    # Single styles are parsed, and written back in tikzpy's format
+    assert parsed.code().startswith(
+        "\\tikzset{ dot/.style={ circle, fill, inner sep=1pt } \n }\n"
+        "\\tikzset{a/.style={red}, b/.style={blue}}\n"
+        "\\begin{tikzpicture}\n"
+    )
+
+
+def test_iter_pictures():
+    code = "".join(TikzPicture(options=f"scale={idx}").code() for idx in range(3))
+    assert [tikz.options for tikz in iter_pictures(code)] == [
+        "scale=0",
+        "scale=1",
+        "scale=2",
+    ]
+
+
+def test_load_tikz_from_file(tmp_path, tikz):
+    tex_file = tmp_path / "picture.tex"
+    tikz.write_tex_file(tex_file)
+    assert load_tikz(tex_file).code() == tikz.code()
+    assert TikzPicture.from_tex_file(tex_file, tmp_path).BASE_DIR == tmp_path
+
+
+def test_from_tex(tikz):
+    assert TikzPicture.from_tex(tikz.code()).code() == tikz.code()
+
+
+@pytest.mark.parametrize(
+    "code, message",
+    [
+        (r"\draw (0, 0) -- (1, 1);", "No tikzpicture"),
+        ("\\begin{tikzpicture}\n\\draw (0, 0);\n", "never ended"),
+        ("\\begin{tikzpicture}\n\\end{scope}\n\\end{tikzpicture}", "Line 2"),
+        ("\\begin{tikzpicture}\n\\begin{scope}\n\\end{tikzpicture}", "Line 3"),
+    ],
+)
+def test_malformed_code(code, message):
+    with pytest.raises(ValueError, match=message):
+        parse_tikz(code)
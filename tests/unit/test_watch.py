@@ -0,0 +1,186 @@
+import os
+import subprocess
+import threading
+from pathlib import Path
+from urllib.request import urlopen
+
+import pytest
+
+from tikzpy.__main__ import main
+from tikzpy.utils import engines
+from tikzpy.utils.types import ResourceUsage
+from tikzpy.utils.watch import FileWatcher, PreviewServer, Watch, run_script
+from tikzpy.utils.workspace import Workspace
+
+SCRIPT = """\
+from tikzpy import TikzPicture
+from helper import END
+
+if __name__ == "__main__":
+    tikz = TikzPicture()
+    tikz.line((0, 0), END)
+    tikz.show()
+"""
+
+
+@pytest.fixture
+def fake_tex(monkeypatch):
+    """Replaces the TeX engine by a function which writes a PDF with the TeX code. Returns
+    the list of the TeX codes which it compiled."""
+    runs = []
+
+    def run(cmd, *args):
+        tex_file = Path(cmd[-1])
+        runs.append(tex_file.read_text())
+        tex_file.with_suffix(".log").write_text("This is pdfTeX\n")
+        tex_file.with_suffix(".pdf").write_text(runs[-1])
+        return subprocess.CompletedProcess(cmd, 0, b"", b""), ResourceUsage()
+
+    monkeypatch.setattr(engines, "run_tex", run)
+    return runs
+
+
+@pytest.fixture
+def script(tmp_path):
+    (tmp_path / "helper.py").write_text("END = (1, 1)\n")
+    script = tmp_path / "figure.py"
+    script.write_text(SCRIPT)
+    return script
+
+
+def touch(path, text):
+    """Writes text into path with a modification time which differs from the previous one,
+    also on file systems with a coarse resolution."""
+    mtime = os.stat(path).st_mtime_ns + 10**9
+    Path(path).write_text(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_run_script(script):
+    result = run_script(script)
+    assert result.error is None
+    assert "\\draw (0, 0) to (1, 1);" in result.picture.code()
+    assert script in result.files
+    assert script.parent / "helper.py" in result.files
+    assert not any("site-packages" in str(path) for path in result.files)
+    # show() does not compile the picture
+    assert not script.with_suffix(".pdf").exists()
+
+    script.write_text("import helper\nraise RuntimeError('typo')\n")
+    result = run_script(script)
+    assert "RuntimeError: typo" in result.error
+    assert result.picture is None
+    assert script.parent / "helper.py" in result.files
+
+
+def test_file_watcher_debounces(tmp_path):
+    path = tmp_path / "figure.py"
+    path.write_text("a")
+    watcher = FileWatcher([path, tmp_path / "missing.py"])
+    assert watcher.changed() == []
+
+    def edit():
+        # Several writes in a row, as editors save files, are reported once
+        for text in "bcd":
+            touch(path, text)
+            threading.Event().wait(0.05)
+
+    thread = threading.Thread(target=edit)
+    thread.start()
+    assert watcher.wait(interval=0.01, debounce=0.2) == [path]
+    thread.join()
+    assert path.read_text() == "d"
+
+    stop = threading.Event()
+    stop.set()
+    assert watcher.wait(interval=0.01, stop=stop) is None
+
+
+def test_only_changed_code_is_compiled(tmp_path, script, fake_tex):
+    messages = []
+    preview = PreviewServer()
+    watch = Watch(
+        script,
+        preview=preview,
+        log=messages.append,
+        workspace=Workspace(tmp_path / "ws"),
+    )
+    assert watch.step()
+    assert len(fake_tex) == 1
+    assert script.with_suffix(".pdf").read_text() == fake_tex[0]
+    assert preview.pdf == script.with_suffix(".pdf").read_bytes()
+    assert preview.version == 1
+
+    # A change which does not affect the TeX code is not compiled
+    touch(script, SCRIPT + "# A comment\n")
+    assert not watch.step()
+    assert messages[-1] == "The TeX code did not change"
+    assert len(fake_tex) == 1
+
+    # Imported modules are watched too
+    assert script.parent / "helper.py" in watch.watcher.paths
+    touch(script.parent / "helper.py", "END = (2, 1)\n")
+    assert watch.watcher.changed() == [script.parent / "helper.py"]
+    assert watch.step()
+    assert "(2, 1)" in fake_tex[-1]
+    assert "+1 -1 lines" in messages[-1]
+
+    # Errors are pushed to the preview, which keeps the last PDF
+    touch(script, "raise RuntimeError('typo')\n")
+    assert not watch.step()
+    assert "RuntimeError: typo" in preview.error
+    assert preview.pdf == script.with_suffix(".pdf").read_bytes()
+
+
+def test_unexpected_compile_errors_are_reported(tmp_path, script, monkeypatch):
+    def run(cmd, *args):
+        raise PermissionError("Permission denied: 'pdflatex'")
+
+    monkeypatch.setattr(engines, "run_tex", run)
+    preview = PreviewServer()
+    watch = Watch(
+        script,
+        preview=preview,
+        log=lambda message: None,
+        workspace=Workspace(tmp_path / "ws"),
+    )
+    assert not watch.step()
+    assert "PermissionError: Permission denied" in preview.error
+
+
+def test_run_script_python_path(script, monkeypatch):
+    monkeypatch.delenv("PYTHONPATH", raising=False)
+    python_paths = []
+    original_run = subprocess.run
+
+    def run(*args, env, **kwargs):
+        python_paths.append(env["PYTHONPATH"])
+        return original_run(*args, env=env, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    assert run_script(script).error is None
+    assert "" not in python_paths[0].split(os.pathsep)
+
+
+def test_preview_server():
+    preview = PreviewServer()
+    url = preview.start()
+    try:
+        with urlopen(url) as response:
+            assert b"EventSource" in response.read()
+        preview.publish(b"%PDF-1.5")
+        with urlopen(f"{url}figure.pdf?version=1") as response:
+            assert response.read() == b"%PDF-1.5"
+        with urlopen(f"{url}events") as response:
+            assert response.readline() == b'data: {"version": 1, "error": null}\n'
+            preview.publish_error("Compilation failed")
+            assert response.readline() == b"\n"
+            assert b'"error": "Compilation failed"' in response.readline()
+    finally:
+        preview.shutdown()
+
+
+def test_cli_help(capsys):
+    with pytest.raises(SystemExit):
+        main(["watch", "--help"])
+    assert "--debounce" in capsys.readouterr().out
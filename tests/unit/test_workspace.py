@@ -0,0 +1,160 @@
+import os
+import stat
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from tikzpy import TikzPicture
+from tikzpy.utils import engines
+from tikzpy.utils.files import file_lock, remove_lock_file
+from tikzpy.utils.instrumentation import CompileProfile
+from tikzpy.utils.types import ResourceUsage
+from tikzpy.utils.workspace import (
+    Workspace,
+    build_name,
+    check_private_dir,
+    default_root,
+)
+
+
+@pytest.fixture
+def fake_tex(monkeypatch):
+    """Replaces the TeX engine by a function which writes a log, an .aux file and a PDF.
+    Returns the list of the TeX files which it was run on."""
+    runs = []
+
+    def run(cmd, *args):
+        tex_file = Path(cmd[-1])
+        runs.append(tex_file)
+        tex_file.with_suffix(".log").write_text("This is pdfTeX\n")
+        tex_file.with_suffix(".aux").write_text("\\relax\n")
+        tex_file.with_suffix(".pdf").write_bytes(b"%PDF-1.5\n" + tex_file.read_bytes())
+        completed_process = subprocess.CompletedProcess(cmd, 0, b"", b"")
+        return completed_process, ResourceUsage(seconds=0.5, runs=1)
+
+    monkeypatch.setattr(engines, "run_tex", run)
+    return runs
+
+
+def make_dir(path, size, age):
+    path.mkdir()
+    (path / "tex_file.pdf").write_bytes(b"0" * size)
+    os.utime(path, (age, age))
+    return path
+
+
+def test_unchanged_pictures_are_not_compiled_again(tmp_path, fake_tex):
+    workspace = Workspace(tmp_path / "workspace")
+    tikz = TikzPicture()
+    tikz.line((0, 0), (1, 1))
+    pdf = tikz.compile(tmp_path / "out.pdf", workspace=workspace)
+    assert len(fake_tex) == 1
+    build_dir = fake_tex[0].parent
+    assert build_dir.parent == workspace.root
+    assert build_dir.name.startswith("out-")
+
+    profile = CompileProfile()
+    assert tikz.compile(tmp_path / "out.pdf", workspace=workspace, on_event=profile) == pdf
+    assert len(fake_tex) == 1
+    (tex,) = [event for event in profile.events if event.stage == "tex"]
+    assert tex.details["up_to_date"]
+    assert tikz.resource_usage.runs == 0
+    # The PDF was copied, and the auxiliary files are kept
+    assert (build_dir / "tex_file.pdf").read_bytes() == pdf.read_bytes()
+    assert (build_dir / "tex_file.aux").exists()
+
+    # Changing the picture or the settings compiles it again, in the same directory
+    tikz.line((1, 1), (2, 0))
+    tikz.compile(tmp_path / "out.pdf", workspace=workspace)
+    tikz.compile(tmp_path / "out.pdf", workspace=workspace, engine="lualatex")
+    assert fake_tex[1:] == [fake_tex[0]] * 2
+    assert b"(2, 0)" in pdf.read_bytes()
+
+    # Other destinations have build directories of their own
+    tikz.compile(tmp_path / "other.pdf", workspace=workspace)
+    assert fake_tex[-1].parent != build_dir
+    assert len(workspace.build_dirs()) == 2
+
+
+def test_clean_by_age_and_size(tmp_path):
+    workspace = Workspace(tmp_path, max_age=3600, max_size=250)
+    old = make_dir(tmp_path / "old", 10, 0)
+    older = make_dir(tmp_path / "older", 100, 1)
+    recent = make_dir(tmp_path / "recent", 100, 2e9)
+    newest = make_dir(tmp_path / "newest", 100, 3e9)
+    assert workspace.build_dirs() == [old, older, recent, newest]
+
+    # Both old directories exceed max_age, after which the size is within max_size
+    assert workspace.clean() == [old, older]
+    workspace.max_size = 150
+    assert workspace.clean(keep="recent") == [newest]
+    assert workspace.build_dirs() == [recent]
+
+
+def test_locked_build_dirs_are_kept(tmp_path):
+    workspace = Workspace(tmp_path, max_age=0)
+    build_dir = make_dir(tmp_path / "busy", 10, 0)
+    with file_lock(build_dir):
+        assert workspace.clean() == []
+    assert workspace.clean() == [build_dir]
+    # The lock files are removed with the build directories
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_lock_files_can_be_removed_while_waited_on(tmp_path):
+    build_dir = tmp_path / "busy"
+
+    def wait_for_lock():
+        with file_lock(build_dir):
+            return (tmp_path / "busy.lock").exists()
+
+    with ThreadPoolExecutor(1) as pool:
+        with file_lock(build_dir):
+            future = pool.submit(wait_for_lock)
+            # Lets the thread block on the lock file before it is removed
+            threading.Event().wait(0.1)
+            remove_lock_file(build_dir)
+        # The thread then locks a new lock file
+        assert future.result(timeout=10)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_shared_root_must_be_private(tmp_path, monkeypatch):
+    root = tmp_path / "tikzpy-shared"
+    monkeypatch.setattr("tikzpy.utils.workspace.default_root", lambda tmpfs=True: root)
+    workspace = Workspace()
+    with workspace.build_dir("out"):
+        pass
+    assert stat.S_IMODE(root.stat().st_mode) == 0o700
+
+    # E.g. created by another user, who could plant files in it
+    os.chmod(root, 0o777)
+    with pytest.raises(PermissionError, match="other users"):
+        with workspace.build_dir("out"):
+            pass
+    os.chmod(root, 0o700)
+    monkeypatch.setattr(os, "getuid", lambda: root.stat().st_uid + 1)
+    with pytest.raises(PermissionError, match="another user"):
+        check_private_dir(root)
+
+    link = tmp_path / "link"
+    link.symlink_to(root)
+    with pytest.raises(PermissionError, match="not a directory"):
+        check_private_dir(link)
+
+
+def test_build_names_are_safe(tmp_path):
+    name = build_name(tmp_path / "my fig's 100% $final$ (v2).pdf")
+    assert name.startswith("my_fig_s_100___final___v2_-")
+    assert build_name(tmp_path / "my fig.pdf") != build_name(tmp_path / "my_fig.pdf")
+    assert len(build_name(tmp_path / ("x" * 300 + ".pdf"))) == 64 + 13
+
+
+def test_default_root():
+    assert default_root(tmpfs=False).parent == Path(tempfile.gettempdir())
+    if Path("/dev/shm").is_dir() and os.access("/dev/shm", os.W_OK):
+        assert Workspace().root.parent == Path("/dev/shm")